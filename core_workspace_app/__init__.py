@@ -0,0 +1,4 @@
+""" Core workspace app package
+"""
+
+default_app_config = 'core_workspace_app.apps.WorkspaceAppConfig'
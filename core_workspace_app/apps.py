@@ -6,4 +6,19 @@ from django.apps import AppConfig
 class WorkspaceAppConfig(AppConfig):
     """ Core application settings
     """
-    name = 'core_workspace_app'
\ No newline at end of file
+    name = 'core_workspace_app'
+
+    def ready(self):
+        """ Run when the app is ready.
+
+        Returns:
+
+        """
+        from core_workspace_app import settings
+        from core_workspace_app.components.workspace import cache as workspace_cache
+        workspace_cache.connect_signals()
+
+        if settings.WORKSPACE_QUERY_COUNT:
+            from core_workspace_app.utils import query_count
+            query_count.register_mongo_listener()
+            query_count.check_mongo_listener()
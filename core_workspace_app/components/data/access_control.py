@@ -40,6 +40,25 @@ def can_write_data_workspace(func, data, workspace, user):
     return func(data, workspace, user)
 
 
+def can_write_list_data_workspace(func, list_data_id, workspace, user):
+    """ Can user write a list of data in workspace. The ownership of each data is checked by the function.
+
+    Args:
+        func:
+        list_data_id:
+        workspace:
+        user:
+
+    Returns:
+
+    """
+    if user.is_superuser:
+        return func(list_data_id, workspace, user)
+
+    _check_can_write_workspace(workspace, user)
+    return func(list_data_id, workspace, user)
+
+
 def _check_can_write_workspace(workspace, user):
     """ Check that user can write in the workspace.
 
@@ -50,8 +69,7 @@ def _check_can_write_workspace(workspace, user):
     Returns:
 
     """
-    accessible_workspaces = workspace_api.get_all_workspaces_with_write_access_by_user(user)
-    if workspace not in accessible_workspaces:
+    if not workspace_api.check_if_user_can_write_workspace(workspace, user):
         raise AccessControlError("The user does not have the permission to write into this workspace.")
 
 
@@ -65,7 +83,5 @@ def _check_can_read_or_write_workspace(workspace, user):
     Returns:
 
     """
-    accessible_write_workspaces = workspace_api.get_all_workspaces_with_write_access_by_user(user)
-    accessible_read_workspaces = workspace_api.get_all_workspaces_with_read_access_by_user(user)
-    if workspace not in list(accessible_write_workspaces) + list(accessible_read_workspaces):
+    if not workspace_api.check_if_user_can_read_or_write_workspace(workspace, user):
         raise AccessControlError("The user does not have the permission to write into this workspace.")
@@ -1,11 +1,17 @@
 """ Data workspace api
 """
+from bson.objectid import ObjectId
+
+from core_main_app.commons import exceptions
 from core_main_app.components.data.models import Data
-from core_main_app.utils.access_control.decorators import access_control
-from core_workspace_app.components.data.access_control import can_write_data_workspace, can_read_or_write_data_workspace
+from core_workspace_app.components.data.access_control import can_write_data_workspace, \
+    can_read_or_write_data_workspace, can_write_list_data_workspace
+from core_workspace_app.components.workspace import api as workspace_api
+from core_workspace_app.components.workspace.models import Workspace
+from core_workspace_app.utils import metrics
 
 
-@access_control(can_write_data_workspace)
+@metrics.timed_access_control(can_write_data_workspace)
 def assign(data, workspace, user):
     """ Assign data to a workspace.
 
@@ -21,7 +27,71 @@ def assign(data, workspace, user):
     return data.save()
 
 
-@access_control(can_read_or_write_data_workspace)
+@metrics.timed_access_control(can_write_list_data_workspace)
+def assign_many(list_data_id, workspace, user):
+    """ Assign a list of data to a workspace, with a single update.
+    The user can assign the data he owns, and the data in a workspace he can write.
+    The data that can't be assigned are reported, the others are assigned.
+    The data are updated in the database directly: Data.save, its validation and the save signals are not run.
+    The workspace is checked again after the update: if its deletion started meanwhile, the data are unassigned and
+    reported, so that no data is left in a deleted workspace.
+
+    Args:
+        list_data_id:
+        workspace:
+        user:
+
+    Returns:
+        dict: error message by data id, for the data that were not assigned
+
+    """
+    errors = {}
+    list_data_id = [str(data_id) for data_id in list_data_id]
+    object_ids = []
+    for data_id in list_data_id:
+        if ObjectId.is_valid(data_id):
+            object_ids.append(ObjectId(data_id))
+        else:
+            errors[data_id] = "The data id is not valid."
+
+    # only the owner and the workspace of the data are read
+    data_by_id = {str(data['_id']): data
+                  for data in Data._get_collection().find({'_id': {'$in': object_ids}}, {'user_id': 1, 'workspace': 1})}
+
+    writable_workspace_ids = None
+    assigned_data_ids = []
+    for object_id in object_ids:
+        data_id = str(object_id)
+        data = data_by_id.get(data_id)
+        if data is None:
+            errors[data_id] = "The data does not exist."
+        elif user.is_superuser or data.get('user_id') == str(user.id):
+            assigned_data_ids.append(data_id)
+        elif data.get('workspace') is None:
+            errors[data_id] = "The user does not have the permission to write this data."
+        else:
+            if writable_workspace_ids is None:
+                writable_workspace_ids = workspace_api.get_writable_workspace_ids_by_user(user)
+            if str(data['workspace']) in writable_workspace_ids:
+                assigned_data_ids.append(data_id)
+            else:
+                errors[data_id] = "The user does not have the permission to write this data."
+
+    if len(assigned_data_ids) > 0:
+        Data.objects(pk__in=assigned_data_ids).update(set__workspace=workspace)
+        try:
+            Workspace.get_by_id(workspace.id)
+        except exceptions.DoesNotExist:
+            # the workspace was marked for deletion meanwhile: the deletion worker may already have unassigned its
+            # data, so the data of this update are unassigned here (both unassign only the data still in it)
+            Data.objects(pk__in=assigned_data_ids, workspace=workspace).update(unset__workspace=True)
+            for data_id in assigned_data_ids:
+                errors[data_id] = "The workspace is being deleted."
+
+    return errors
+
+
+@metrics.timed_access_control(can_read_or_write_data_workspace)
 def get_all_by_workspace(workspace, user):
     """ Get all data that belong to the workspace.
 
@@ -32,3 +102,27 @@ def get_all_by_workspace(workspace, user):
 
     """
     return Data.get_all_by_workspace(workspace)
+
+
+def get_workspace_ids_by_data_id_list(list_data_id, user):
+    """ Get the distinct ids of the workspaces of a list of data.
+    Only the workspace field is read: the content of the data is not loaded.
+    The data the user does not own are ignored, unless the user is superuser.
+
+    Args:
+        list_data_id:
+        user:
+
+    Returns:
+        list: workspace ids
+
+    """
+    object_ids = [ObjectId(data_id) for data_id in list_data_id if ObjectId.is_valid(str(data_id))]
+    if len(object_ids) == 0:
+        return []
+
+    query = {'_id': {'$in': object_ids}, 'workspace': {'$ne': None}}
+    if not user.is_superuser:
+        query['user_id'] = str(user.id)
+
+    return [str(workspace_id) for workspace_id in Data._get_collection().distinct('workspace', query)]
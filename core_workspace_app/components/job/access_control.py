@@ -0,0 +1,24 @@
+"""
+    Job access control
+"""
+
+from core_main_app.utils.access_control.exceptions import AccessControlError
+
+
+def is_job_owner(func, job, user):
+    """ Check if the user submitted the job.
+
+    Args:
+        func:
+        job:
+        user:
+
+    Returns:
+
+    """
+    if user.is_superuser:
+        return func(job, user)
+
+    if job.user_id != str(user.id):
+        raise AccessControlError("The user doesn't have enough rights to access this job.")
+    return func(job, user)
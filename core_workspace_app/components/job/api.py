@@ -0,0 +1,151 @@
+"""
+Job API
+"""
+import logging
+
+from core_main_app.commons import exceptions
+from core_main_app.components.user import api as user_api
+from core_main_app.utils.access_control.decorators import access_control
+from core_workspace_app import settings
+from core_workspace_app.components.job import tasks
+from core_workspace_app.components.job.access_control import is_job_owner
+from core_workspace_app.components.job.models import Job
+from core_workspace_app.constants import JOB_FAILURE, JOB_PENDING, JOB_SUCCESS
+from core_workspace_app.utils import executor
+
+logger = logging.getLogger(__name__)
+
+
+def submit(task, params, user, idempotency_key=None):
+    """ Create a job running a task in the background.
+    If the user already submitted a job with the same key, this job is returned (and run again if it failed).
+
+    Args:
+        task: name of the task (see tasks.TASKS)
+        params: keyword arguments of the task
+        user:
+        idempotency_key: key identifying the operation for the user, None to always create a job
+
+    Returns:
+        Job
+    """
+    if task not in tasks.TASKS:
+        raise exceptions.ApiError("Unknown task: {0}.".format(task))
+
+    if idempotency_key is not None:
+        job = Job.get_by_user_id_and_key(user.id, idempotency_key)
+        if job is not None:
+            if job.status == JOB_FAILURE:
+                return retry(job, user)
+            return job
+
+    job = Job(task=task, user_id=str(user.id), params=params)
+    if idempotency_key is not None:
+        job.idempotency_key = idempotency_key
+    try:
+        job = job.save_object()
+    except exceptions.NotUniqueError:
+        # submitted concurrently with the same key
+        return Job.get_by_user_id_and_key(user.id, idempotency_key)
+
+    _enqueue(job)
+    return job
+
+
+def run(job_id):
+    """ Run a pending job, and record its result.
+
+    Args:
+        job_id:
+
+    Returns:
+    """
+    if not Job.start(job_id):
+        # started by another worker, or not pending anymore
+        return
+
+    job = Job.get_by_id(job_id)
+    try:
+        result = tasks.TASKS[job.task](user_api.get_user_by_id(job.user_id), **job.params)
+    except Exception as e:
+        logger.exception("Job %s (%s) failed.", job_id, job.task)
+        Job.finish(job_id, JOB_FAILURE, message=getattr(e, 'message', None) or "Something wrong happened.")
+        return
+
+    Job.finish(job_id, JOB_SUCCESS, result=result)
+
+
+@access_control(is_job_owner)
+def retry(job, user):
+    """ Run a failed job again. The tasks can be run again safely.
+
+    Args:
+        job:
+        user:
+
+    Returns:
+        Job
+    """
+    if Job.reset(job.id, JOB_FAILURE):
+        _enqueue(job)
+    return Job.get_by_id(job.id)
+
+
+def get_pending_job_ids(include_running=False):
+    """ Get the ids of the pending jobs (to run them after a restart of the server).
+
+    Args:
+        include_running: move the jobs running for longer than WORKSPACE_JOB_LEASE_TIMEOUT (stopped with the server)
+            back to pending first
+
+    Returns:
+        list: job ids
+    """
+    if include_running:
+        Job.reset_expired(settings.WORKSPACE_JOB_LEASE_TIMEOUT)
+    return [str(job_id) for job_id in Job.get_all_by_status(JOB_PENDING).scalar('id')]
+
+
+def get_by_id(job_id):
+    """ Return the job with the given id.
+
+    Args:
+        job_id:
+
+    Returns:
+        Job
+    """
+    return Job.get_by_id(job_id)
+
+
+@access_control(is_job_owner)
+def get_job_status(job, user):
+    """ Get the status of a job.
+
+    Args:
+        job:
+        user:
+
+    Returns:
+        dict
+    """
+    return {'job_id': str(job.id),
+            'task': job.task,
+            'status': job.status,
+            'attempts': job.attempts,
+            'result': job.result,
+            'message': job.message,
+            'creation_date': job.creation_date.isoformat() if job.creation_date else None,
+            'end_date': job.end_date.isoformat() if job.end_date else None}
+
+
+def _enqueue(job):
+    """ Queue the job in the executor of the process.
+    If the queue is full, the job stays pending until the workspace_jobs_run command runs it.
+
+    Args:
+        job:
+
+    Returns:
+    """
+    executor.get_executor().submit(run, str(job.id))
@@ -0,0 +1,155 @@
+"""
+Job model
+"""
+import datetime
+import uuid
+
+from django_mongoengine import fields, Document
+from mongoengine import errors as mongoengine_errors
+from mongoengine.queryset.visitor import Q
+
+from core_main_app.commons import exceptions
+from core_workspace_app.constants import JOB_PENDING, JOB_RUNNING, JOB_FAILURE
+
+
+class Job(Document):
+    """
+        Bulk operation running in the background.
+    """
+
+    task = fields.StringField(blank=False)
+    user_id = fields.StringField(blank=False)
+    params = fields.DictField(blank=True)
+    # Submitting twice with the same key returns the first job
+    idempotency_key = fields.StringField(blank=False, default=lambda: uuid.uuid4().hex)
+    status = fields.StringField(default=JOB_PENDING)
+    result = fields.DictField(blank=True)
+    message = fields.StringField(blank=True)
+    attempts = fields.IntField(default=0)
+    creation_date = fields.DateTimeField(default=datetime.datetime.utcnow)
+    start_date = fields.DateTimeField(blank=True)
+    end_date = fields.DateTimeField(blank=True)
+
+    meta = {
+        'indexes': [
+            {'fields': ('user_id', 'idempotency_key'), 'unique': True},
+            'status',
+        ]
+    }
+
+    def save_object(self):
+        """ Custom save. Set the unicity error message.
+
+        Returns:
+        """
+        try:
+            return self.save()
+        except mongoengine_errors.NotUniqueError:
+            raise exceptions.NotUniqueError('A job with the same key already exists.')
+        except Exception as ex:
+            raise exceptions.ModelError(ex.message)
+
+    @staticmethod
+    def get_by_id(job_id):
+        """ Return the job with the given id.
+
+        Args:
+            job_id
+
+        Returns:
+            Job (obj): Job object with the given id
+
+        """
+        try:
+            return Job.objects.get(pk=str(job_id))
+        except mongoengine_errors.DoesNotExist as e:
+            raise exceptions.DoesNotExist(e.message)
+        except Exception as ex:
+            raise exceptions.ModelError(ex.message)
+
+    @staticmethod
+    def get_by_user_id_and_key(user_id, idempotency_key):
+        """ Return the job submitted by the user with the given key, or None.
+
+        Args:
+            user_id
+            idempotency_key
+
+        Returns:
+
+        """
+        return Job.objects(user_id=str(user_id), idempotency_key=idempotency_key).first()
+
+    @staticmethod
+    def get_all_by_status(status):
+        """ Get all jobs with the given status.
+
+        Args:
+            status
+
+        Returns:
+
+        """
+        return Job.objects(status=status).all()
+
+    @staticmethod
+    def start(job_id):
+        """ Move a pending job to running. Only one worker can start a job.
+
+        Args:
+            job_id
+
+        Returns:
+            bool: True if the job was started by this call
+
+        """
+        return Job.objects(pk=str(job_id), status=JOB_PENDING)\
+            .update_one(set__status=JOB_RUNNING, set__start_date=datetime.datetime.utcnow(), inc__attempts=1) == 1
+
+    @staticmethod
+    def finish(job_id, status, result=None, message=None):
+        """ Record the end of a job.
+
+        Args:
+            job_id
+            status: JOB_SUCCESS or JOB_FAILURE
+            result
+            message
+
+        Returns:
+
+        """
+        Job.objects(pk=str(job_id)).update_one(set__status=status,
+                                               set__result=result or {},
+                                               set__message=message or '',
+                                               set__end_date=datetime.datetime.utcnow())
+
+    @staticmethod
+    def reset(job_id, from_status=JOB_FAILURE):
+        """ Move a job back to pending, to run it again.
+
+        Args:
+            job_id
+            from_status: current status of the job
+
+        Returns:
+            bool: True if the job was reset by this call
+
+        """
+        return Job.objects(pk=str(job_id), status=from_status)\
+            .update_one(set__status=JOB_PENDING, unset__end_date=True) == 1
+
+    @staticmethod
+    def reset_expired(lease_timeout):
+        """ Move the jobs running for longer than the lease back to pending, to run them again.
+
+        Args:
+            lease_timeout: number of seconds
+
+        Returns:
+            int: number of jobs reset
+
+        """
+        expiration_date = datetime.datetime.utcnow() - datetime.timedelta(seconds=lease_timeout)
+        return Job.objects(Q(start_date__lt=expiration_date) | Q(start_date=None), status=JOB_RUNNING)\
+            .update(set__status=JOB_PENDING, unset__end_date=True)
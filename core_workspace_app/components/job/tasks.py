@@ -0,0 +1,94 @@
+"""
+    Bulk operations that can run in a job.
+    Each task takes the user and the job parameters, and returns a dict reporting the result.
+    Running a task again gives the same state, so that a failed job can be retried.
+"""
+from core_main_app.components.group import api as group_api
+from core_main_app.components.user import api as user_api
+from core_main_app.utils.access_control.exceptions import AccessControlError
+from core_workspace_app.components.data import api as data_workspace_api
+from core_workspace_app.components.workspace import api as workspace_api
+
+
+def set_public_workspaces(user, workspace_ids):
+    """ Set workspaces public. The user has to own all of them.
+
+    Args:
+        user:
+        workspace_ids:
+
+    Returns:
+    """
+    list_workspace = workspace_api.get_by_id_list(workspace_ids)
+    if not user.is_superuser and any(workspace.owner != str(user.id) for workspace in list_workspace):
+        raise AccessControlError("The user does not have the permission. The user is not the owner of this workspace.")
+    for workspace in list_workspace:
+        workspace_api.set_workspace_public(workspace)
+    return {'nb_workspaces': len(list_workspace)}
+
+
+def assign_data_to_workspace(user, data_ids, workspace_id):
+    """ Assign data to a workspace.
+
+    Args:
+        user:
+        data_ids:
+        workspace_id:
+
+    Returns:
+        dict: number of data assigned, error message by data id for the others
+    """
+    errors = data_workspace_api.assign_many(data_ids, workspace_api.get_by_id(str(workspace_id)), user)
+    return {'nb_assigned': len({str(data_id) for data_id in data_ids}) - len(errors), 'errors': errors}
+
+
+def add_users_rights_to_workspace(user, workspace_id, user_ids, read, write):
+    """ Give users read and/or write access to a workspace.
+
+    Args:
+        user:
+        workspace_id:
+        user_ids:
+        read:
+        write:
+
+    Returns:
+        dict: number of users given an access they did not have, number of user ids not found
+    """
+    users = list(user_api.get_all_users_by_list_id(user_ids))
+    nb_users = workspace_api.add_users_access_to_workspace(workspace_api.get_by_id(str(workspace_id)),
+                                                           users,
+                                                           read,
+                                                           write,
+                                                           user)
+    return {'nb_users': nb_users, 'nb_not_found': len({str(user_id) for user_id in user_ids}) - len(users)}
+
+
+def add_groups_rights_to_workspace(user, workspace_id, group_ids, read, write):
+    """ Give groups read and/or write access to a workspace.
+
+    Args:
+        user:
+        workspace_id:
+        group_ids:
+        read:
+        write:
+
+    Returns:
+        dict: number of groups given an access they did not have, number of group ids not found
+    """
+    groups = list(group_api.get_all_groups_by_list_id(group_ids))
+    nb_groups = workspace_api.add_groups_access_to_workspace(workspace_api.get_by_id(str(workspace_id)),
+                                                             groups,
+                                                             read,
+                                                             write,
+                                                             user)
+    return {'nb_groups': nb_groups, 'nb_not_found': len({str(group_id) for group_id in group_ids}) - len(groups)}
+
+
+TASKS = {
+    'set_public_workspaces': set_public_workspaces,
+    'assign_data_to_workspace': assign_data_to_workspace,
+    'add_users_rights_to_workspace': add_users_rights_to_workspace,
+    'add_groups_rights_to_workspace': add_groups_rights_to_workspace,
+}
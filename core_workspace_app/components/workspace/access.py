@@ -0,0 +1,59 @@
+"""
+    Workspace access of a user
+"""
+
+
+class WorkspaceAccess(object):
+    """
+        Ids of the workspaces a user can access, resolved in one pass.
+        The listing helpers of the workspace API query the workspaces from the same permission ids.
+    """
+
+    def __init__(self, user_id, workspaces, permission_ids):
+        """ Build the access sets of a user.
+
+        Args:
+            user_id: id of the user
+            workspaces: workspaces owned by the user, or with read or write access (only the id, the owner and the
+            permission ids are read)
+            permission_ids: WorkspacePermissionIds of the user
+        """
+        self.user_id = str(user_id)
+        self.permission_ids = permission_ids
+        self.owned_ids = set()
+        self.readable_ids = set()
+        self.writable_ids = set()
+        self.public_ids = set()
+
+        for workspace in workspaces:
+            workspace_id = str(workspace.id)
+            if workspace.owner == self.user_id:
+                self.owned_ids.add(workspace_id)
+                self.readable_ids.add(workspace_id)
+                self.writable_ids.add(workspace_id)
+            if workspace.read_perm_id in permission_ids.read:
+                self.readable_ids.add(workspace_id)
+            if workspace.write_perm_id in permission_ids.write:
+                self.writable_ids.add(workspace_id)
+            if workspace.read_perm_id in permission_ids.public:
+                self.public_ids.add(workspace_id)
+
+    def can_read(self, workspace):
+        """ Check if the user can read the workspace.
+
+        Args:
+            workspace:
+
+        Returns:
+        """
+        return str(workspace.id) in self.readable_ids
+
+    def can_write(self, workspace):
+        """ Check if the user can write in the workspace.
+
+        Args:
+            workspace:
+
+        Returns:
+        """
+        return str(workspace.id) in self.writable_ids
@@ -17,6 +17,7 @@ def is_workspace_owner_to_perform_action_for_others(func, workspace, new_user_id
     Returns:
 
     """
+    _check_is_not_pending_delete(workspace)
     if user.is_superuser:
         return func(workspace, new_user_id, user)
 
@@ -24,6 +25,28 @@ def is_workspace_owner_to_perform_action_for_others(func, workspace, new_user_id
     return func(workspace, new_user_id, user)
 
 
+def is_workspace_owner_to_perform_bulk_action_for_others(func, workspace, list_objects, read, write, user):
+    """ Check if the user is the owner of the workspace to perform an action for a list of users or groups.
+
+    Args:
+        func
+        workspace
+        list_objects
+        read
+        write
+        user
+
+    Returns:
+
+    """
+    _check_is_not_pending_delete(workspace)
+    if user.is_superuser:
+        return func(workspace, list_objects, read, write, user)
+
+    _check_is_owner_workspace(workspace, user)
+    return func(workspace, list_objects, read, write, user)
+
+
 def is_workspace_owner(func, workspace, user):
     """ Check if the user is the owner of the workspace.
 
@@ -72,3 +95,16 @@ def _check_is_owner_workspace(workspace, user):
     """
     if workspace.owner != str(user.id):
         raise AccessControlError("The user does not have the permission. The user is not the owner of this workspace.")
+
+
+def _check_is_not_pending_delete(workspace):
+    """ Check that the workspace is not being deleted.
+
+    Args:
+        workspace:
+
+    Returns:
+
+    """
+    if workspace.pending_delete:
+        raise AccessControlError("The workspace is being deleted.")
@@ -1,18 +1,34 @@
 """
 Workspace API
 """
-from core_main_app.commons.exceptions import NotUniqueError
+import logging
+
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from core_main_app.commons import exceptions
+from core_main_app.components.data.models import Data
 from core_main_app.components.group import api as group_api
 from core_main_app.components.user import api as user_api
-from core_main_app.utils.access_control.decorators import access_control
+from core_workspace_app import settings
+from core_workspace_app.components.workspace import cache as workspace_cache
+from core_workspace_app.components.workspace.access import WorkspaceAccess
 from core_workspace_app.components.workspace.access_control import can_delete_workspace, is_workspace_owner, \
-    is_workspace_owner_to_perform_action_for_others
+    is_workspace_owner_to_perform_action_for_others, is_workspace_owner_to_perform_bulk_action_for_others
 from core_workspace_app.components.workspace.models import Workspace
 from core_workspace_app.permissions import api as permission_api
+from core_workspace_app.utils import executor
+from core_workspace_app.utils import group as group_utils
+from core_workspace_app.utils import metrics
+from core_workspace_app.utils import request_cache
+from core_workspace_app.utils.pagination import get_keyset_page
+
+logger = logging.getLogger(__name__)
 
 
 def create_and_save(owner_id, title):
-    """ Create and save a workspace. It will also create permissions.
+    """ Create and save a workspace. It will also create permissions, deleted if the workspace can't be saved.
+    The unicity of the title (case insensitive) is enforced by the database.
 
     Args:
         owner_id
@@ -20,30 +36,109 @@ def create_and_save(owner_id, title):
 
     Returns:
     """
-
-    if Workspace.check_if_workspace_already_exists(title):
-        raise NotUniqueError('A workspace with the same title already exists.')
-
+    read_perm = permission_api.create_read_perm(title)
+    write_perm = permission_api.create_write_perm(title)
     workspace = Workspace(title=title,
                           owner=str(owner_id),
-                          read_perm_id=str(permission_api.create_read_perm(title).id),
-                          write_perm_id=str(permission_api.create_write_perm(title).id))
+                          read_perm_id=str(read_perm.id),
+                          write_perm_id=str(write_perm.id))
 
-    return workspace.save()
+    try:
+        workspace = workspace.save_object()
+    except Exception:
+        permission_api.delete_permission(read_perm.id)
+        permission_api.delete_permission(write_perm.id)
+        raise
+    workspace_cache.invalidate_user(owner_id)
+    return workspace
 
 
-@access_control(can_delete_workspace)
+@metrics.timed_access_control(can_delete_workspace)
 def delete(workspace, user):
-    """ Delete a workspace and its permissions.
+    """ Delete a workspace. The workspace is hidden immediately, its data are counted and unassigned, then its
+    permissions and its document are deleted by a background thread (see get_deletion_status).
 
     Args:
          workspace:
 
     Returns:
     """
+    if not Workspace.set_pending_delete(workspace.id):
+        # already being deleted
+        return
+
+    workspace_cache.invalidate_all()
+    if not executor.get_executor().submit(process_pending_deletion, str(workspace.id)):
+        logger.warning("The queue of background tasks is full, workspace %s is deleted synchronously.", workspace.id)
+        process_pending_deletion(str(workspace.id))
+
+
+def process_pending_deletion(workspace_id):
+    """ Unassign the data of a workspace pending deletion by batches, then delete its permissions and its document.
+    Can be run again if it was interrupted.
+
+    Args:
+        workspace_id:
+
+    Returns:
+    """
+    try:
+        workspace = Workspace.get_by_id(workspace_id, include_pending_delete=True)
+    except exceptions.DoesNotExist:
+        return
+
+    if not workspace.pending_delete:
+        return
+
+    # counted here rather than in the request: the workspace of the data is not indexed
+    Workspace.set_deletion_total(workspace.id, workspace.deletion_done + Data.objects(workspace=workspace).count())
+    while True:
+        data_ids = list(Data.objects(workspace=workspace).limit(settings.WORKSPACE_DELETION_BATCH_SIZE).scalar('id'))
+        if len(data_ids) == 0:
+            break
+        Data.objects(pk__in=data_ids).update(unset__workspace=True)
+        Workspace.add_deletion_progress(workspace.id, len(data_ids))
+
     permission_api.delete_permission(workspace.read_perm_id)
     permission_api.delete_permission(workspace.write_perm_id)
-    workspace.delete()
+    Workspace.delete_pending(workspace.id)
+    workspace_cache.invalidate_all()
+
+
+def get_deletion_status(workspace_id, user):
+    """ Get the progress of the deletion of a workspace. A workspace that does not exist anymore is reported as
+    deleted (the ids of deleted and unknown workspaces can't be told apart).
+
+    Args:
+        workspace_id:
+        user:
+
+    Returns:
+        dict: pending_delete, deleted, number of data to unassign (total, 0 until counted) and already unassigned
+        (done), None once deleted
+    """
+    try:
+        workspace = Workspace.get_by_id(workspace_id, include_pending_delete=True)
+    except exceptions.DoesNotExist:
+        return {'pending_delete': False, 'deleted': True, 'total': None, 'done': None}
+
+    return _get_deletion_status(workspace, user)
+
+
+@metrics.timed_access_control(can_delete_workspace)
+def _get_deletion_status(workspace, user):
+    """ Get the progress of the deletion of a workspace.
+
+    Args:
+        workspace:
+        user:
+
+    Returns:
+    """
+    return {'pending_delete': workspace.pending_delete,
+            'deleted': False,
+            'total': workspace.deletion_total,
+            'done': workspace.deletion_done}
 
 
 def set_title(workspace, new_title):
@@ -56,7 +151,9 @@ def set_title(workspace, new_title):
     Returns:
     """
     workspace.title = new_title
-    workspace.save()
+    workspace.save_object()
+    # the titles are cached in the workspace choices of the users
+    workspace_cache.invalidate_all()
 
 
 def get_all():
@@ -94,17 +191,96 @@ def get_by_id(workspace_id):
 
 
 def get_by_id_list(list_workspace_id):
-    """ Return a list of workspaces with the given id list.
+    """ Return a list of workspaces with the given id list, in the same order.
 
     Args:
         list_workspace_id
 
     Returns:
     """
-    list_workspace = []
-    for workspace_id in list_workspace_id:
-        list_workspace.append(Workspace.get_by_id(workspace_id))
-    return list_workspace
+    return Workspace.get_by_id_list(list_workspace_id)
+
+
+def _get_workspace_permission_ids(user):
+    """ Get the ids of the workspace permissions of the given user (read, write, public), from the shared cache.
+    An anonymous user only has the public permissions.
+
+    Args:
+        user
+
+    Returns:
+        WorkspacePermissionIds
+
+    """
+    if user.is_anonymous():
+        public_permissions = frozenset(permission_api.get_all_public_workspace_permission())
+        return permission_api.WorkspacePermissionIds(read=public_permissions,
+                                                     write=frozenset(),
+                                                     public=public_permissions)
+
+    return workspace_cache.get_or_set_user_value(user.id, 'workspace_permission_ids',
+                                                 lambda: permission_api.get_workspace_permission_ids(str(user.id)))
+
+
+def get_workspace_access_by_user(user):
+    """ Get the ids of the workspaces the given user owns, can read, can write, and of the public ones, in one pass.
+    Only the id, the owner and the permission ids of the workspaces are loaded.
+
+    Args:
+        user
+
+    Returns:
+        WorkspaceAccess
+
+    """
+    permission_ids = _get_workspace_permission_ids(user)
+    workspaces = Workspace.get_all_workspaces_with_access_by_user_id(user.id,
+                                                                     permission_ids.read,
+                                                                     permission_ids.write)
+    return WorkspaceAccess(user.id, workspaces, permission_ids)
+
+
+def _get_accessible_workspace_ids_by_user(user):
+    """ Get the ids of the workspaces the given user can read and write, from the shared cache.
+
+    Args:
+        user
+
+    Returns:
+        dict: sets of workspace ids under the 'read' and 'write' keys
+
+    """
+    def _compute():
+        access = get_workspace_access_by_user(user)
+        return {'read': access.readable_ids, 'write': access.writable_ids}
+
+    return workspace_cache.get_or_set_user_value(user.id, 'workspace_ids', _compute)
+
+
+def get_readable_workspace_ids_by_user(user):
+    """ Get the ids of the workspaces the given user can read (owned, shared or public).
+
+    Args:
+        user
+
+    Returns:
+        set: workspace ids
+
+    """
+    return _get_accessible_workspace_ids_by_user(user)['read']
+
+
+def get_writable_workspace_ids_by_user(user):
+    """ Get the ids of the workspaces the given user can write (owned or shared).
+
+    Args:
+        user
+
+    Returns:
+        set: workspace ids
+
+    """
+    return _get_accessible_workspace_ids_by_user(user)['write']
 
 
 def get_all_workspaces_with_read_access_by_user(user):
@@ -116,8 +292,11 @@ def get_all_workspaces_with_read_access_by_user(user):
     Returns:
 
     """
-    read_permissions = permission_api.get_all_workspace_permissions_user_can_read(str(user.id))
-    return Workspace.get_all_workspaces_with_read_access_by_user_id(user.id, read_permissions)
+    if settings.WORKSPACE_DENORMALIZED_ACL:
+        return Workspace.get_all_workspaces_with_read_access_by_acl(user.id, group_utils.get_group_ids_by_user(user))
+
+    return Workspace.get_all_workspaces_with_read_access_by_user_id(user.id,
+                                                                    list(_get_workspace_permission_ids(user).read))
 
 
 def get_all_workspaces_with_write_access_by_user(user):
@@ -129,8 +308,29 @@ def get_all_workspaces_with_write_access_by_user(user):
     Returns:
 
     """
-    write_permissions = permission_api.get_all_workspace_permissions_user_can_write(str(user.id))
-    return Workspace.get_all_workspaces_with_write_access_by_user_id(user.id, write_permissions)
+    if settings.WORKSPACE_DENORMALIZED_ACL:
+        return Workspace.get_all_workspaces_with_write_access_by_acl(user.id, group_utils.get_group_ids_by_user(user))
+
+    return Workspace.get_all_workspaces_with_write_access_by_user_id(user.id,
+                                                                     list(_get_workspace_permission_ids(user).write))
+
+
+def get_workspace_choices_with_write_access_by_user(user):
+    """ Get the id and title of the workspaces with write access for the given user, sorted by title
+    (case insensitive) by the database. The choices are cached for the user.
+
+    Args:
+        user
+
+    Returns:
+        list: (workspace id, title) tuples
+
+    """
+    def _compute():
+        return [(str(workspace_id), title) for workspace_id, title in
+                get_all_workspaces_with_write_access_by_user(user).order_by('title_key').values_list('id', 'title')]
+
+    return workspace_cache.get_or_set_user_value(user.id, 'write_choices', _compute)
 
 
 def get_all_workspaces_with_read_access_not_owned_by_user(user):
@@ -142,7 +342,10 @@ def get_all_workspaces_with_read_access_not_owned_by_user(user):
     Returns:
 
     """
-    read_permissions = permission_api.get_all_workspace_permissions_user_can_read(str(user.id))
+    if settings.WORKSPACE_DENORMALIZED_ACL:
+        return get_all_workspaces_with_read_access_by_user(user).filter(owner__ne=str(user.id))
+
+    read_permissions = list(_get_workspace_permission_ids(user).read)
     return Workspace.get_all_workspaces_with_read_access_not_owned_by_user_id(user.id, read_permissions)
 
 
@@ -155,7 +358,10 @@ def get_all_workspaces_with_write_access_not_owned_by_user_id(user):
     Returns:
 
     """
-    write_permissions = permission_api.get_all_workspace_permissions_user_can_write(str(user.id))
+    if settings.WORKSPACE_DENORMALIZED_ACL:
+        return get_all_workspaces_with_write_access_by_user(user).filter(owner__ne=str(user.id))
+
+    write_permissions = list(_get_workspace_permission_ids(user).write)
     return Workspace.get_all_workspaces_with_write_access_not_owned_by_user_id(user.id, write_permissions)
 
 
@@ -167,6 +373,9 @@ def get_all_other_public_workspaces(user):
     Returns:
 
     """
+    if settings.WORKSPACE_DENORMALIZED_ACL:
+        return Workspace.get_all_other_public_workspaces_by_acl(user.id)
+
     public_permissions = permission_api.get_all_public_workspace_permission()
     return Workspace.get_all_other_public_workspaces(user.id, public_permissions)
 
@@ -180,6 +389,9 @@ def get_non_public_workspace_owned_by_user(user):
     Returns:
 
     """
+    if settings.WORKSPACE_DENORMALIZED_ACL:
+        return Workspace.get_non_public_workspace_owned_by_acl(user.id)
+
     public_permissions = permission_api.get_all_public_workspace_permission()
     return Workspace.get_non_public_workspace_owned_by_user_id(user.id, public_permissions)
 
@@ -193,10 +405,107 @@ def get_public_workspaces_owned_by_user(user):
     Returns:
 
     """
+    if settings.WORKSPACE_DENORMALIZED_ACL:
+        return Workspace.get_public_workspaces_owned_by_acl(user.id)
+
     public_permissions = permission_api.get_all_public_workspace_permission()
     return Workspace.get_public_workspaces_owned_by_user_id(user.id, public_permissions)
 
 
+def _get_page(queryset, cursor, limit, only_id_and_title):
+    """ Return a page of the workspaces of the queryset.
+
+    Args:
+        queryset
+        cursor
+        limit
+        only_id_and_title
+
+    Returns:
+    """
+    return get_keyset_page(queryset, cursor=cursor, limit=limit,
+                           fields=('id', 'title') if only_id_and_title else None)
+
+
+def get_all_paginated(cursor=None, limit=25, only_id_and_title=False):
+    """ Get a page of all workspaces.
+
+    Args:
+        cursor: cursor of the page (next_cursor of the previous page), None for the first page
+        limit: number of workspaces per page
+        only_id_and_title: load only the id and the title of the workspaces
+
+    Returns:
+        Page
+
+    """
+    return _get_page(get_all(), cursor, limit, only_id_and_title)
+
+
+def get_all_by_owner_paginated(user, cursor=None, limit=25, only_id_and_title=False):
+    """ Get a page of the workspaces created by the given user.
+
+    Args:
+        user
+        cursor: cursor of the page (next_cursor of the previous page), None for the first page
+        limit: number of workspaces per page
+        only_id_and_title: load only the id and the title of the workspaces
+
+    Returns:
+        Page
+
+    """
+    return _get_page(get_all_by_owner(user), cursor, limit, only_id_and_title)
+
+
+def get_all_workspaces_with_read_access_by_user_paginated(user, cursor=None, limit=25, only_id_and_title=False):
+    """ Get a page of the workspaces with read access for the given user.
+
+    Args:
+        user
+        cursor: cursor of the page (next_cursor of the previous page), None for the first page
+        limit: number of workspaces per page
+        only_id_and_title: load only the id and the title of the workspaces
+
+    Returns:
+        Page
+
+    """
+    return _get_page(get_all_workspaces_with_read_access_by_user(user), cursor, limit, only_id_and_title)
+
+
+def get_all_workspaces_with_write_access_by_user_paginated(user, cursor=None, limit=25, only_id_and_title=False):
+    """ Get a page of the workspaces with write access for the given user.
+
+    Args:
+        user
+        cursor: cursor of the page (next_cursor of the previous page), None for the first page
+        limit: number of workspaces per page
+        only_id_and_title: load only the id and the title of the workspaces
+
+    Returns:
+        Page
+
+    """
+    return _get_page(get_all_workspaces_with_write_access_by_user(user), cursor, limit, only_id_and_title)
+
+
+def get_all_other_public_workspaces_paginated(user, cursor=None, limit=25, only_id_and_title=False):
+    """ Get a page of the public workspaces not owned by the given user.
+
+    Args:
+        user
+        cursor: cursor of the page (next_cursor of the previous page), None for the first page
+        limit: number of workspaces per page
+        only_id_and_title: load only the id and the title of the workspaces
+
+    Returns:
+        Page
+
+    """
+    return _get_page(get_all_other_public_workspaces(user), cursor, limit, only_id_and_title)
+
+
 def is_workspace_public(workspace):
     """ Check if the workspace is public.
 
@@ -205,6 +514,9 @@ def is_workspace_public(workspace):
 
     Return:
     """
+    if settings.WORKSPACE_DENORMALIZED_ACL:
+        return workspace.is_public
+
     return permission_api.is_workspace_public(workspace.read_perm_id)
 
 
@@ -216,12 +528,83 @@ def set_workspace_public(workspace):
 
     Return:
     """
-    permission_api.add_permission_to_group(group_api.get_anonymous_group(), workspace.read_perm_id)
-    permission_api.add_permission_to_group(group_api.get_default_group(), workspace.read_perm_id)
+    if workspace.pending_delete:
+        raise exceptions.ApiError("The workspace is being deleted.")
+
+    with transaction.atomic():
+        permission_api.add_permission_to_group(group_utils.get_anonymous_group(), workspace.read_perm_id)
+        permission_api.add_permission_to_group(group_utils.get_default_group(), workspace.read_perm_id)
+        if settings.WORKSPACE_DENORMALIZED_ACL:
+            workspace_id = workspace.id
+            transaction.on_commit(lambda: Workspace.set_public_acl(workspace_id, True))
+
+
+def _update_acl(workspace, acl_field, ids, add):
+    """ Update a denormalized access control list of the workspace, if enabled, once the permission change is
+    committed (now if no atomic block is active), so that a rolled back change is never written to Mongo.
+    Mongo is not part of the transaction: if the update fails, or the process stops after the commit, the list
+    drifts from the permissions until the workspace_acl_reconcile command is run (its --check option reports it).
+
+    Args:
+        workspace
+        acl_field
+        ids
+        add: add the ids if True, remove them otherwise
+
+    Return:
+    """
+    if not settings.WORKSPACE_DENORMALIZED_ACL:
+        return
+
+    workspace_id = workspace.id
+    ids = [str(id_) for id_ in ids]
+    if add:
+        transaction.on_commit(lambda: Workspace.add_to_acl(workspace_id, acl_field, ids))
+    else:
+        transaction.on_commit(lambda: Workspace.remove_from_acl(workspace_id, acl_field, ids))
 
 
+def _update_acl_rights(workspace, user_or_group, ids, read, write, add):
+    """ Update the denormalized read and/or write access control lists of the workspace, if enabled.
+
+    Args:
+        workspace
+        user_or_group: 'user' or 'group'
+        ids
+        read: update the read list
+        write: update the write list
+        add: add the ids if True, remove them otherwise
+
+    Return:
+    """
+    if read:
+        _update_acl(workspace, 'reader_' + user_or_group + '_ids', ids, add)
+    if write:
+        _update_acl(workspace, 'writer_' + user_or_group + '_ids', ids, add)
+
+
+def _get_permission_ids(workspace, read, write):
+    """ Get the ids of the read and/or write permissions of the workspace.
+
+    Args:
+        workspace
+        read
+        write
+
+    Return:
+    """
+    permission_ids = []
+    if read:
+        permission_ids.append(workspace.read_perm_id)
+    if write:
+        permission_ids.append(workspace.write_perm_id)
+    return permission_ids
+
+
+@request_cache.memoize(lambda workspace, user: (str(workspace.id), str(user.id)))
 def can_user_read_workspace(workspace, user):
-    """ Check if user has read permission on workspace.
+    """ Check if user has read permission on workspace, public workspaces included.
+    Same rules as check_if_user_can_read_or_write_workspace, without the write access.
 
     Args:
         workspace
@@ -229,8 +612,19 @@ def can_user_read_workspace(workspace, user):
 
     Return:
     """
-    permission_label = permission_api.get_permission_label(workspace.read_perm_id)
-    return str(workspace.owner) == str(user.id) or user.has_perm(permission_label)
+    if workspace.pending_delete:
+        return False
+
+    if str(workspace.owner) == str(user.id):
+        return True
+
+    if settings.WORKSPACE_DENORMALIZED_ACL:
+        return workspace.is_public or _is_user_in_acl(workspace, user,
+                                                      workspace.reader_user_ids,
+                                                      workspace.reader_group_ids)
+
+    return permission_api.is_workspace_public(workspace.read_perm_id) or \
+        permission_api.check_if_user_has_any_perm(user, [workspace.read_perm_id])
 
 
 def can_user_write_workspace(workspace, user):
@@ -242,8 +636,71 @@ def can_user_write_workspace(workspace, user):
 
     Return:
     """
-    permission_label = permission_api.get_permission_label(workspace.write_perm_id)
-    return str(workspace.owner) == str(user.id) or user.has_perm(permission_label)
+    return check_if_user_can_write_workspace(workspace, user)
+
+
+@request_cache.memoize(lambda workspace, user: (str(workspace.id), str(user.id)))
+def check_if_user_can_write_workspace(workspace, user):
+    """ Check if user can write in the workspace. The cost does not depend on the number of workspaces of the user.
+
+    Args:
+        workspace
+        user
+
+    Return:
+    """
+    if workspace.pending_delete:
+        return False
+
+    if str(workspace.owner) == str(user.id):
+        return True
+
+    if settings.WORKSPACE_DENORMALIZED_ACL:
+        return _is_user_in_acl(workspace, user, workspace.writer_user_ids, workspace.writer_group_ids)
+
+    return permission_api.check_if_user_has_any_perm(user, [workspace.write_perm_id])
+
+
+@request_cache.memoize(lambda workspace, user: (str(workspace.id), str(user.id)))
+def check_if_user_can_read_or_write_workspace(workspace, user):
+    """ Check if user can read or write in the workspace, public workspaces included.
+    The cost does not depend on the number of workspaces of the user.
+
+    Args:
+        workspace
+        user
+
+    Return:
+    """
+    if workspace.pending_delete:
+        return False
+
+    if str(workspace.owner) == str(user.id):
+        return True
+
+    if settings.WORKSPACE_DENORMALIZED_ACL:
+        return workspace.is_public or _is_user_in_acl(workspace, user,
+                                                      workspace.reader_user_ids + workspace.writer_user_ids,
+                                                      workspace.reader_group_ids + workspace.writer_group_ids)
+
+    return permission_api.is_workspace_public(workspace.read_perm_id) or \
+        permission_api.check_if_user_has_any_perm(user, [workspace.read_perm_id, workspace.write_perm_id])
+
+
+def _is_user_in_acl(workspace, user, user_ids, group_ids):
+    """ Check if the user, or one of his groups, is in the denormalized access control lists of the workspace.
+
+    Args:
+        workspace
+        user
+        user_ids
+        group_ids
+
+    Return:
+    """
+    if str(user.id) in user_ids:
+        return True
+    return len(set(group_ids) & set(group_utils.get_group_ids_by_user(user))) > 0
 
 
 def can_group_read_workspace(workspace, group):
@@ -272,7 +729,7 @@ def can_group_write_workspace(workspace, group):
     return permission_api.check_if_group_has_perm(group, permission)
 
 
-@access_control(is_workspace_owner)
+@metrics.timed_access_control(is_workspace_owner)
 def get_list_user_can_write_workspace(workspace, user):
     """ Get list of users that have write access to workspace.
 
@@ -286,7 +743,7 @@ def get_list_user_can_write_workspace(workspace, user):
     return list(write_permission.user_set.all())
 
 
-@access_control(is_workspace_owner)
+@metrics.timed_access_control(is_workspace_owner)
 def get_list_user_can_read_workspace(workspace, user):
     """  Get list of users that have read access to workspace.
 
@@ -300,6 +757,7 @@ def get_list_user_can_read_workspace(workspace, user):
     return list(read_permission.user_set.all())
 
 
+@metrics.timed_access_control(is_workspace_owner)
 def get_list_user_can_access_workspace(workspace, user):
     """ Get the list of users that have either read or write access to workspace.
 
@@ -309,18 +767,106 @@ def get_list_user_can_access_workspace(workspace, user):
 
     Returns:
     """
+    return list(permission_api.get_all_users_with_perms(_get_permission_ids(workspace, True, True)))
+
+
+@metrics.timed_access_control(is_workspace_owner)
+def get_acl_matrix(workspace, user):
+    """ Get the users and groups with access to the workspace, and their rights.
+    The anonymous and default groups are not listed. One query per type of principal.
+
+    Args:
+        workspace
+        user
+
+    Returns:
+        dict: lists of users and groups (object_id, object_name, can_read, can_write), sorted by name
+    """
+    return {'users': [_format_acl_row(row) for row in get_queryset_user_acl(workspace, user)],
+            'groups': [_format_acl_row(row) for row in get_queryset_group_acl(workspace, user)]}
+
+
+@metrics.timed_access_control(is_workspace_owner)
+def get_queryset_user_acl(workspace, user):
+    """ Get the users with access to the workspace, and their rights, as a query.
+
+    Args:
+        workspace
+        user
+
+    Returns:
+        queryset of dict: object_id, object_name, can_read (0 or 1), can_write (0 or 1), sorted by name
+    """
+    return permission_api.get_users_perms_matrix(workspace.read_perm_id, workspace.write_perm_id)
+
+
+@metrics.timed_access_control(is_workspace_owner)
+def get_queryset_group_acl(workspace, user):
+    """ Get the groups with access to the workspace, and their rights, as a query.
+    The anonymous and default groups are not listed.
+
+    Args:
+        workspace
+        user
+
+    Returns:
+        queryset of dict: object_id, object_name, can_read (0 or 1), can_write (0 or 1), sorted by name
+    """
+    special_group_ids = [group.id for group in (group_utils.get_anonymous_group(), group_utils.get_default_group())
+                         if group is not None]
+    return permission_api.get_groups_perms_matrix(workspace.read_perm_id, workspace.write_perm_id)\
+        .exclude(object_id__in=special_group_ids)
+
+
+def get_acl_page(acl_queryset, start=0, length=10, search='', descending=False, can_read=None, can_write=None):
+    """ Get a page of an access control query (get_queryset_user_acl or get_queryset_group_acl).
+    Filters, sort and pagination are done by the database.
+
+    Args:
+        acl_queryset
+        start: index of the first row
+        length: number of rows, None for all the rows
+        search: part of the name, case insensitive
+        descending: sort by descending name
+        can_read: only keep the rows with (True) or without (False) read access, None for all
+        can_write: only keep the rows with (True) or without (False) write access, None for all
+
+    Returns:
+        int, int, list: number of rows, number of rows after filtering, rows of the page
+    """
+    records_total = acl_queryset.count()
 
-    # List all users that have the read permission of the workspace
-    all_users_read = get_list_user_can_read_workspace(workspace, user)
+    if search:
+        acl_queryset = acl_queryset.filter(object_name__icontains=search)
+    if can_read is not None:
+        acl_queryset = acl_queryset.filter(can_read=1 if can_read else 0)
+    if can_write is not None:
+        acl_queryset = acl_queryset.filter(can_write=1 if can_write else 0)
+    records_filtered = acl_queryset.count() if search or can_read is not None or can_write is not None \
+        else records_total
 
-    # List all users that have the write permission of the workspace
-    all_users_write = get_list_user_can_write_workspace(workspace, user)
+    if descending:
+        acl_queryset = acl_queryset.order_by(Lower('object_name').desc())
+    rows = acl_queryset[start:] if length is None else acl_queryset[start:start + length]
 
-    # Return the union without doublons of the two lists.
-    return list(set(all_users_read + all_users_write))
+    return records_total, records_filtered, [_format_acl_row(row) for row in rows]
 
 
-@access_control(is_workspace_owner)
+def _format_acl_row(row):
+    """ Format a row of the access control matrix.
+
+    Args:
+        row
+
+    Returns:
+    """
+    return {'object_id': row['object_id'],
+            'object_name': row['object_name'],
+            'can_read': row['can_read'] == 1,
+            'can_write': row['can_write'] == 1}
+
+
+@metrics.timed_access_control(is_workspace_owner)
 def get_list_user_with_no_access_workspace(workspace, user):
     """ Get list of users that don't have any access to the workspace.
 
@@ -333,7 +879,44 @@ def get_list_user_with_no_access_workspace(workspace, user):
     return user_api.get_all_users_except_list(get_list_user_can_access_workspace(workspace, user))
 
 
-@access_control(is_workspace_owner_to_perform_action_for_others)
+@metrics.timed_access_control(is_workspace_owner)
+def get_queryset_user_with_no_access_workspace(workspace, user):
+    """ Get the users, other than the owner, that don't have any access to the workspace, sorted by username.
+    Exclusion and sort are done by the database.
+
+    Args:
+         workspace
+         user
+
+    Returns:
+    """
+    return permission_api.get_all_users_without_perms(_get_permission_ids(workspace, True, True))\
+        .exclude(pk=workspace.owner)\
+        .order_by(Lower('username'))
+
+
+def search_user_with_no_access_workspace(workspace, user, search='', start=0, length=20):
+    """ Search the users that don't have any access to the workspace, by username.
+
+    Args:
+         workspace
+         user
+         search: part of the username, case insensitive
+         start: index of the first result
+         length: number of results
+
+    Returns:
+        list, bool: (id, username) of the users, True if there are more results
+    """
+    queryset = get_queryset_user_with_no_access_workspace(workspace, user)
+    if search:
+        queryset = queryset.filter(username__icontains=search)
+
+    results = list(queryset.values_list('id', 'username')[start:start + length + 1])
+    return results[:length], len(results) > length
+
+
+@metrics.timed_access_control(is_workspace_owner_to_perform_action_for_others)
 def add_user_read_access_to_workspace(workspace, new_user, user):
     """ Add to new user the read access to workspace.
 
@@ -343,10 +926,12 @@ def add_user_read_access_to_workspace(workspace, new_user, user):
           user
     Returns:
     """
-    permission_api.add_permission_to_user(new_user, workspace.read_perm_id)
+    with transaction.atomic():
+        permission_api.add_permission_to_user(new_user, workspace.read_perm_id)
+        _update_acl(workspace, 'reader_user_ids', [new_user.id], add=True)
 
 
-@access_control(is_workspace_owner_to_perform_action_for_others)
+@metrics.timed_access_control(is_workspace_owner_to_perform_action_for_others)
 def add_user_write_access_to_workspace(workspace, new_user, user):
     """ Add to new user the write access to workspace.
 
@@ -356,10 +941,12 @@ def add_user_write_access_to_workspace(workspace, new_user, user):
           user
     Returns:
     """
-    permission_api.add_permission_to_user(new_user, workspace.write_perm_id)
+    with transaction.atomic():
+        permission_api.add_permission_to_user(new_user, workspace.write_perm_id)
+        _update_acl(workspace, 'writer_user_ids', [new_user.id], add=True)
 
 
-@access_control(is_workspace_owner_to_perform_action_for_others)
+@metrics.timed_access_control(is_workspace_owner_to_perform_action_for_others)
 def remove_user_read_access_to_workspace(workspace, new_user, user):
     """ Remove to new user the read access to workspace.
 
@@ -369,10 +956,12 @@ def remove_user_read_access_to_workspace(workspace, new_user, user):
           user
     Returns:
     """
-    permission_api.remove_permission_to_user(new_user, workspace.read_perm_id)
+    with transaction.atomic():
+        permission_api.remove_permission_to_user(new_user, workspace.read_perm_id)
+        _update_acl(workspace, 'reader_user_ids', [new_user.id], add=False)
 
 
-@access_control(is_workspace_owner_to_perform_action_for_others)
+@metrics.timed_access_control(is_workspace_owner_to_perform_action_for_others)
 def remove_user_write_access_to_workspace(workspace, new_user, user):
     """ Remove to new user the write access to workspace.
 
@@ -382,10 +971,48 @@ def remove_user_write_access_to_workspace(workspace, new_user, user):
           user
     Returns:
     """
-    permission_api.remove_permission_to_user(new_user, workspace.write_perm_id)
+    with transaction.atomic():
+        permission_api.remove_permission_to_user(new_user, workspace.write_perm_id)
+        _update_acl(workspace, 'writer_user_ids', [new_user.id], add=False)
+
+
+@metrics.timed_access_control(is_workspace_owner_to_perform_bulk_action_for_others)
+def add_users_access_to_workspace(workspace, list_users, read, write, user):
+    """ Add to users the read and/or write access to workspace, in one transaction.
+
+    Args:
+          workspace
+          list_users
+          read: add the read access
+          write: add the write access
+          user
+    Returns:
+        int: number of users given an access they did not have
+    """
+    with transaction.atomic():
+        nb_granted = permission_api.add_permissions_to_users(list_users, _get_permission_ids(workspace, read, write))
+        _update_acl_rights(workspace, 'user', [new_user.id for new_user in list_users], read, write, add=True)
+    return nb_granted
+
+
+@metrics.timed_access_control(is_workspace_owner_to_perform_bulk_action_for_others)
+def remove_users_access_to_workspace(workspace, list_users, read, write, user):
+    """ Remove to users the read and/or write access to workspace, in one transaction.
+
+    Args:
+          workspace
+          list_users
+          read: remove the read access
+          write: remove the write access
+          user
+    Returns:
+    """
+    with transaction.atomic():
+        permission_api.remove_permissions_to_users(list_users, _get_permission_ids(workspace, read, write))
+        _update_acl_rights(workspace, 'user', [new_user.id for new_user in list_users], read, write, add=False)
 
 
-@access_control(is_workspace_owner)
+@metrics.timed_access_control(is_workspace_owner)
 def get_list_group_can_write_workspace(workspace, user):
     """ Get the list of groups that have write access to workspace.
 
@@ -401,7 +1028,7 @@ def get_list_group_can_write_workspace(workspace, user):
     return list(write_permission.group_set.all())
 
 
-@access_control(is_workspace_owner)
+@metrics.timed_access_control(is_workspace_owner)
 def get_list_group_can_read_workspace(workspace, user):
     """ Get the list of groups that have read access to workspace.
 
@@ -417,6 +1044,7 @@ def get_list_group_can_read_workspace(workspace, user):
     return list(read_permission.group_set.all())
 
 
+@metrics.timed_access_control(is_workspace_owner)
 def get_list_group_can_access_workspace(workspace, user):
     """ Get the list of groups that have either read or write access to workspace.
 
@@ -426,18 +1054,10 @@ def get_list_group_can_access_workspace(workspace, user):
 
     Returns:
     """
-
-    # List all groups that have the read permission of the workspace
-    all_groups_read = get_list_group_can_read_workspace(workspace, user)
-
-    # List all groups that have the write permission of the workspace
-    all_groups_write = get_list_group_can_write_workspace(workspace, user)
-
-    # Return the union without doublons of the two lists.
-    return list(set(all_groups_read + all_groups_write))
+    return list(permission_api.get_all_groups_with_perms(_get_permission_ids(workspace, True, True)))
 
 
-@access_control(is_workspace_owner)
+@metrics.timed_access_control(is_workspace_owner)
 def get_list_group_with_no_access_workspace(workspace, user):
     """ Get list of groups that don't have any access to the workspace.
 
@@ -450,7 +1070,46 @@ def get_list_group_with_no_access_workspace(workspace, user):
     return group_api.get_all_groups_except_list(get_list_group_can_access_workspace(workspace, user))
 
 
-@access_control(is_workspace_owner_to_perform_action_for_others)
+@metrics.timed_access_control(is_workspace_owner)
+def get_queryset_group_with_no_access_workspace(workspace, user):
+    """ Get the groups, other than the anonymous and default groups, that don't have any access to the workspace,
+    sorted by name. Exclusion and sort are done by the database.
+
+    Args:
+         workspace
+         user
+
+    Returns:
+    """
+    special_group_ids = [group.id for group in (group_utils.get_anonymous_group(), group_utils.get_default_group())
+                         if group is not None]
+    return permission_api.get_all_groups_without_perms(_get_permission_ids(workspace, True, True))\
+        .exclude(pk__in=special_group_ids)\
+        .order_by(Lower('name'))
+
+
+def search_group_with_no_access_workspace(workspace, user, search='', start=0, length=20):
+    """ Search the groups that don't have any access to the workspace, by name.
+
+    Args:
+         workspace
+         user
+         search: part of the name, case insensitive
+         start: index of the first result
+         length: number of results
+
+    Returns:
+        list, bool: (id, name) of the groups, True if there are more results
+    """
+    queryset = get_queryset_group_with_no_access_workspace(workspace, user)
+    if search:
+        queryset = queryset.filter(name__icontains=search)
+
+    results = list(queryset.values_list('id', 'name')[start:start + length + 1])
+    return results[:length], len(results) > length
+
+
+@metrics.timed_access_control(is_workspace_owner_to_perform_action_for_others)
 def add_group_read_access_to_workspace(workspace, new_group, user):
     """ Add to new group the read access to workspace.
 
@@ -460,10 +1119,12 @@ def add_group_read_access_to_workspace(workspace, new_group, user):
           user
     Returns:
     """
-    permission_api.add_permission_to_group(new_group, workspace.read_perm_id)
+    with transaction.atomic():
+        permission_api.add_permission_to_group(new_group, workspace.read_perm_id)
+        _update_acl(workspace, 'reader_group_ids', [new_group.id], add=True)
 
 
-@access_control(is_workspace_owner_to_perform_action_for_others)
+@metrics.timed_access_control(is_workspace_owner_to_perform_action_for_others)
 def add_group_write_access_to_workspace(workspace, new_group, user):
     """ Add to new group the write access to workspace.
 
@@ -473,10 +1134,48 @@ def add_group_write_access_to_workspace(workspace, new_group, user):
           user
     Returns:
     """
-    permission_api.add_permission_to_group(new_group, workspace.write_perm_id)
+    with transaction.atomic():
+        permission_api.add_permission_to_group(new_group, workspace.write_perm_id)
+        _update_acl(workspace, 'writer_group_ids', [new_group.id], add=True)
+
+
+@metrics.timed_access_control(is_workspace_owner_to_perform_bulk_action_for_others)
+def add_groups_access_to_workspace(workspace, list_groups, read, write, user):
+    """ Add to groups the read and/or write access to workspace, in one transaction.
+
+    Args:
+          workspace
+          list_groups
+          read: add the read access
+          write: add the write access
+          user
+    Returns:
+        int: number of groups given an access they did not have
+    """
+    with transaction.atomic():
+        nb_granted = permission_api.add_permissions_to_groups(list_groups, _get_permission_ids(workspace, read, write))
+        _update_acl_rights(workspace, 'group', [new_group.id for new_group in list_groups], read, write, add=True)
+    return nb_granted
+
+
+@metrics.timed_access_control(is_workspace_owner_to_perform_bulk_action_for_others)
+def remove_groups_access_to_workspace(workspace, list_groups, read, write, user):
+    """ Remove to groups the read and/or write access to workspace, in one transaction.
+
+    Args:
+          workspace
+          list_groups
+          read: remove the read access
+          write: remove the write access
+          user
+    Returns:
+    """
+    with transaction.atomic():
+        permission_api.remove_permissions_to_groups(list_groups, _get_permission_ids(workspace, read, write))
+        _update_acl_rights(workspace, 'group', [group.id for group in list_groups], read, write, add=False)
 
 
-@access_control(is_workspace_owner_to_perform_action_for_others)
+@metrics.timed_access_control(is_workspace_owner_to_perform_action_for_others)
 def remove_group_read_access_to_workspace(workspace, group, user):
     """ Remove to new group the read access to workspace.
 
@@ -486,10 +1185,12 @@ def remove_group_read_access_to_workspace(workspace, group, user):
           user
     Returns:
     """
-    permission_api.remove_permission_to_group(group, workspace.read_perm_id)
+    with transaction.atomic():
+        permission_api.remove_permission_to_group(group, workspace.read_perm_id)
+        _update_acl(workspace, 'reader_group_ids', [group.id], add=False)
 
 
-@access_control(is_workspace_owner_to_perform_action_for_others)
+@metrics.timed_access_control(is_workspace_owner_to_perform_action_for_others)
 def remove_group_write_access_to_workspace(workspace, group, user):
     """ Remove to new group the write access to workspace.
 
@@ -499,4 +1200,6 @@ def remove_group_write_access_to_workspace(workspace, group, user):
           user
     Returns:
     """
-    permission_api.remove_permission_to_group(group, workspace.write_perm_id)
+    with transaction.atomic():
+        permission_api.remove_permission_to_group(group, workspace.write_perm_id)
+        _update_acl(workspace, 'writer_group_ids', [group.id], add=False)
@@ -0,0 +1,236 @@
+"""
+    Cache of the workspace access of users, shared between workers through the Django cache framework.
+
+    Cached values are stored under versioned keys. Changing the version of a user (or the global version)
+    makes all the values previously cached for this user (or for everyone) unreachable.
+    The ids of the public permissions have their own version.
+"""
+import uuid
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed
+
+from core_workspace_app import settings
+from core_workspace_app.utils import group as group_utils
+from core_workspace_app.utils import request_cache
+
+GLOBAL_VERSION_KEY = 'core_workspace_app:access:version'
+USER_VERSION_KEY = 'core_workspace_app:access:version:user:{0}'
+USER_VALUE_KEY = 'core_workspace_app:access:{0}:{1}:user:{2}:{3}'
+PUBLIC_VERSION_KEY = 'core_workspace_app:access:version:public_permissions'
+PUBLIC_PERMISSIONS_KEY = 'core_workspace_app:access:public_permissions:{0}'
+
+
+def _get_cache():
+    """ Return the configured cache, or None if the cache is disabled.
+
+    Returns:
+    """
+    if settings.WORKSPACE_ACCESS_CACHE is None:
+        return None
+    return caches[settings.WORKSPACE_ACCESS_CACHE]
+
+
+def _get_version(cache, versions, key):
+    """ Return the version stored under the key, create it if it does not exist.
+
+    Args:
+        cache:
+        versions: versions already fetched
+        key:
+
+    Returns:
+    """
+    version = versions.get(key)
+    if version is None:
+        # add does not overwrite a version created concurrently by another worker
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def get_or_set_user_value(user_id, name, compute):
+    """ Return the value cached for the user, or compute and cache it.
+
+    Args:
+        user_id: id of the user
+        name: name of the value
+        compute: function without arguments returning the value
+
+    Returns:
+    """
+    cache = _get_cache()
+    if cache is None:
+        return compute()
+
+    user_version_key = USER_VERSION_KEY.format(user_id)
+    versions = cache.get_many([GLOBAL_VERSION_KEY, user_version_key])
+    key = USER_VALUE_KEY.format(_get_version(cache, versions, GLOBAL_VERSION_KEY),
+                                _get_version(cache, versions, user_version_key),
+                                user_id,
+                                name)
+
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, settings.WORKSPACE_ACCESS_CACHE_TIMEOUT)
+    return value
+
+
+def _on_commit(func):
+    """ Run the function once the current transaction is committed, or now if no atomic block is active.
+    Changing a version before the commit would let a concurrent request cache the old access under the new version.
+
+    Args:
+        func: function without arguments
+
+    Returns:
+    """
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(func)
+    else:
+        func()
+
+
+def _set_version(key):
+    """ Set a new version under the key.
+
+    Args:
+        key:
+
+    Returns:
+    """
+    cache = _get_cache()
+    if cache is not None:
+        cache.set(key, uuid.uuid4().hex, None)
+
+
+def invalidate_user(user_id):
+    """ Invalidate the values cached for a user, once the current transaction is committed.
+
+    Args:
+        user_id:
+
+    Returns:
+    """
+    _on_commit(lambda: _set_version(USER_VERSION_KEY.format(user_id)))
+
+
+def invalidate_all():
+    """ Invalidate the values cached for all users, once the current transaction is committed.
+
+    Returns:
+    """
+    _on_commit(lambda: _set_version(GLOBAL_VERSION_KEY))
+
+
+def get_public_permission_ids(compute):
+    """ Return the ids of the public workspace permissions, or compute and cache them.
+
+    Args:
+        compute: function without arguments returning the ids
+
+    Returns:
+        set: permission ids
+    """
+    cache = _get_cache()
+    if cache is None:
+        return set(compute())
+
+    key = PUBLIC_PERMISSIONS_KEY.format(_get_version(cache, {}, PUBLIC_VERSION_KEY))
+    permission_ids = cache.get(key)
+    if permission_ids is None:
+        permission_ids = set(compute())
+        cache.set(key, permission_ids, settings.WORKSPACE_ACCESS_CACHE_TIMEOUT)
+    return permission_ids
+
+
+def invalidate_public_permission_ids():
+    """ Invalidate the cached ids of the public workspace permissions, once the current transaction is committed.
+
+    Returns:
+    """
+    _on_commit(lambda: _set_version(PUBLIC_VERSION_KEY))
+
+
+def _is_public_groups_change(instance, action, reverse, pk_set):
+    """ Check if a change of the permissions of a group can change the public permissions.
+
+    Args:
+        instance: group (forward relation) or permission (reverse relation)
+        action:
+        reverse:
+        pk_set: ids of the related objects
+
+    Returns:
+    """
+    anonymous_group = group_utils.get_anonymous_group()
+    default_group = group_utils.get_default_group()
+    if anonymous_group is None or default_group is None:
+        return False
+
+    public_group_ids = {anonymous_group.pk, default_group.pk}
+    if reverse:
+        return action == 'post_clear' or bool(set(pk_set or ()) & public_group_ids)
+    return instance.pk in public_group_ids
+
+
+def _on_user_relation_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Invalidate the users whose groups or permissions changed. The access memoized for the current request
+    (group ids, permissions, decisions) is cleared right away.
+
+    Args:
+        sender:
+        instance: user (forward relation), group or permission (reverse relation)
+        action:
+        reverse:
+        pk_set: ids of the related objects
+
+    Returns:
+    """
+    if not action.startswith('post_'):
+        return
+
+    request_cache.clear()
+    if not reverse:
+        invalidate_user(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            invalidate_user(user_id)
+    else:
+        invalidate_all()
+
+
+def _on_group_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Invalidate all users when the permissions of a group changed, and the public permission ids if the group
+    is one of the groups making a workspace public.
+
+    Args:
+        sender:
+        instance: group (forward relation) or permission (reverse relation)
+        action:
+        reverse:
+        pk_set: ids of the related objects
+
+    Returns:
+    """
+    if action.startswith('post_'):
+        request_cache.clear()
+        invalidate_all()
+        if _is_public_groups_change(instance, action, reverse, pk_set):
+            invalidate_public_permission_ids()
+
+
+def connect_signals():
+    """ Invalidate the cache when group memberships or permissions change.
+
+    Returns:
+    """
+    m2m_changed.connect(_on_user_relation_changed, sender=User.groups.through,
+                        dispatch_uid='core_workspace_app_user_groups_changed')
+    m2m_changed.connect(_on_user_relation_changed, sender=User.user_permissions.through,
+                        dispatch_uid='core_workspace_app_user_permissions_changed')
+    m2m_changed.connect(_on_group_permissions_changed, sender=Group.permissions.through,
+                        dispatch_uid='core_workspace_app_group_permissions_changed')
@@ -15,9 +15,68 @@ class Workspace(Document):
     """
 
     title = fields.StringField(unique=True, blank=False, regex=NOT_EMPTY_OR_WHITESPACES)
+    title_key = fields.StringField(unique=True, sparse=True, blank=True)
     owner = fields.StringField(blank=False)
     read_perm_id = fields.StringField(blank=False)
     write_perm_id = fields.StringField(blank=False)
+    # Denormalized access control lists (WORKSPACE_DENORMALIZED_ACL)
+    reader_user_ids = fields.ListField(fields.StringField(), blank=True)
+    writer_user_ids = fields.ListField(fields.StringField(), blank=True)
+    reader_group_ids = fields.ListField(fields.StringField(), blank=True)
+    writer_group_ids = fields.ListField(fields.StringField(), blank=True)
+    is_public = fields.BooleanField(default=False)
+    # Deletion in the background: the workspace is hidden while its data are unassigned, then deleted
+    pending_delete = fields.BooleanField(default=False)
+    deletion_total = fields.IntField(default=0)
+    deletion_done = fields.IntField(default=0)
+
+    meta = {
+        'indexes': [
+            # owner listings, with or without a filter on the permissions
+            ('owner', 'read_perm_id'),
+            ('owner', 'write_perm_id'),
+            # permission listings (shared and public workspaces)
+            ('read_perm_id', 'owner'),
+            ('write_perm_id', 'owner'),
+            # denormalized access control lists (multikey)
+            'reader_user_ids',
+            'writer_user_ids',
+            'reader_group_ids',
+            'writer_group_ids',
+            'is_public',
+        ]
+    }
+
+    @staticmethod
+    def normalize_title(title):
+        """ Return the key used to compare titles (case insensitive, like the former title__iexact check).
+
+        Args:
+            title
+
+        Returns:
+        """
+        return title.lower()
+
+    def clean(self):
+        """ Keep the normalized title in sync with the title.
+
+        Returns:
+        """
+        if self.title is not None:
+            self.title_key = Workspace.normalize_title(self.title)
+
+    def save_object(self):
+        """ Custom save. Set the unicity error message.
+
+        Returns:
+        """
+        try:
+            return self.save()
+        except mongoengine_errors.NotUniqueError:
+            raise exceptions.NotUniqueError('A workspace with the same title already exists.')
+        except Exception as ex:
+            raise exceptions.ModelError(ex.message)
 
     @staticmethod
     def check_if_workspace_already_exists(title):
@@ -28,7 +87,7 @@ class Workspace(Document):
 
         Returns:
         """
-        return Workspace.objects.filter(title__iexact=title).exists()
+        return Workspace.objects.filter(title_key=Workspace.normalize_title(title)).exists()
 
     @staticmethod
     def get_all():
@@ -37,7 +96,7 @@ class Workspace(Document):
         Returns:
 
         """
-        return Workspace.objects.all()
+        return Workspace.objects(pending_delete__ne=True).all()
 
     @staticmethod
     def get_all_by_owner(user_id):
@@ -49,26 +108,72 @@ class Workspace(Document):
         Returns:
 
         """
-        return Workspace.objects(owner=str(user_id)).all()
+        return Workspace.objects(owner=str(user_id), pending_delete__ne=True).all()
 
     @staticmethod
-    def get_by_id(workspace_id):
+    def get_by_id(workspace_id, include_pending_delete=False):
         """ Return the workspace with the given id.
 
         Args:
             workspace_id
+            include_pending_delete: also return a workspace pending deletion
 
         Returns:
             Workspace (obj): Workspace object with the given id
 
         """
         try:
-            return Workspace.objects.get(pk=str(workspace_id))
+            if include_pending_delete:
+                return Workspace.objects.get(pk=str(workspace_id))
+            return Workspace.objects.get(pk=str(workspace_id), pending_delete__ne=True)
         except mongoengine_errors.DoesNotExist as e:
             raise exceptions.DoesNotExist(e.message)
         except Exception as ex:
             raise exceptions.ModelError(ex.message)
 
+    @staticmethod
+    def get_by_id_list(list_workspace_id):
+        """ Return the workspaces with the given ids, in the same order, with a single query.
+
+        Args:
+            list_workspace_id
+
+        Returns:
+            list: Workspace objects with the given ids
+
+        """
+        list_workspace_id = [str(workspace_id) for workspace_id in list_workspace_id]
+        try:
+            workspaces_by_id = {str(workspace.id): workspace
+                                for workspace in Workspace.objects(pk__in=list(set(list_workspace_id)),
+                                                                   pending_delete__ne=True)}
+        except Exception as ex:
+            raise exceptions.ModelError(ex.message)
+
+        missing_ids = [workspace_id for workspace_id in list_workspace_id if workspace_id not in workspaces_by_id]
+        if len(missing_ids) > 0:
+            raise exceptions.DoesNotExist('Workspaces not found: ' + ', '.join(missing_ids))
+
+        return [workspaces_by_id[workspace_id] for workspace_id in list_workspace_id]
+
+    @staticmethod
+    def get_all_workspaces_with_access_by_user_id(user_id, read_permissions, write_permissions):
+        """ Get all workspaces owned by the given user id, or with read or write access.
+        Only the id, the owner and the permission ids of the workspaces are loaded.
+
+        Args:
+            user_id
+            read_permissions
+            write_permissions
+
+        Returns:
+
+        """
+        return Workspace.objects(Q(owner=str(user_id))
+                                 | Q(read_perm_id__in=list(read_permissions))
+                                 | Q(write_perm_id__in=list(write_permissions)),
+                                 pending_delete__ne=True).only('id', 'owner', 'read_perm_id', 'write_perm_id')
+
     @staticmethod
     def get_all_workspaces_with_read_access_by_user_id(user_id, read_permissions):
         """ Get all workspaces with read access for the given user id.
@@ -80,7 +185,8 @@ class Workspace(Document):
         Returns:
 
         """
-        return Workspace.objects(Q(owner=str(user_id)) | Q(read_perm_id__in=read_permissions)).all()
+        return Workspace.objects(Q(owner=str(user_id)) | Q(read_perm_id__in=read_permissions),
+                                 pending_delete__ne=True).all()
 
     @staticmethod
     def get_all_workspaces_with_write_access_by_user_id(user_id, write_permissions):
@@ -93,7 +199,8 @@ class Workspace(Document):
         Returns:
 
         """
-        return Workspace.objects(Q(owner=str(user_id)) | Q(write_perm_id__in=write_permissions)).all()
+        return Workspace.objects(Q(owner=str(user_id)) | Q(write_perm_id__in=write_permissions),
+                                 pending_delete__ne=True).all()
 
     @staticmethod
     def get_all_workspaces_with_read_access_not_owned_by_user_id(user_id, read_permissions):
@@ -107,7 +214,8 @@ class Workspace(Document):
 
         """
 
-        return Workspace.objects(owner__ne=str(user_id), read_perm_id__in=read_permissions).all()
+        return Workspace.objects(owner__ne=str(user_id), read_perm_id__in=read_permissions,
+                                 pending_delete__ne=True).all()
 
     @staticmethod
     def get_all_workspaces_with_write_access_not_owned_by_user_id(user_id, write_permissions):
@@ -120,7 +228,8 @@ class Workspace(Document):
         Returns:
 
         """
-        return Workspace.objects(owner__ne=str(user_id), write_perm_id__in=write_permissions).all()
+        return Workspace.objects(owner__ne=str(user_id), write_perm_id__in=write_permissions,
+                                 pending_delete__ne=True).all()
 
     @staticmethod
     def get_all_other_public_workspaces(user_id, public_permissions):
@@ -133,7 +242,8 @@ class Workspace(Document):
         Returns:
 
         """
-        return Workspace.objects(owner__ne=str(user_id), read_perm_id__in=public_permissions).all()
+        return Workspace.objects(owner__ne=str(user_id), read_perm_id__in=public_permissions,
+                                 pending_delete__ne=True).all()
 
     @staticmethod
     def get_non_public_workspace_owned_by_user_id(user_id, public_permissions):
@@ -146,7 +256,8 @@ class Workspace(Document):
         Returns:
 
         """
-        return Workspace.objects(owner=str(user_id), read_perm_id__nin=public_permissions).all()
+        return Workspace.objects(owner=str(user_id), read_perm_id__nin=public_permissions,
+                                 pending_delete__ne=True).all()
 
     @staticmethod
     def get_public_workspaces_owned_by_user_id(user_id, public_permissions):
@@ -159,4 +270,180 @@ class Workspace(Document):
         Returns:
 
         """
-        return Workspace.objects(owner=str(user_id), read_perm_id__in=public_permissions).all()
+        return Workspace.objects(owner=str(user_id), read_perm_id__in=public_permissions,
+                                 pending_delete__ne=True).all()
+
+    @staticmethod
+    def get_all_workspaces_with_read_access_by_acl(user_id, group_ids):
+        """ Get all workspaces with read access for the given user id, from the denormalized access control lists.
+
+        Args:
+            user_id
+            group_ids: ids of the groups of the user
+
+        Returns:
+
+        """
+        return Workspace.objects(Q(owner=str(user_id))
+                                 | Q(reader_user_ids=str(user_id))
+                                 | Q(reader_group_ids__in=[str(group_id) for group_id in group_ids])
+                                 | Q(is_public=True),
+                                 pending_delete__ne=True).all()
+
+    @staticmethod
+    def get_all_workspaces_with_write_access_by_acl(user_id, group_ids):
+        """ Get all workspaces with write access for the given user id, from the denormalized access control lists.
+
+        Args:
+            user_id
+            group_ids: ids of the groups of the user
+
+        Returns:
+
+        """
+        return Workspace.objects(Q(owner=str(user_id))
+                                 | Q(writer_user_ids=str(user_id))
+                                 | Q(writer_group_ids__in=[str(group_id) for group_id in group_ids]),
+                                 pending_delete__ne=True).all()
+
+    @staticmethod
+    def get_all_other_public_workspaces_by_acl(user_id):
+        """ Get all public workspaces not owned by the given user id, from the denormalized public flag.
+
+        Args:
+            user_id
+
+        Returns:
+
+        """
+        return Workspace.objects(owner__ne=str(user_id), is_public=True, pending_delete__ne=True).all()
+
+    @staticmethod
+    def get_non_public_workspace_owned_by_acl(user_id):
+        """ Get the non public workspaces owned by the given user id, from the denormalized public flag.
+
+        Args:
+            user_id
+
+        Returns:
+
+        """
+        return Workspace.objects(owner=str(user_id), is_public__ne=True, pending_delete__ne=True).all()
+
+    @staticmethod
+    def get_public_workspaces_owned_by_acl(user_id):
+        """ Get the public workspaces owned by the given user id, from the denormalized public flag.
+
+        Args:
+            user_id
+
+        Returns:
+
+        """
+        return Workspace.objects(owner=str(user_id), is_public=True, pending_delete__ne=True).all()
+
+    @staticmethod
+    def add_to_acl(workspace_id, acl_field, ids):
+        """ Add ids to a denormalized access control list of the workspace.
+
+        Args:
+            workspace_id
+            acl_field: name of the list (reader_user_ids, writer_user_ids, reader_group_ids, writer_group_ids)
+            ids
+
+        Returns:
+
+        """
+        Workspace.objects(pk=str(workspace_id)).update_one(**{'add_to_set__' + acl_field: [str(id_) for id_ in ids]})
+
+    @staticmethod
+    def remove_from_acl(workspace_id, acl_field, ids):
+        """ Remove ids from a denormalized access control list of the workspace.
+
+        Args:
+            workspace_id
+            acl_field: name of the list (reader_user_ids, writer_user_ids, reader_group_ids, writer_group_ids)
+            ids
+
+        Returns:
+
+        """
+        Workspace.objects(pk=str(workspace_id)).update_one(**{'pull_all__' + acl_field: [str(id_) for id_ in ids]})
+
+    @staticmethod
+    def set_public_acl(workspace_id, is_public):
+        """ Set the denormalized public flag of the workspace.
+
+        Args:
+            workspace_id
+            is_public
+
+        Returns:
+
+        """
+        Workspace.objects(pk=str(workspace_id)).update_one(set__is_public=is_public)
+
+    @staticmethod
+    def set_pending_delete(workspace_id):
+        """ Mark the workspace as pending deletion. Its title is replaced, so that it can be reused right away.
+
+        Args:
+            workspace_id
+
+        Returns:
+            bool: True if the workspace was marked, False if it was already pending deletion
+
+        """
+        return Workspace.objects(pk=str(workspace_id), pending_delete__ne=True)\
+            .update_one(set__pending_delete=True,
+                        set__deletion_total=0,
+                        set__deletion_done=0,
+                        set__title='Deleted workspace {0}'.format(workspace_id),
+                        unset__title_key=True) == 1
+
+    @staticmethod
+    def set_deletion_total(workspace_id, nb_data):
+        """ Set the number of data to unassign from the workspace pending deletion.
+
+        Args:
+            workspace_id
+            nb_data
+
+        Returns:
+
+        """
+        Workspace.objects(pk=str(workspace_id)).update_one(set__deletion_total=nb_data)
+
+    @staticmethod
+    def delete_pending(workspace_id):
+        """ Delete the document of the workspace pending deletion.
+
+        Args:
+            workspace_id
+
+        Returns:
+
+        """
+        Workspace.objects(pk=str(workspace_id), pending_delete=True).delete()
+
+    @staticmethod
+    def add_deletion_progress(workspace_id, nb_data):
+        """ Add to the number of data unassigned from the workspace pending deletion.
+
+        Args:
+            workspace_id
+            nb_data
+
+        Returns:
+
+        """
+        Workspace.objects(pk=str(workspace_id)).update_one(inc__deletion_done=nb_data)
+
+    @staticmethod
+    def get_all_pending_delete():
+        """ Get all workspaces pending deletion.
+
+        Returns:
+
+        """
+        return Workspace.objects(pending_delete=True).all()
@@ -8,9 +8,18 @@ USER = "user"
 ACTION_READ = "action_read"
 ACTION_WRITE = "action_write"
 
+SEARCH_PAGE_SIZE = 20
+RIGHTS_TABLE_MAX_PAGE_SIZE = 100
+
 EDIT_RIGHTS_TEMPLATE_TABLE = "core_workspace_app/list/edit_rights_table.html"
 EDIT_RIGHTS_TEMPLATE = "core_workspace_app/edit_rights.html"
 
+# included by the pages running bulk operations in background jobs
+JS_JOBS = {
+            "path": 'core_workspace_app/user/js/jobs.js',
+            "is_raw": False
+          }
+
 JS_CREATE_WORKSPACE = [{
                             "path": 'core_workspace_app/user/js/create_workspace.js',
                             "is_raw": False
@@ -20,7 +29,7 @@ MODAL_CREATE_WORKSPACE = [
                             "core_workspace_app/list/create_workspace.html"
                          ]
 
-JS_ASSIGN_WORKSPACE = [{
+JS_ASSIGN_WORKSPACE = [JS_JOBS, {
                             "path": 'core_workspace_app/user/js/list/modals/assign_workspace.js',
                             "is_raw": False
                        }]
@@ -34,7 +43,7 @@ MODAL_ASSIGN_WORKSPACE_FORM = [
                               ]
 
 
-JS_PUBLIC_WORKSPACE = [{
+JS_PUBLIC_WORKSPACE = [JS_JOBS, {
                             "path": 'core_workspace_app/user/js/list/modals/set_public.js',
                             "is_raw": False
                        }]
@@ -50,7 +59,7 @@ JS_INIT = [{
 
 JS_TABLES = [{
                 "path": 'core_workspace_app/user/js/tables.js',
-                "is_raw": True
+                "is_raw": False
              }]
 
 MODAL_ADD_USER = "core_workspace_app/list/modals/add_user.html"
@@ -59,7 +68,7 @@ MODAL_ADD_USER_FORM = [
                          "core_workspace_app/list/modals/add_user_form.html"
                       ]
 
-JS_ADD_USER = [{
+JS_ADD_USER = [JS_JOBS, {
                     "path": 'core_workspace_app/user/js/add_user.js',
                     "is_raw": False
                }]
@@ -85,7 +94,12 @@ MODAL_ADD_GROUP_FORM = [
                          "core_workspace_app/list/modals/add_group_form.html"
                       ]
 
-JS_ADD_GROUP = [{
+JS_ADD_GROUP = [JS_JOBS, {
                     "path": 'core_workspace_app/user/js/add_group.js',
                     "is_raw": False
                }]
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCESS = "success"
+JOB_FAILURE = "failure"
@@ -66,24 +66,21 @@ class ChangeWorkspaceForm(forms.Form):
     workspaces = forms.ChoiceField(label='', required=True, widget=forms.Select(attrs={"class": "form-control"}))
     WORKSPACES_OPTIONS = []
 
-    def __init__(self, user, list_current_workspace=[]):
+    def __init__(self, user, list_current_workspace_id=[]):
         self.WORKSPACES_OPTIONS = []
         self.WORKSPACES_OPTIONS.append(('', '-----------'))
 
-        # We retrieve all workspaces with write access
-        all_workspaces = workspace_api.get_all_workspaces_with_write_access_by_user(user)
+        # We retrieve the workspaces with write access, sorted by title (case insensitive)
+        all_workspaces = workspace_api.get_workspace_choices_with_write_access_by_user(user)
 
         if len(all_workspaces) == 0:
             raise DoesNotExist("You don't have access to any workspaces with sufficient rights to assign a document.")
 
-        # We sort by title, case insensitive
-        sort_workspaces = sorted(all_workspaces, key=lambda s: s.title.lower())
-
-        # We add them
-        for workspace in sort_workspaces:
-            if list_current_workspace == [] or\
-                    (len(list_current_workspace) > 0 and workspace not in list_current_workspace):
-                self.WORKSPACES_OPTIONS.append((workspace.id, workspace.title))
+        # We add them, except the current workspaces
+        current_workspace_ids = set(list_current_workspace_id)
+        for workspace_id, title in all_workspaces:
+            if workspace_id not in current_workspace_ids:
+                self.WORKSPACES_OPTIONS.append((workspace_id, title))
 
         super(ChangeWorkspaceForm, self).__init__()
         self.fields['workspaces'].choices = []
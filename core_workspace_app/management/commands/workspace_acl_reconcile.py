@@ -0,0 +1,105 @@
+""" Rebuild the denormalized access control lists of the workspaces from the permission tables
+"""
+import collections
+
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from pymongo import UpdateOne
+
+from core_workspace_app.components.workspace.models import Workspace
+from core_workspace_app.permissions import api as permission_api
+from core_workspace_app.permissions.rights import CONTENT_TYPE_APP_LABEL
+
+ACL_FIELDS = ('reader_user_ids', 'writer_user_ids', 'reader_group_ids', 'writer_group_ids')
+
+
+class Command(BaseCommand):
+    """ Rebuild the reader/writer user and group ids, and the public flag, of every workspace.
+    """
+    help = 'Rebuild the denormalized access control lists of the workspaces from the permission tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size',
+                            type=int,
+                            dest='batch_size',
+                            default=1000,
+                            help='Number of workspaces updated per bulk write.')
+        parser.add_argument('--check',
+                            action='store_true',
+                            dest='check',
+                            default=False,
+                            help='Only report the workspaces whose lists differ from the permission tables, '
+                                 'and fail if there are any.')
+
+    def handle(self, *args, **options):
+        users_by_permission = _get_ids_by_permission(User.user_permissions.through, 'user_id')
+        groups_by_permission = _get_ids_by_permission(Group.permissions.through, 'group_id')
+        public_permissions = set(permission_api._get_all_public_workspace_permission())
+
+        collection = Workspace._get_collection()
+        operations = []
+        nb_workspaces = 0
+        drifted_ids = []
+        for workspace in Workspace.objects.only('read_perm_id', 'write_perm_id', 'is_public', *ACL_FIELDS):
+            acl = {
+                'reader_user_ids': users_by_permission[workspace.read_perm_id],
+                'writer_user_ids': users_by_permission[workspace.write_perm_id],
+                'reader_group_ids': groups_by_permission[workspace.read_perm_id],
+                'writer_group_ids': groups_by_permission[workspace.write_perm_id],
+                'is_public': workspace.read_perm_id in public_permissions,
+            }
+            if options['check']:
+                if _has_drifted(workspace, acl):
+                    drifted_ids.append(str(workspace.pk))
+                continue
+
+            operations.append(UpdateOne({'_id': workspace.pk}, {'$set': acl}))
+            if len(operations) == options['batch_size']:
+                collection.bulk_write(operations, ordered=False)
+                nb_workspaces += len(operations)
+                operations = []
+
+        if options['check']:
+            if len(drifted_ids) > 0:
+                raise CommandError('The access control lists of {0} workspaces differ from the permission tables: '
+                                   '{1}'.format(len(drifted_ids), ', '.join(drifted_ids)))
+            self.stdout.write(self.style.SUCCESS('The access control lists match the permission tables.'))
+            return
+
+        if len(operations) > 0:
+            collection.bulk_write(operations, ordered=False)
+            nb_workspaces += len(operations)
+
+        self.stdout.write(self.style.SUCCESS('Access control lists rebuilt for {0} workspaces.'.format(nb_workspaces)))
+
+
+def _get_ids_by_permission(through_model, id_field):
+    """ Return the ids of the users or groups having each workspace permission.
+
+    Args:
+        through_model: many to many table between the permissions and the users or groups
+        id_field: name of the user or group column
+
+    Returns:
+        dict: list of user or group ids by permission id
+    """
+    ids_by_permission = collections.defaultdict(list)
+    for permission_id, object_id in through_model.objects\
+            .filter(permission__content_type__app_label=CONTENT_TYPE_APP_LABEL)\
+            .values_list('permission_id', id_field):
+        ids_by_permission[str(permission_id)].append(str(object_id))
+    return ids_by_permission
+
+
+def _has_drifted(workspace, acl):
+    """ Check if the stored access control lists of the workspace differ from the expected ones.
+
+    Args:
+        workspace:
+        acl: expected lists and public flag
+
+    Returns:
+    """
+    if bool(workspace.is_public) != acl['is_public']:
+        return True
+    return any(set(getattr(workspace, field) or []) != set(acl[field]) for field in ACL_FIELDS)
@@ -0,0 +1,214 @@
+""" Benchmark the workspace and permission APIs on a synthetic population
+"""
+import json
+import os
+import platform
+import random
+import subprocess
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from core_workspace_app.components.workspace import api as workspace_api
+from core_workspace_app.utils import benchmark
+
+
+class Command(BaseCommand):
+    """ Create a population of users, groups, workspaces and data, time the listing helpers, the access checks, the
+    edit rights page and the ajax bulk endpoints, then delete the population. It refuses to run on databases that
+    may hold real data (not sqlite or not mongomock), unless --allow-live-db is passed.
+    """
+    help = 'Benchmark the workspace and permission APIs on a synthetic population (use a test database).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, dest='users', default=100, help='Number of users.')
+        parser.add_argument('--groups', type=int, dest='groups', default=20, help='Number of groups.')
+        parser.add_argument('--workspaces', type=int, dest='workspaces', default=200, help='Number of workspaces.')
+        parser.add_argument('--data', type=int, dest='data', default=1000, help='Number of data.')
+        parser.add_argument('--repeat', type=int, dest='repeat', default=5, help='Number of runs of each measure.')
+        parser.add_argument('--sample', type=int, dest='sample', default=10,
+                            help='Number of users (and workspaces) the measures are run for.')
+        parser.add_argument('--seed', type=int, dest='seed', default=0, help='Seed of the random population.')
+        parser.add_argument('--prefix', dest='prefix', default='benchmark_',
+                            help='Prefix of the names of the created objects.')
+        parser.add_argument('--output', dest='output', default=None,
+                            help='JSON file receiving the results (default: standard output).')
+        parser.add_argument('--keep', action='store_true', dest='keep', default=False,
+                            help='Do not delete the population at the end.')
+        parser.add_argument('--allow-live-db', action='store_true', dest='allow_live_db', default=False,
+                            help='Run on databases that are not sqlite or mongomock. The objects whose names start '
+                                 'with the prefix are deleted.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError('At least one user is needed.')
+        if options['repeat'] < 1:
+            raise CommandError('At least one run is needed.')
+        _check_databases(options['allow_live_db'])
+
+        prefix = options['prefix']
+        benchmark.delete_population(prefix)
+        self.stderr.write('Generating the population...')
+        population = benchmark.generate_population(prefix, options['users'], options['groups'],
+                                                   options['workspaces'], options['data'], seed=options['seed'])
+        try:
+            results = self._run(population, options)
+        finally:
+            if not options['keep']:
+                benchmark.delete_population(prefix)
+
+        report = json.dumps({'commit': _get_commit(),
+                             'python': platform.python_version(),
+                             'population': {name: options[name] for name in ('users', 'groups', 'workspaces',
+                                                                              'data', 'seed')},
+                             'results': results}, indent=2, sort_keys=True)
+        if options['output'] is None:
+            self.stdout.write(report)
+        else:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(report)
+            self.stderr.write(self.style.SUCCESS('Results written to {0}.'.format(options['output'])))
+
+    def _run(self, population, options):
+        """ Run the measures.
+
+        Args:
+            population:
+            options:
+
+        Returns:
+            list: results of the measures
+        """
+        rand = random.Random(options['seed'])
+        repeat = options['repeat']
+        users = rand.sample(population.users, min(options['sample'], len(population.users)))
+        workspaces = rand.sample(population.workspaces, min(options['sample'], len(population.workspaces)))
+        results = []
+
+        def _measure(name, func, reset=None):
+            self.stderr.write(name)
+            results.append(benchmark.measure(name, func, repeat, reset=reset))
+
+        # listing helpers
+        for name, func in (
+                ('get_all_workspaces_with_read_access_by_user',
+                 workspace_api.get_all_workspaces_with_read_access_by_user),
+                ('get_all_workspaces_with_write_access_by_user',
+                 workspace_api.get_all_workspaces_with_write_access_by_user),
+                ('get_all_workspaces_with_read_access_not_owned_by_user',
+                 workspace_api.get_all_workspaces_with_read_access_not_owned_by_user),
+                ('get_all_other_public_workspaces', workspace_api.get_all_other_public_workspaces),
+                ('get_workspace_access_by_user', workspace_api.get_workspace_access_by_user)):
+            _measure('api.' + name, lambda func=func: [_evaluate(func(user)) for user in users])
+
+        # access checks
+        pairs = [(workspace, user) for workspace in workspaces for user in users]
+        _measure('api.can_user_read_workspace',
+                 lambda: [workspace_api.can_user_read_workspace(workspace, user) for workspace, user in pairs])
+        _measure('api.can_user_write_workspace',
+                 lambda: [workspace_api.can_user_write_workspace(workspace, user) for workspace, user in pairs])
+
+        # pages and ajax endpoints, with the whole request stack
+        setup_test_environment()
+        try:
+            self._run_views(population, workspaces, _measure)
+        finally:
+            teardown_test_environment()
+
+        return results
+
+    def _run_views(self, population, workspaces, _measure):
+        """ Measure the edit rights page and the ajax bulk endpoints.
+
+        Args:
+            population:
+            workspaces:
+            _measure: function running a measure
+
+        Returns:
+        """
+        if len(workspaces) == 0:
+            return
+
+        workspace = workspaces[0]
+        owner = next(user for user in population.users if str(user.id) == workspace.owner)
+        client = Client()
+        client.force_login(owner)
+        new_users = [user for user in population.users[:50]
+                     if str(user.id) != workspace.owner and not workspace_api.can_user_read_workspace(workspace, user)]
+        data_ids = population.data_ids_by_owner_id.get(workspace.owner, [])
+
+        _measure('view.edit_rights', lambda: _check(client.get(
+            reverse('core_workspace_edit_rights_workspace', kwargs={'workspace_id': str(workspace.id)}))))
+        _measure('ajax.rights_table', lambda: _check(client.post(
+            reverse('core_workspace_rights_table'),
+            {'workspace_id': str(workspace.id), 'group_or_user': 'user', 'draw': 1, 'start': 0, 'length': 10})))
+        # the writes are undone after each run, so that each run gives the rights and assigns the data again
+        if len(new_users) > 0:
+            _measure('ajax.add_user_right_to_workspace', lambda: _check(client.post(
+                reverse('core_workspace_add_user_right_to_workspace'),
+                {'workspace_id': str(workspace.id),
+                 'users_id[]': [str(user.id) for user in new_users],
+                 'read': 'true', 'write': 'false'})),
+                reset=lambda: workspace_api.remove_users_access_to_workspace(workspace, new_users, True, True, owner))
+        if len(data_ids) > 0:
+            data_workspaces = benchmark.get_data_workspaces(data_ids)
+            _measure('ajax.assign_workspace', lambda: _check(client.post(
+                reverse('core_workspace_assign_workspace'),
+                {'workspace_id': str(workspace.id), 'document_id[]': data_ids})),
+                reset=lambda: benchmark.set_data_workspaces(data_workspaces))
+        _measure('ajax.change_workspace', lambda: _check(client.post(
+            reverse('core_workspace_change_workspace'), {'document_id[]': data_ids})))
+
+
+def _check_databases(allow_live_db):
+    """ Refuse to run on databases that may hold real data.
+
+    Args:
+        allow_live_db:
+
+    Returns:
+    """
+    live_databases = benchmark.get_live_databases()
+    if len(live_databases) > 0 and not allow_live_db:
+        raise CommandError('The command creates and deletes objects, and these databases may hold real data: {0}. '
+                           'Use settings with sqlite and mongomock, or pass --allow-live-db.'
+                           .format(', '.join(live_databases)))
+
+
+def _evaluate(result):
+    """ Load the workspaces of a listing (querysets are lazy).
+
+    Args:
+        result:
+
+    Returns:
+    """
+    return list(result) if hasattr(result, '__iter__') else result
+
+
+def _check(response):
+    """ Fail if a request of the benchmark failed.
+
+    Args:
+        response:
+
+    Returns:
+    """
+    if response.status_code != 200:
+        raise CommandError('Request failed ({0}): {1}'.format(response.status_code, response.content[:200]))
+    return response
+
+
+def _get_commit():
+    """ Return the git commit of the benchmarked code, if known.
+
+    Returns:
+    """
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.STDOUT,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).strip().decode('utf-8')
+    except Exception:
+        return None
@@ -0,0 +1,21 @@
+""" Finish the deletion of the workspaces pending deletion
+"""
+from django.core.management.base import BaseCommand
+
+from core_workspace_app.components.workspace import api as workspace_api
+from core_workspace_app.components.workspace.models import Workspace
+
+
+class Command(BaseCommand):
+    """ Unassign the data of the workspaces pending deletion, then delete their permissions and documents.
+    Use it when the process deleting a workspace stopped.
+    """
+    help = 'Finish the deletion of the workspaces pending deletion.'
+
+    def handle(self, *args, **options):
+        workspace_ids = [str(workspace_id) for workspace_id in Workspace.get_all_pending_delete().scalar('id')]
+        for workspace_id in workspace_ids:
+            self.stdout.write('Deleting workspace {0}...'.format(workspace_id))
+            workspace_api.process_pending_deletion(workspace_id)
+
+        self.stdout.write(self.style.SUCCESS('{0} workspaces deleted.'.format(len(workspace_ids))))
@@ -0,0 +1,130 @@
+""" Create or reconcile the indexes of the Workspace collection
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core_workspace_app.components.workspace.models import Workspace
+from core_workspace_app.permissions import api as permission_api
+
+
+class Command(BaseCommand):
+    """ Create the indexes declared on the Workspace document. Optionally drop the ones that are not declared anymore.
+    The unique index on the normalized title can't be built while titles only differ by case: they are reported, or
+    renamed with --rename-duplicates (a renamed workspace sharing its permissions with another one gets its own
+    permissions, given to the same users and groups).
+    """
+    help = 'Create or reconcile the indexes of the Workspace collection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--drop-extra',
+                            action='store_true',
+                            dest='drop_extra',
+                            default=False,
+                            help='Drop the indexes of the collection that are not declared on the Workspace document.')
+        parser.add_argument('--rename-duplicates',
+                            action='store_true',
+                            dest='rename_duplicates',
+                            default=False,
+                            help='Rename the workspaces whose title only differs by case from an older one, by adding '
+                                 'a number to their title.')
+
+    def handle(self, *args, **options):
+        duplicates = _get_duplicate_titles()
+        if len(duplicates) > 0:
+            if not options['rename_duplicates']:
+                for workspaces in duplicates:
+                    self.stderr.write('Titles only differing by case: {0}'.format(
+                        ', '.join(u'"{0}" ({1})'.format(workspace.title, workspace.pk) for workspace in workspaces)))
+                raise CommandError('{0} titles are used by several workspaces. Rename them, or use '
+                                   '--rename-duplicates.'.format(len(duplicates)))
+            self._rename_duplicates(duplicates)
+
+        # Workspaces created before the normalized title was introduced, or normalized differently, need it before the
+        # unique index is built
+        for workspace in Workspace.objects(pending_delete__ne=True).only('title', 'title_key'):
+            title_key = Workspace.normalize_title(workspace.title)
+            if workspace.title_key != title_key:
+                Workspace.objects(pk=workspace.pk).update_one(set__title_key=title_key)
+
+        differences = Workspace.compare_indexes()
+
+        for index in differences['missing']:
+            self.stdout.write('Creating index: {0}'.format(_format_index(index)))
+        Workspace.ensure_indexes()
+
+        for index in differences['extra']:
+            if options['drop_extra']:
+                self.stdout.write('Dropping index: {0}'.format(_format_index(index)))
+                Workspace._get_collection().drop_index(index)
+            else:
+                self.stdout.write('Index not declared (use --drop-extra to drop it): {0}'.format(_format_index(index)))
+
+        self.stdout.write(self.style.SUCCESS('Workspace indexes are up to date.'))
+
+    def _rename_duplicates(self, duplicates):
+        """ Keep the title of the oldest workspace of each group of duplicates, add a number to the others.
+
+        Args:
+            duplicates: lists of workspaces with the same normalized title, oldest first
+
+        Returns:
+        """
+        used_keys = set(Workspace.normalize_title(title)
+                        for title in Workspace.objects(pending_delete__ne=True).scalar('title'))
+        for workspaces in duplicates:
+            for workspace in workspaces[1:]:
+                number = 2
+                while Workspace.normalize_title(u'{0} ({1})'.format(workspace.title, number)) in used_keys:
+                    number += 1
+                title = u'{0} ({1})'.format(workspace.title, number)
+                used_keys.add(Workspace.normalize_title(title))
+                self.stdout.write(u'Renaming workspace {0}: "{1}" to "{2}"'.format(workspace.pk, workspace.title, title))
+                Workspace.objects(pk=workspace.pk).update_one(set__title=title,
+                                                              set__title_key=Workspace.normalize_title(title),
+                                                              **_get_own_permissions(workspace, title))
+
+
+def _get_duplicate_titles():
+    """ Return the workspaces whose titles only differ by case.
+
+    Returns:
+        list: lists of workspaces with the same normalized title, oldest first
+    """
+    workspaces_by_key = {}
+    for workspace in Workspace.objects(pending_delete__ne=True).only('title', 'read_perm_id', 'write_perm_id')\
+                                                             .order_by('id'):
+        workspaces_by_key.setdefault(Workspace.normalize_title(workspace.title), []).append(workspace)
+    return [workspaces for workspaces in workspaces_by_key.values() if len(workspaces) > 1]
+
+
+def _get_own_permissions(workspace, title):
+    """ Create permissions for a renamed workspace sharing its permissions with another workspace (the permission
+    codenames came from titles only differing by case), given to the same users and groups.
+
+    Args:
+        workspace:
+        title: new title of the workspace
+
+    Returns:
+        dict: update of the permission ids of the workspace
+    """
+    update = {}
+    if Workspace.objects(pk__ne=workspace.pk, read_perm_id=workspace.read_perm_id).count() > 0:
+        read_perm = permission_api.create_read_perm(title)
+        permission_api.copy_permission_grants(workspace.read_perm_id, read_perm.id)
+        update['set__read_perm_id'] = str(read_perm.id)
+    if Workspace.objects(pk__ne=workspace.pk, write_perm_id=workspace.write_perm_id).count() > 0:
+        write_perm = permission_api.create_write_perm(title)
+        permission_api.copy_permission_grants(workspace.write_perm_id, write_perm.id)
+        update['set__write_perm_id'] = str(write_perm.id)
+    return update
+
+
+def _format_index(index):
+    """ Return a readable representation of an index specification.
+
+    Args:
+        index:
+
+    Returns:
+    """
+    return ', '.join('{0} ({1})'.format(field, direction) for field, direction in index)
@@ -0,0 +1,27 @@
+""" Run the pending workspace jobs
+"""
+from django.core.management.base import BaseCommand
+
+from core_workspace_app.components.job import api as job_api
+
+
+class Command(BaseCommand):
+    """ Run the jobs left pending, after a restart of the server or when its queue of background tasks was full.
+    """
+    help = 'Run the pending workspace jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--include-running',
+                            action='store_true',
+                            dest='include_running',
+                            default=False,
+                            help='Also run the jobs running for longer than WORKSPACE_JOB_LEASE_TIMEOUT '
+                                 '(stopped with the server).')
+
+    def handle(self, *args, **options):
+        job_ids = job_api.get_pending_job_ids(options['include_running'])
+        for job_id in job_ids:
+            self.stdout.write('Running job {0}...'.format(job_id))
+            job_api.run(job_id)
+
+        self.stdout.write(self.style.SUCCESS('{0} jobs run.'.format(len(job_ids))))
@@ -0,0 +1,335 @@
+""" Load test of the ajax endpoints with concurrent simulated users
+"""
+import json
+import random
+import threading
+from timeit import default_timer
+
+from bson.objectid import ObjectId
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from core_main_app.components.data.models import Data
+from core_workspace_app import constants as workspace_constants
+from core_workspace_app import settings
+from core_workspace_app.components.workspace.models import Workspace
+from core_workspace_app.utils import benchmark
+
+OPERATIONS = ('switch_right', 'assign_workspace', 'rights_table', 'change_workspace')
+DEFAULT_MIX = 'switch_right=5,assign_workspace=3,rights_table=1,change_workspace=1'
+
+
+class Command(BaseCommand):
+    """ Create a population, run a mix of operations from concurrent simulated users through the Django test client,
+    then report the throughput, the latency percentiles, the errors, and the lost updates: rights and assignments
+    whose final state is not the last value written by the simulated user owning them.
+    The command does not create test databases: it refuses to run on databases that may hold real data (not sqlite
+    or not mongomock), unless --allow-live-db is passed. With sqlite, use a file database: each thread has its own
+    connection.
+    """
+    help = 'Load test the ajax endpoints with concurrent simulated users (use a test database).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, dest='concurrency', default=10,
+                            help='Number of concurrent simulated users.')
+        parser.add_argument('--operations', type=int, dest='operations', default=100,
+                            help='Number of operations of each simulated user.')
+        parser.add_argument('--mix', dest='mix', default=DEFAULT_MIX,
+                            help='Weights of the operations ({0}).'.format(', '.join(OPERATIONS)))
+        parser.add_argument('--users', type=int, dest='users', default=50, help='Number of users.')
+        parser.add_argument('--groups', type=int, dest='groups', default=10, help='Number of groups.')
+        parser.add_argument('--workspaces', type=int, dest='workspaces', default=50, help='Number of workspaces.')
+        parser.add_argument('--data', type=int, dest='data', default=1000, help='Number of data.')
+        parser.add_argument('--seed', type=int, dest='seed', default=0, help='Seed of the random population and mix.')
+        parser.add_argument('--prefix', dest='prefix', default='load_test_',
+                            help='Prefix of the names of the created objects.')
+        parser.add_argument('--output', dest='output', default=None,
+                            help='JSON file receiving the report (default: standard output).')
+        parser.add_argument('--keep', action='store_true', dest='keep', default=False,
+                            help='Do not delete the population at the end.')
+        parser.add_argument('--allow-live-db', action='store_true', dest='allow_live_db', default=False,
+                            help='Run on databases that are not sqlite or mongomock. The objects whose names start '
+                                 'with the prefix are deleted.')
+
+    def handle(self, *args, **options):
+        mix = _parse_mix(options['mix'])
+        live_databases = benchmark.get_live_databases()
+        if len(live_databases) > 0 and not options['allow_live_db']:
+            raise CommandError('The command creates and deletes objects, and these databases may hold real data: '
+                               '{0}. Use settings with sqlite and mongomock, or pass --allow-live-db.'
+                               .format(', '.join(live_databases)))
+        prefix = options['prefix']
+        benchmark.delete_population(prefix)
+        self.stderr.write('Generating the population...')
+        population = benchmark.generate_population(prefix, options['users'], options['groups'],
+                                                   options['workspaces'], options['data'], seed=options['seed'])
+        setup_test_environment()
+        try:
+            simulated_users = _plan(population, mix, options['concurrency'], options['operations'],
+                                    random.Random(options['seed']))
+            self.stderr.write('Running {0} operations...'.format(sum(len(simulated_user.tasks)
+                                                                     for simulated_user in simulated_users)))
+            report = _run(simulated_users)
+            report['lost_updates'] = _count_lost_updates(simulated_users)
+        finally:
+            teardown_test_environment()
+            if not options['keep']:
+                benchmark.delete_population(prefix)
+
+        report = json.dumps(report, indent=2, sort_keys=True)
+        if options['output'] is None:
+            self.stdout.write(report)
+        else:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(report)
+            self.stderr.write(self.style.SUCCESS('Report written to {0}.'.format(options['output'])))
+
+
+class _SimulatedUser(object):
+    """ Operations of a simulated user, run in one thread, and their outcome.
+    The rights and data written by a simulated user are not written by the others, so that their final state is
+    known: the last value it wrote.
+    """
+
+    def __init__(self):
+        self.tasks = []
+        self.samples = []
+        self.errors = {}
+        # last value written, by right (workspace id, user id, action) or by data id; None if a write failed
+        self.expected_rights = {}
+        self.expected_workspaces = {}
+
+
+def _parse_mix(mix):
+    """ Parse the weights of the operations.
+
+    Args:
+        mix: 'operation=weight,...'
+
+    Returns:
+        list: (operation, weight)
+    """
+    weights = []
+    for item in mix.split(','):
+        try:
+            operation, weight = item.split('=')
+            weight = int(weight)
+        except ValueError:
+            raise CommandError('Invalid mix item: {0}.'.format(item))
+        if operation not in OPERATIONS:
+            raise CommandError('Unknown operation: {0}.'.format(operation))
+        if weight > 0:
+            weights.append((operation, weight))
+    if len(weights) == 0:
+        raise CommandError('The mix has no operation.')
+    return weights
+
+
+def _plan(population, mix, concurrency, nb_operations, rand):
+    """ Prepare the operations of the simulated users.
+
+    Args:
+        population:
+        mix:
+        concurrency:
+        nb_operations: per simulated user
+        rand:
+
+    Returns:
+        list: _SimulatedUser
+    """
+    users_by_id = {str(user.id): user for user in population.users}
+    workspaces_by_owner_id = {}
+    for workspace in population.workspaces:
+        workspaces_by_owner_id.setdefault(workspace.owner, []).append(workspace)
+
+    # rights (workspace, target user) and data are shared out between the simulated users
+    simulated_users = [_SimulatedUser() for index in range(concurrency)]
+    rights = [(workspace, user) for workspace in population.workspaces for user in population.users
+              if str(user.id) != workspace.owner]
+    rand.shuffle(rights)
+    data = [(owner_id, data_id) for owner_id, data_ids in population.data_ids_by_owner_id.items()
+            if owner_id in workspaces_by_owner_id for data_id in data_ids]
+    rand.shuffle(data)
+
+    operations = [operation for operation, weight in mix for index in range(weight)]
+    for index, simulated_user in enumerate(simulated_users):
+        own_rights = rights[index::concurrency]
+        own_data = data[index::concurrency]
+        for operation_index in range(nb_operations):
+            operation = rand.choice(operations)
+            if operation == 'switch_right' and len(own_rights) > 0:
+                workspace, user = rand.choice(own_rights)
+                action = rand.choice((workspace_constants.ACTION_READ, workspace_constants.ACTION_WRITE))
+                simulated_user.tasks.append((operation, users_by_id[workspace.owner],
+                                             reverse('core_workspace_switch_right'),
+                                             {'workspace_id': str(workspace.id), 'object_id': str(user.id),
+                                              'group_or_user': workspace_constants.USER, 'action': action,
+                                              'value': rand.choice(('true', 'false'))},
+                                             (str(workspace.id), str(user.id), action)))
+            elif operation == 'assign_workspace' and len(own_data) > 0:
+                owner_id, data_id = rand.choice(own_data)
+                workspace = rand.choice(workspaces_by_owner_id[owner_id])
+                simulated_user.tasks.append((operation, users_by_id[owner_id],
+                                             reverse('core_workspace_assign_workspace'),
+                                             {'workspace_id': str(workspace.id), 'document_id[]': [data_id]},
+                                             data_id))
+            elif operation == 'rights_table':
+                workspace = rand.choice(population.workspaces)
+                simulated_user.tasks.append((operation, users_by_id[workspace.owner],
+                                             reverse('core_workspace_rights_table'),
+                                             {'workspace_id': str(workspace.id),
+                                              'group_or_user': workspace_constants.USER,
+                                              'draw': 1, 'start': 0, 'length': 10},
+                                             None))
+            elif operation == 'change_workspace' and len(own_data) > 0:
+                owner_id, data_id = rand.choice(own_data)
+                simulated_user.tasks.append((operation, users_by_id[owner_id],
+                                             reverse('core_workspace_change_workspace'),
+                                             {'document_id[]': [data_id]},
+                                             None))
+    return simulated_users
+
+
+def _run_simulated_user(simulated_user, start_event):
+    """ Run the operations of a simulated user.
+
+    Args:
+        simulated_user:
+        start_event: set when all the threads are ready
+
+    Returns:
+    """
+    clients = {}
+    try:
+        start_event.wait()
+        for operation, user, url, params, key in simulated_user.tasks:
+            client = clients.get(user.id)
+            if client is None:
+                client = Client()
+                client.force_login(user)
+                clients[user.id] = client
+
+            start = default_timer()
+            try:
+                status_code = client.post(url, params).status_code
+            except Exception:
+                status_code = None
+            simulated_user.samples.append((operation, default_timer() - start))
+
+            success = status_code == 200
+            if not success:
+                error = '{0} {1}'.format(operation, status_code)
+                simulated_user.errors[error] = simulated_user.errors.get(error, 0) + 1
+
+            # a failed write may or may not be applied: its final state is unknown
+            if operation == 'switch_right':
+                simulated_user.expected_rights[key] = params['value'] == 'true' if success else None
+            elif operation == 'assign_workspace':
+                simulated_user.expected_workspaces[key] = params['workspace_id'] if success else None
+    finally:
+        connection.close()
+
+
+def _run(simulated_users):
+    """ Run the simulated users concurrently.
+
+    Args:
+        simulated_users:
+
+    Returns:
+        dict: throughput, latencies and errors
+    """
+    start_event = threading.Event()
+    threads = [threading.Thread(target=_run_simulated_user, args=(simulated_user, start_event))
+               for simulated_user in simulated_users]
+    for thread in threads:
+        thread.start()
+    start = default_timer()
+    start_event.set()
+    for thread in threads:
+        thread.join()
+    duration = default_timer() - start
+
+    latencies_by_operation = {}
+    errors = {}
+    for simulated_user in simulated_users:
+        for operation, latency in simulated_user.samples:
+            latencies_by_operation.setdefault(operation, []).append(latency)
+        for error, count in simulated_user.errors.items():
+            errors[error] = errors.get(error, 0) + count
+
+    all_latencies = [latency for latencies in latencies_by_operation.values() for latency in latencies]
+    latencies_by_operation['all'] = all_latencies
+    return {'concurrency': len(simulated_users),
+            'duration': duration,
+            'operations': len(all_latencies),
+            'throughput': len(all_latencies) / duration if duration > 0 else None,
+            'latency': {operation: _summarize(latencies) for operation, latencies in latencies_by_operation.items()},
+            'errors': errors}
+
+
+def _summarize(latencies):
+    """ Summarize latencies.
+
+    Args:
+        latencies:
+
+    Returns:
+        dict
+    """
+    latencies = sorted(latencies)
+    return {'count': len(latencies),
+            'p50': benchmark.percentile(latencies, 0.5),
+            'p90': benchmark.percentile(latencies, 0.9),
+            'p95': benchmark.percentile(latencies, 0.95),
+            'p99': benchmark.percentile(latencies, 0.99),
+            'max': latencies[-1] if len(latencies) > 0 else None}
+
+
+def _count_lost_updates(simulated_users):
+    """ Compare the final state of the rights and data written by the simulated users with their last writes.
+
+    Args:
+        simulated_users:
+
+    Returns:
+        dict: number of checked and lost updates, by operation
+    """
+    expected_rights = {}
+    expected_workspaces = {}
+    for simulated_user in simulated_users:
+        expected_rights.update(simulated_user.expected_rights)
+        expected_workspaces.update(simulated_user.expected_workspaces)
+    expected_rights = {key: value for key, value in expected_rights.items() if value is not None}
+    expected_workspaces = {key: value for key, value in expected_workspaces.items() if value is not None}
+
+    workspaces_by_id = {str(workspace.id): workspace for workspace in
+                        Workspace.objects(pk__in=list({key[0] for key in expected_rights}))}
+    user_permissions = set(User.user_permissions.through.objects
+                           .filter(user_id__in=list({int(key[1]) for key in expected_rights}))
+                           .values_list('user_id', 'permission_id'))
+    lost_rights = 0
+    for (workspace_id, user_id, action), value in expected_rights.items():
+        workspace = workspaces_by_id[workspace_id]
+        if action == workspace_constants.ACTION_READ:
+            permission_id, acl = workspace.read_perm_id, workspace.reader_user_ids
+        else:
+            permission_id, acl = workspace.write_perm_id, workspace.writer_user_ids
+        has_right = (int(user_id), int(permission_id)) in user_permissions
+        if has_right != value or (settings.WORKSPACE_DENORMALIZED_ACL and (user_id in acl) != value):
+            lost_rights += 1
+
+    final_workspaces = {str(document['_id']): str(document.get('workspace')) for document in
+                        Data._get_collection().find({'_id': {'$in': [ObjectId(data_id)
+                                                                     for data_id in expected_workspaces]}},
+                                                    {'workspace': 1})}
+    lost_assignments = len([data_id for data_id, workspace_id in expected_workspaces.items()
+                            if final_workspaces.get(data_id) != workspace_id])
+
+    return {'switch_right': {'checked': len(expected_rights), 'lost': lost_rights},
+            'assign_workspace': {'checked': len(expected_workspaces), 'lost': lost_assignments}}
@@ -0,0 +1,175 @@
+""" Replay a workload recorded by the WorkloadRecorderMiddleware
+"""
+import json
+import time
+from timeit import default_timer
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils.http import urlencode
+
+from core_workspace_app.utils import benchmark
+
+
+class Command(BaseCommand):
+    """ Send the recorded requests again, in order, as their users, and compare the latencies and the statuses with
+    the recording. Run it against a snapshot of the databases of the recording: the requests change the data.
+    """
+    help = 'Replay a workload recorded by the WorkloadRecorderMiddleware (use a snapshot of the databases).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('traces', nargs='+',
+                            help='JSONL files written by the WorkloadRecorderMiddleware (one per process).')
+        parser.add_argument('--speed', type=float, dest='speed', default=0,
+                            help='Replay speed relative to the recording (1 for the recorded pace), '
+                                 '0 to send the requests without waiting.')
+        parser.add_argument('--limit', type=int, dest='limit', default=None,
+                            help='Maximum number of requests replayed.')
+        parser.add_argument('--output', dest='output', default=None,
+                            help='JSON file receiving the report (default: standard output).')
+
+    def handle(self, *args, **options):
+        records = _read_traces(options['traces'], options['limit'])
+        if len(records) == 0:
+            raise CommandError('The trace is empty.')
+        if any(record.get('redacted') for record in records):
+            raise CommandError('The parameters of the trace are hashed: record it with WORKSPACE_RECORDER_RAW_PARAMS '
+                               'to replay it.')
+
+        setup_test_environment()
+        try:
+            results = self._replay(records, options['speed'])
+        finally:
+            teardown_test_environment()
+
+        report = json.dumps(_report(records, results), indent=2, sort_keys=True)
+        if options['output'] is None:
+            self.stdout.write(report)
+        else:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(report)
+            self.stderr.write(self.style.SUCCESS('Report written to {0}.'.format(options['output'])))
+
+    def _replay(self, records, speed):
+        """ Send the recorded requests.
+
+        Args:
+            records:
+            speed:
+
+        Returns:
+            list: (status, duration) of each request
+        """
+        clients = {}
+        users_by_id = {str(user.id): user for user in
+                       User.objects.filter(pk__in=list({int(record['user_id']) for record in records
+                                                        if record['user_id'] is not None}))}
+        results = []
+        replay_start = default_timer()
+        for index, record in enumerate(records):
+            if speed > 0:
+                delay = (record['time'] - records[0]['time']) / speed - (default_timer() - replay_start)
+                if delay > 0:
+                    time.sleep(delay)
+
+            client = clients.get(record['user_id'])
+            if client is None:
+                client = Client()
+                if record['user_id'] is not None:
+                    if record['user_id'] not in users_by_id:
+                        raise CommandError('User {0} of the trace is not in the database.'.format(record['user_id']))
+                    client.force_login(users_by_id[record['user_id']])
+                clients[record['user_id']] = client
+
+            start = default_timer()
+            if record['method'] == 'POST':
+                response = client.post(_get_url(record['path'], record['get']), record['post'])
+            elif record['method'] == 'GET':
+                response = client.get(record['path'], record['get'])
+            else:
+                response = client.generic(record['method'], _get_url(record['path'], record['get']))
+            results.append((response.status_code, default_timer() - start))
+
+            if (index + 1) % 1000 == 0:
+                self.stderr.write('{0} requests replayed.'.format(index + 1))
+
+        return results
+
+
+def _read_traces(paths, limit):
+    """ Read the records of the traces of the processes, in the order of the requests.
+
+    Args:
+        paths:
+        limit: maximum number of records, None for all
+
+    Returns:
+        list
+    """
+    records = []
+    for path in paths:
+        with open(path) as trace_file:
+            records.extend(json.loads(line) for line in trace_file if line.strip())
+    records.sort(key=lambda record: record['time'])
+    return records if limit is None else records[:limit]
+
+
+def _get_url(path, params):
+    """ Add the GET parameters of a request to its path.
+
+    Args:
+        path:
+        params: list of values by name
+
+    Returns:
+    """
+    if len(params) == 0:
+        return path
+    return '{0}?{1}'.format(path, urlencode(params, doseq=True))
+
+
+def _report(records, results):
+    """ Compare the replayed requests with the recording, by url.
+
+    Args:
+        records:
+        results: (status, duration) of each request
+
+    Returns:
+        dict
+    """
+    by_url_name = {}
+    for record, (status, duration) in zip(records, results):
+        stats = by_url_name.setdefault(record['url_name'], {'recorded': [], 'replayed': [], 'status_mismatches': 0})
+        stats['recorded'].append(record['duration'])
+        stats['replayed'].append(duration)
+        if status != record['status']:
+            stats['status_mismatches'] += 1
+
+    report = {}
+    for url_name, stats in by_url_name.items():
+        report[url_name] = {'count': len(stats['recorded']),
+                            'status_mismatches': stats['status_mismatches'],
+                            'recorded': _summarize(stats['recorded']),
+                            'replayed': _summarize(stats['replayed'])}
+    return {'requests': len(results),
+            'status_mismatches': sum(stats['status_mismatches'] for stats in by_url_name.values()),
+            'urls': report}
+
+
+def _summarize(durations):
+    """ Summarize durations.
+
+    Args:
+        durations:
+
+    Returns:
+        dict
+    """
+    durations = sorted(durations)
+    return {'p50': benchmark.percentile(durations, 0.5),
+            'p95': benchmark.percentile(durations, 0.95),
+            'p99': benchmark.percentile(durations, 0.99),
+            'total': sum(durations)}
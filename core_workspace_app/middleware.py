@@ -0,0 +1,172 @@
+"""
+    Workspace middlewares
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from timeit import default_timer
+
+from django.conf import settings
+from django.utils.crypto import salted_hmac
+from django.utils.deprecation import MiddlewareMixin
+
+from core_workspace_app import settings as workspace_settings
+from core_workspace_app.utils import query_count, request_cache
+
+
+class WorkspaceAccessCacheMiddleware(MiddlewareMixin):
+    """ Memoize the permission lookups and workspace access decisions for the lifetime of a request.
+    """
+
+    def process_request(self, request):
+        request_cache.activate()
+
+    def process_response(self, request, response):
+        request_cache.deactivate()
+        return response
+
+    def process_exception(self, request, exception):
+        request_cache.deactivate()
+
+
+class QueryCountMiddleware(MiddlewareMixin):
+    """ Add the number of SQL queries and Mongo commands run by the request to the response headers, in DEBUG mode.
+    """
+
+    def process_request(self, request):
+        if settings.DEBUG:
+            request.workspace_query_counter = query_count.QueryCounter().start()
+
+    def process_response(self, request, response):
+        counter = getattr(request, 'workspace_query_counter', None)
+        if counter is not None:
+            counter.stop()
+            response['X-Workspace-SQL-Queries'] = str(counter.sql)
+            response['X-Workspace-Mongo-Commands'] = str(counter.mongo)
+        return response
+
+
+class WorkloadRecorderMiddleware(MiddlewareMixin):
+    """ Record the requests to the workspace urls (path, parameters, user, timing) to WORKSPACE_RECORDER_FILE.
+    The records are buffered, and each process appends them to its own file. The values of the parameters are
+    hashed, unless WORKSPACE_RECORDER_RAW_PARAMS is set.
+    """
+
+    def process_request(self, request):
+        if workspace_settings.WORKSPACE_RECORDER_FILE is not None:
+            request.workspace_recorder_start = (time.time(), default_timer())
+
+    def process_response(self, request, response):
+        start = getattr(request, 'workspace_recorder_start', None)
+        resolver_match = getattr(request, 'resolver_match', None)
+        if start is None or resolver_match is None or not (resolver_match.url_name or '').startswith('core_workspace_'):
+            return response
+
+        user = getattr(request, 'user', None)
+        raw = workspace_settings.WORKSPACE_RECORDER_RAW_PARAMS
+        record = json.dumps({'time': start[0],
+                             'duration': default_timer() - start[1],
+                             'method': request.method,
+                             'path': request.path,
+                             'url_name': resolver_match.url_name,
+                             'get': _get_params(request.GET, raw),
+                             'post': _get_params(request.POST, raw) if request.method == 'POST' else {},
+                             'redacted': not raw,
+                             'user_id': str(user.id) if user is not None and user.is_authenticated else None,
+                             'status': response.status_code}, sort_keys=True)
+        _record_buffer.append(record)
+        return response
+
+
+class _RecordBuffer(object):
+    """ Records of the process waiting to be written to its file.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.records = []
+        self.last_flush = default_timer()
+
+    def append(self, record):
+        """ Add a record, write the buffer when it is full or old enough.
+
+        Args:
+            record: JSON line
+
+        Returns:
+        """
+        with self.lock:
+            if self.pid != os.getpid():
+                # first record of the process, or forked: the records of the parent are written by the parent
+                self.pid = os.getpid()
+                self.records = []
+                self.last_flush = default_timer()
+            self.records.append(record)
+            if len(self.records) >= workspace_settings.WORKSPACE_RECORDER_BUFFER_SIZE \
+                    or default_timer() - self.last_flush >= workspace_settings.WORKSPACE_RECORDER_FLUSH_INTERVAL:
+                self._flush()
+
+    def flush(self):
+        """ Write the buffered records (at the exit of the process).
+
+        Returns:
+        """
+        with self.lock:
+            if self.pid == os.getpid():
+                self._flush()
+
+    def _flush(self):
+        """ Write the buffered records to the file of the process.
+
+        Returns:
+        """
+        if len(self.records) > 0:
+            with open(get_recorder_file(self.pid), 'a') as record_file:
+                record_file.write(''.join(record + '\n' for record in self.records))
+            self.records = []
+        self.last_flush = default_timer()
+
+
+def get_recorder_file(pid):
+    """ Return the file receiving the records of a process: WORKSPACE_RECORDER_FILE with the process id added before
+    the extension.
+
+    Args:
+        pid:
+
+    Returns:
+    """
+    root, extension = os.path.splitext(workspace_settings.WORKSPACE_RECORDER_FILE)
+    return '{0}.{1}{2}'.format(root, pid, extension)
+
+
+_record_buffer = _RecordBuffer()
+atexit.register(_record_buffer.flush)
+
+
+def _get_params(query_dict, raw):
+    """ Return the parameters of a request, without the CSRF token.
+
+    Args:
+        query_dict:
+        raw: keep the values, hash them otherwise
+
+    Returns:
+        dict: list of values by name
+    """
+    return {name: values if raw else [_hash_value(value) for value in values]
+            for name, values in query_dict.lists() if name != 'csrfmiddlewaretoken'}
+
+
+def _hash_value(value):
+    """ Return a keyed hash of a parameter value: equal values can still be matched, not read.
+
+    Args:
+        value:
+
+    Returns:
+    """
+    return salted_hmac('core_workspace_app.recorder', value).hexdigest()[:16]
@@ -3,13 +3,25 @@ Permissions API
 """
 import collections
 
-from django.contrib.auth.models import Permission, ContentType
-from django.db.models import Q
+from django.contrib.auth.models import Group, Permission, ContentType, User
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, IntegerField, Max, Q, Value, When
+from django.db.models.functions import Lower
+from django.db.models.signals import m2m_changed
 
-from core_main_app.components.group import api as group_api
 from core_main_app.components.user import api as user_api
+from core_workspace_app import settings
+from core_workspace_app.components.workspace import cache as workspace_cache
 from core_workspace_app.permissions.rights import CAN_READ_NAME, CAN_READ_CODENAME, CONTENT_TYPE_APP_LABEL,\
     CAN_WRITE_NAME, CAN_WRITE_CODENAME
+from core_workspace_app.utils import group as group_utils
+from core_workspace_app.utils import request_cache
+from core_workspace_app.utils.lru_cache import LRUCache
+
+WorkspacePermissionIds = collections.namedtuple('WorkspacePermissionIds', ['read', 'write', 'public'])
+
+_permission_labels = LRUCache(settings.WORKSPACE_PERMISSION_LABEL_CACHE_SIZE,
+                              settings.WORKSPACE_PERMISSION_LABEL_CACHE_TIMEOUT)
 
 
 def _title_to_codename(title):
@@ -30,6 +42,14 @@ def _title_to_codename(title):
     return title
 
 
+def _get_workspace_content_type():
+    """ Get the content type of the workspace permissions (cached by the content type manager).
+
+    Returns:
+    """
+    return ContentType.objects.get_by_natural_key(CONTENT_TYPE_APP_LABEL, 'workspace')
+
+
 def create_read_perm(title):
     """ Create read permission.
 
@@ -39,7 +59,7 @@ def create_read_perm(title):
     Returns:
     """
     name = CAN_READ_NAME + " - " + title.strip()
-    content_type = ContentType.objects.get(app_label=CONTENT_TYPE_APP_LABEL, model='workspace')
+    content_type = _get_workspace_content_type()
     codename = CAN_READ_CODENAME + "_" + _title_to_codename(title)
     return _create_perm(name, content_type, codename)
 
@@ -53,13 +73,14 @@ def create_write_perm(title):
     Returns:
     """
     name = CAN_WRITE_NAME + " - " + title.strip()
-    content_type = ContentType.objects.get(app_label=CONTENT_TYPE_APP_LABEL, model='workspace')
+    content_type = _get_workspace_content_type()
     codename = CAN_WRITE_CODENAME + "_" + _title_to_codename(title)
     return _create_perm(name, content_type, codename)
 
 
 def _create_perm(name, content_type, codename):
-    """ Create permission.
+    """ Create permission. A number is added to the codename if it is already used (by a workspace whose title only
+    differs by case or spaces, or was renamed), so that two workspaces never share a permission.
 
     Args:
         name
@@ -68,17 +89,38 @@ def _create_perm(name, content_type, codename):
 
     Returns:
     """
+    while True:
+        existing_codenames = set(Permission.objects.filter(content_type=content_type, codename__startswith=codename)
+                                                   .values_list('codename', flat=True))
+        unique_codename = codename
+        number = 2
+        while unique_codename in existing_codenames:
+            unique_codename = '{0}_{1}'.format(codename, number)
+            number += 1
+
+        try:
+            with transaction.atomic():
+                return Permission.objects.create(name=name, content_type=content_type, codename=unique_codename)
+        except IntegrityError:
+            # the codename was taken by a concurrent creation
+            continue
+
+
+def copy_permission_grants(source_permission_id, target_permission_id):
+    """ Give the target permission to the users and groups having the source permission, with one insert per table.
 
-    try:
-        perm = Permission.objects.get(content_type=content_type,
-                                      codename=codename)
+    Args:
+        source_permission_id
+        target_permission_id
 
-    except Exception, ie:
-        perm = Permission.objects.create(name=name,
-                                         content_type=content_type,
-                                         codename=codename)
-        perm.save()
-    return perm
+    Returns:
+    """
+    for through_model, object_field in ((User.user_permissions.through, 'user_id'),
+                                        (Group.permissions.through, 'group_id')):
+        object_ids = list(through_model.objects.filter(permission_id=int(source_permission_id))
+                                               .values_list(object_field, flat=True))
+        if len(object_ids) > 0:
+            _add_permissions(through_model, object_field, object_ids, [target_permission_id])
 
 
 def add_permission_to_user(user, permission):
@@ -91,7 +133,7 @@ def add_permission_to_user(user, permission):
     Returns:
     """
     user.user_permissions.add(permission)
-    user.save()
+    request_cache.clear()
 
 
 def add_permission_to_group(group, permission):
@@ -104,7 +146,7 @@ def add_permission_to_group(group, permission):
     Returns:
     """
     group.permissions.add(permission)
-    group.save()
+    request_cache.clear()
 
 
 def remove_permission_to_user(user, permission):
@@ -117,7 +159,7 @@ def remove_permission_to_user(user, permission):
     Returns:
     """
     user.user_permissions.remove(permission)
-    user.save()
+    request_cache.clear()
 
 
 def remove_permission_to_group(group, permission):
@@ -130,20 +172,151 @@ def remove_permission_to_group(group, permission):
     Returns:
     """
     group.permissions.remove(permission)
-    group.save()
+    request_cache.clear()
+
+
+def add_permissions_to_users(users, permission_ids):
+    """ Add permissions to users, with a single insert.
+
+    Args:
+        users
+        permission_ids
+
+    Returns:
+        int: number of users given at least one of the permissions
+    """
+    return _add_permissions(User.user_permissions.through, 'user_id', [user.id for user in users], permission_ids)
+
+
+def add_permissions_to_groups(groups, permission_ids):
+    """ Add permissions to groups, with a single insert.
+
+    Args:
+        groups
+        permission_ids
+
+    Returns:
+        int: number of groups given at least one of the permissions
+    """
+    return _add_permissions(Group.permissions.through, 'group_id', [group.id for group in groups], permission_ids)
+
+
+def remove_permissions_to_users(users, permission_ids):
+    """ Remove permissions from users, with a single delete.
+
+    Args:
+        users
+        permission_ids
+
+    Returns:
+    """
+    _remove_permissions(User.user_permissions.through, 'user_id', [user.id for user in users], permission_ids)
 
 
+def remove_permissions_to_groups(groups, permission_ids):
+    """ Remove permissions from groups, with a single delete.
+
+    Args:
+        groups
+        permission_ids
+
+    Returns:
+    """
+    _remove_permissions(Group.permissions.through, 'group_id', [group.id for group in groups], permission_ids)
+
+
+def _add_permissions(through_model, object_field, object_ids, permission_ids):
+    """ Insert the missing rows of a permission many to many table.
+
+    Args:
+        through_model: many to many table between the permissions and the users or groups
+        object_field: name of the user or group column
+        object_ids: ids of the users or groups
+        permission_ids
+
+    Returns:
+        int: number of users or groups given at least one of the permissions
+    """
+    permission_ids = [int(permission_id) for permission_id in permission_ids]
+    with transaction.atomic():
+        existing_rows = set(through_model.objects.filter(**{object_field + '__in': object_ids,
+                                                            'permission_id__in': permission_ids})
+                                                 .values_list(object_field, 'permission_id'))
+        new_rows = [(object_id, permission_id)
+                    for object_id in set(object_ids)
+                    for permission_id in permission_ids
+                    if (object_id, permission_id) not in existing_rows]
+        through_model.objects.bulk_create([through_model(**{object_field: object_id, 'permission_id': permission_id})
+                                           for object_id, permission_id in new_rows])
+    _send_permissions_changed(through_model, 'post_add', object_ids, permission_ids)
+    return len({object_id for object_id, _ in new_rows})
+
+
+def _remove_permissions(through_model, object_field, object_ids, permission_ids):
+    """ Delete the rows of a permission many to many table.
+
+    Args:
+        through_model: many to many table between the permissions and the users or groups
+        object_field: name of the user or group column
+        object_ids: ids of the users or groups
+        permission_ids
+
+    Returns:
+    """
+    permission_ids = [int(permission_id) for permission_id in permission_ids]
+    with transaction.atomic():
+        through_model.objects.filter(**{object_field + '__in': object_ids,
+                                        'permission_id__in': permission_ids}).delete()
+    _send_permissions_changed(through_model, 'post_remove', object_ids, permission_ids)
+
+
+def _send_permissions_changed(through_model, action, object_ids, permission_ids):
+    """ Send the m2m_changed signal that bulk queries skip, so that the access caches are updated.
+    The signal is sent once the current transaction is committed (now if no atomic block is active), so that the
+    receivers do not cache the permissions before the change is visible to the other requests.
+
+    Args:
+        through_model: many to many table between the permissions and the users or groups
+        action: post_add or post_remove
+        object_ids: ids of the users or groups
+        permission_ids
+
+    Returns:
+    """
+    model = User if through_model is User.user_permissions.through else Group
+
+    def _send():
+        for permission in Permission.objects.filter(pk__in=permission_ids):
+            m2m_changed.send(sender=through_model, instance=permission, action=action, reverse=True,
+                             model=model, pk_set=set(object_ids), using=permission._state.db)
+
+    transaction.on_commit(_send)
+    request_cache.clear()
+
+
+@request_cache.memoize(lambda: None)
 def get_all_public_workspace_permission():
     """ Get all permissions related to public workspaces.
+    The ids are kept in the shared cache, and updated when the permissions of the special groups change.
 
     Return:
     """
-    return [str(perm.id) for perm in Permission.objects.filter((Q(group=group_api.get_default_group())
-                                                                & Q(group=group_api.get_anonymous_group())),
-                                                               content_type__app_label=CONTENT_TYPE_APP_LABEL,
+    return list(workspace_cache.get_public_permission_ids(_get_all_public_workspace_permission))
+
+
+def _get_all_public_workspace_permission():
+    """ Get all permissions related to public workspaces from the database.
+
+    Return:
+    """
+    # Chained filters: the permission has to be given to both groups (a single filter would match the same group)
+    return [str(perm.id) for perm in Permission.objects.filter(group=group_utils.get_default_group())
+                                                       .filter(group=group_utils.get_anonymous_group())
+                                                       .filter(content_type__app_label=CONTENT_TYPE_APP_LABEL,
                                                                codename__startswith=CAN_READ_CODENAME)]
 
 
+@request_cache.memoize(lambda user_id: str(user_id))
 def get_all_workspace_permissions_user_can_write(user_id):
     """ Get a list of permission ids of workspaces that the user has write access.
 
@@ -159,6 +332,7 @@ def get_all_workspace_permissions_user_can_write(user_id):
                                                                codename__startswith=CAN_WRITE_CODENAME)]
 
 
+@request_cache.memoize(lambda user_id: str(user_id))
 def get_all_workspace_permissions_user_can_read(user_id):
     """ Get a list of permission ids of workspaces that the user has read access.
 
@@ -168,14 +342,42 @@ def get_all_workspace_permissions_user_can_read(user_id):
     Return:
     """
     user = user_api.get_user_by_id(user_id)
-    return [str(perm.id) for perm in Permission.objects.filter((Q(user=user) 
-                                                                | Q(group__in=user.groups.all())
-                                                                | (Q(group=group_api.get_default_group())
-                                                                   & Q(group=group_api.get_anonymous_group()))),
-                                                               content_type__app_label=CONTENT_TYPE_APP_LABEL,
-                                                               codename__startswith=CAN_READ_CODENAME)]
+    read_permissions = [str(perm.id) for perm in Permission.objects.filter((Q(user=user)
+                                                                           | Q(group__in=user.groups.all())),
+                                                                          content_type__app_label=CONTENT_TYPE_APP_LABEL,
+                                                                          codename__startswith=CAN_READ_CODENAME)]
+    return list(set(read_permissions) | set(get_all_public_workspace_permission()))
+
+
+@request_cache.memoize(lambda user_id: str(user_id))
+def get_workspace_permission_ids(user_id):
+    """ Get the ids of the workspace permissions that the user can read, can write, and of the public ones.
+    The number of queries does not depend on the number of permissions or groups of the user (the user is not loaded).
+
+    Args:
+        user_id
+
+    Return:
+        WorkspacePermissionIds: frozensets of permission ids (read, write, public)
+    """
+    public_permissions = set(get_all_public_workspace_permission())
 
+    read_permissions = set(public_permissions)
+    write_permissions = set()
+    for perm_id, codename in Permission.objects.filter((Q(user__id=user_id) | Q(group__user__id=user_id)),
+                                                       content_type__app_label=CONTENT_TYPE_APP_LABEL)\
+                                               .values_list('id', 'codename').distinct():
+        if codename.startswith(CAN_READ_CODENAME):
+            read_permissions.add(str(perm_id))
+        elif codename.startswith(CAN_WRITE_CODENAME):
+            write_permissions.add(str(perm_id))
 
+    return WorkspacePermissionIds(read=frozenset(read_permissions),
+                                  write=frozenset(write_permissions),
+                                  public=frozenset(public_permissions))
+
+
+@request_cache.memoize(lambda permission_id: str(permission_id))
 def is_workspace_public(permission_id):
     """ Check if the workspace is public.
 
@@ -184,10 +386,7 @@ def is_workspace_public(permission_id):
 
     Returns:
     """
-    permission = Permission.objects.get(pk=permission_id)
-    group_anonymous = group_api.get_anonymous_group()
-    group_default = group_api.get_default_group()
-    return permission in group_anonymous.permissions.all() and permission in group_default.permissions.all()
+    return str(permission_id) in get_all_public_workspace_permission()
 
 
 def get_by_id(permission_id):
@@ -214,6 +413,9 @@ def delete_permission(permission_id):
         perm.delete()
     except Exception, e:
         pass
+    _permission_labels.delete(str(permission_id))
+    workspace_cache.invalidate_public_permission_ids()
+    request_cache.clear()
 
 
 def get_permission_label(permission_id):
@@ -224,8 +426,12 @@ def get_permission_label(permission_id):
 
     Return:
     """
-    permission = Permission.objects.get(pk=permission_id)
-    return permission.content_type.app_label + "." + permission.codename
+    label = _permission_labels.get(str(permission_id))
+    if label is None:
+        permission = Permission.objects.select_related('content_type').get(pk=permission_id)
+        label = permission.content_type.app_label + "." + permission.codename
+        _permission_labels.set(str(permission_id), label)
+    return label
 
 
 def check_if_group_has_perm(group, permission):
@@ -237,3 +443,112 @@ def check_if_group_has_perm(group, permission):
     Returns:
     """
     return len(group.permissions.filter(id=str(permission.id))) == 1
+
+
+def get_all_users_with_perms(permission_ids):
+    """ Get the users that have at least one of the permissions directly, with a single query.
+
+    Args:
+        permission_ids:
+    Returns:
+    """
+    return User.objects.filter(user_permissions__in=permission_ids).distinct()
+
+
+def get_all_groups_with_perms(permission_ids):
+    """ Get the groups that have at least one of the permissions, with a single query.
+
+    Args:
+        permission_ids:
+    Returns:
+    """
+    return Group.objects.filter(permissions__in=permission_ids).distinct()
+
+
+def get_users_perms_matrix(read_permission_id, write_permission_id):
+    """ Get, for each user with the read or the write permission, if he has each of them. Single query.
+
+    Args:
+        read_permission_id:
+        write_permission_id:
+    Returns:
+        queryset of dict: object_id, object_name, can_read (0 or 1), can_write (0 or 1), sorted by username
+    """
+    return _get_perms_matrix(User.user_permissions.through, 'user', 'username',
+                             read_permission_id, write_permission_id)
+
+
+def get_groups_perms_matrix(read_permission_id, write_permission_id):
+    """ Get, for each group with the read or the write permission, if it has each of them. Single query.
+
+    Args:
+        read_permission_id:
+        write_permission_id:
+    Returns:
+        queryset of dict: object_id, object_name, can_read (0 or 1), can_write (0 or 1), sorted by name
+    """
+    return _get_perms_matrix(Group.permissions.through, 'group', 'name',
+                             read_permission_id, write_permission_id)
+
+
+def _get_perms_matrix(through_model, object_field, name_field, read_permission_id, write_permission_id):
+    """ Group the rows of a permission many to many table by user or group, flag the read and write permissions.
+
+    Args:
+        through_model: many to many table between the permissions and the users or groups
+        object_field: name of the user or group relation
+        name_field: name of the field of the user or group used as name
+        read_permission_id:
+        write_permission_id:
+    Returns:
+    """
+    read_permission_id = int(read_permission_id)
+    write_permission_id = int(write_permission_id)
+    return through_model.objects.filter(permission_id__in=[read_permission_id, write_permission_id])\
+        .annotate(object_id=F(object_field + '_id'), object_name=F(object_field + '__' + name_field))\
+        .values('object_id', 'object_name')\
+        .annotate(can_read=Max(Case(When(permission_id=read_permission_id, then=Value(1)),
+                                    default=Value(0), output_field=IntegerField())),
+                  can_write=Max(Case(When(permission_id=write_permission_id, then=Value(1)),
+                                     default=Value(0), output_field=IntegerField())))\
+        .order_by(Lower('object_name'))
+
+
+def get_all_users_without_perms(permission_ids):
+    """ Get the users that don't have any of the permissions directly (query evaluated by the database).
+
+    Args:
+        permission_ids:
+    Returns:
+    """
+    through_model = User.user_permissions.through
+    return User.objects.exclude(pk__in=through_model.objects.filter(permission_id__in=permission_ids)
+                                                            .values('user_id'))
+
+
+def get_all_groups_without_perms(permission_ids):
+    """ Get the groups that don't have any of the permissions (query evaluated by the database).
+
+    Args:
+        permission_ids:
+    Returns:
+    """
+    through_model = Group.permissions.through
+    return Group.objects.exclude(pk__in=through_model.objects.filter(permission_id__in=permission_ids)
+                                                             .values('group_id'))
+
+
+def check_if_user_has_any_perm(user, permission_ids):
+    """ Check if user has one of the permissions, directly or through one of his groups, with a single query.
+
+    Args:
+        user:
+        permission_ids:
+    Returns:
+    """
+    if user.is_anonymous():
+        # the permissions of the anonymous group are the public ones, checked separately
+        return False
+
+    return Permission.objects.filter(Q(user=user) | Q(group__user=user),
+                                     pk__in=[int(permission_id) for permission_id in permission_ids]).exists()
@@ -0,0 +1,98 @@
+""" Core workspace app settings
+"""
+from django.conf import settings
+
+if not settings.configured:
+    settings.configure()
+
+WORKSPACE_ACCESS_CACHE = getattr(settings, 'WORKSPACE_ACCESS_CACHE', None)
+""" str: Name of the Django cache (CACHES setting) sharing the accessible workspace ids between workers.
+    None disables the cache.
+"""
+
+WORKSPACE_ACCESS_CACHE_TIMEOUT = getattr(settings, 'WORKSPACE_ACCESS_CACHE_TIMEOUT', 300)
+""" int: Lifetime, in seconds, of the cached accessible workspace ids.
+"""
+
+WORKSPACE_PERMISSION_LABEL_CACHE_SIZE = getattr(settings, 'WORKSPACE_PERMISSION_LABEL_CACHE_SIZE', 2048)
+""" int: Maximum number of permission labels kept in memory by each process.
+"""
+
+WORKSPACE_PERMISSION_LABEL_CACHE_TIMEOUT = getattr(settings, 'WORKSPACE_PERMISSION_LABEL_CACHE_TIMEOUT', 300)
+""" int: Number of seconds a permission label is kept in memory. The labels are only invalidated in the process
+    deleting the permission: the other processes may use the label of a deleted permission until it expires.
+"""
+
+WORKSPACE_DENORMALIZED_ACL = getattr(settings, 'WORKSPACE_DENORMALIZED_ACL', False)
+""" bool: Store the ids of the users and groups with access on the workspace documents, and use them to list the
+    workspaces a user can read or write and the public workspaces, and to check the access to a workspace.
+    The lists are updated after the commit of the permission change: run the workspace_acl_reconcile command after
+    enabling it, and to repair the lists (workspace_acl_reconcile --check reports the workspaces that drifted).
+"""
+
+WORKSPACE_PAGINATION_COUNT_LIMIT = getattr(settings, 'WORKSPACE_PAGINATION_COUNT_LIMIT', 10000)
+""" int: Maximum number of workspaces counted to give the total of a paginated listing.
+"""
+
+WORKSPACE_BACKGROUND_WORKERS = getattr(settings, 'WORKSPACE_BACKGROUND_WORKERS', 2)
+""" int: Number of threads of each process running the background tasks (deletion of the workspaces).
+"""
+
+WORKSPACE_BACKGROUND_QUEUE_SIZE = getattr(settings, 'WORKSPACE_BACKGROUND_QUEUE_SIZE', 100)
+""" int: Maximum number of background tasks waiting for a thread in each process.
+"""
+
+WORKSPACE_DELETION_BATCH_SIZE = getattr(settings, 'WORKSPACE_DELETION_BATCH_SIZE', 1000)
+""" int: Number of data unassigned per update when a workspace is deleted.
+"""
+
+WORKSPACE_JOB_LEASE_TIMEOUT = getattr(settings, 'WORKSPACE_JOB_LEASE_TIMEOUT', 3600)
+""" int: Number of seconds after which a running job is considered stopped: the workspace_jobs_run command
+    (--include-running) can run it again.
+"""
+
+WORKSPACE_METRICS = getattr(settings, 'WORKSPACE_METRICS', False)
+""" bool: Record the number of calls and the latency of the access controlled API functions and of the ajax views,
+    and serve them at the metrics url (Prometheus text format). The values are kept by each process.
+"""
+
+WORKSPACE_METRICS_ALLOWED_IPS = getattr(settings, 'WORKSPACE_METRICS_ALLOWED_IPS', ())
+""" tuple: Addresses (REMOTE_ADDR) allowed to read the metrics url without login, e.g. the Prometheus server.
+    The staff users can always read it.
+"""
+
+WORKSPACE_METRICS_BUCKETS = getattr(settings, 'WORKSPACE_METRICS_BUCKETS',
+                                    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+""" tuple: Upper bounds, in seconds, of the buckets of the latency histograms.
+"""
+
+WORKSPACE_METRICS_SLOW_CALL_THRESHOLD = getattr(settings, 'WORKSPACE_METRICS_SLOW_CALL_THRESHOLD', 0.5)
+""" float: Duration, in seconds, above which a call is logged as slow.
+"""
+
+WORKSPACE_METRICS_SLOW_CALL_THRESHOLDS = getattr(settings, 'WORKSPACE_METRICS_SLOW_CALL_THRESHOLDS', {})
+""" dict: Slow call thresholds of specific functions, by label (e.g. 'components.workspace.api.get_acl_matrix').
+"""
+
+WORKSPACE_QUERY_COUNT = getattr(settings, 'WORKSPACE_QUERY_COUNT', settings.DEBUG)
+""" bool: Listen to the Mongo commands, so that they can be counted (QueryCountMiddleware, assert_max_queries).
+"""
+
+WORKSPACE_RECORDER_FILE = getattr(settings, 'WORKSPACE_RECORDER_FILE', None)
+""" str: JSONL file receiving the requests to the workspace urls (WorkloadRecorderMiddleware), to replay them with
+    the workspace_replay command. Each process writes its own file: the id of the process is added before the
+    extension. None disables the recording.
+"""
+
+WORKSPACE_RECORDER_RAW_PARAMS = getattr(settings, 'WORKSPACE_RECORDER_RAW_PARAMS', False)
+""" bool: Store the values of the recorded parameters (user ids, titles, searches) in clear, so that the trace can be
+    replayed. By default they are replaced by a keyed hash.
+"""
+
+WORKSPACE_RECORDER_BUFFER_SIZE = getattr(settings, 'WORKSPACE_RECORDER_BUFFER_SIZE', 100)
+""" int: Number of requests kept in memory by each process before they are written to its file.
+"""
+
+WORKSPACE_RECORDER_FLUSH_INTERVAL = getattr(settings, 'WORKSPACE_RECORDER_FLUSH_INTERVAL', 5)
+""" int: Maximum number of seconds a request is kept in memory before being written (checked at each request).
+"""
@@ -16,7 +16,7 @@ load_form_add_group = function() {
 		success: function(data){
             $("#banner_rights_errors").hide();
             $("#add-group-form").html(data.form);
-            InitSelectMultipleUsersOrGroups("#add-group-form #id_groups", "Groups");
+            InitSelectUsersOrGroups("#add-group-form #id_groups", searchGroupsUrl, "Search groups");
 	    },
         error:function(data){
             $("#form_edit_group_rights_errors").html(data.responseText);
@@ -43,24 +43,15 @@ call_ajax_add_group(selected, read, write)
 call_ajax_add_group = function(selected, read, write) {
     $("#banner_group_rights_errors").hide();
     $("#form_edit_group_rights_errors").html("");
-    $.ajax({
-    url : addGroupToWorkspaceUrl,
-    type : "POST",
-    dataType: "json",
-    data : {
-        workspace_id: workspace_id,
-        groups_id: selected,
-        read: read,
-        write: write
-    },
-    success: function(data){
-       location.reload();
-    },
-    error:function(data){
-        $("#form_edit_group_rights_errors").html(data.responseText);
-        $("#banner_group_rights_errors").show(500);
-    }
-});
+    run_in_background(addGroupToWorkspaceUrl, {workspace_id: workspace_id, groups_id: selected, read: read, write: write},
+        function(result){
+            location.reload();
+        },
+        function(message){
+            $("#form_edit_group_rights_errors").html(message);
+            $("#banner_group_rights_errors").show(500);
+        }
+    );
 };
 
 $('.add-group-btn').on('click', load_form_add_group);
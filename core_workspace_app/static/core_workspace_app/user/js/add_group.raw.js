@@ -1,2 +1,3 @@
 var editGroupRightFormsUrl = "{% url 'core_workspace_edit_rights_groups_form' %}";
-var addGroupToWorkspaceUrl = "{% url 'core_workspace_add_group_right_to_workspace' %}";
\ No newline at end of file
+var addGroupToWorkspaceUrl = "{% url 'core_workspace_add_group_right_to_workspace' %}";
+var searchGroupsUrl = "{% url 'core_workspace_search_groups_with_no_access' %}";
\ No newline at end of file
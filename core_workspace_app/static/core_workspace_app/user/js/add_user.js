@@ -16,7 +16,7 @@ load_form_add_user = function() {
 		success: function(data){
             $("#banner_rights_errors").hide();
             $("#add-user-form").html(data.form);
-             InitSelectMultipleUsersOrGroups("#add-user-form #id_users", "Users");
+            InitSelectUsersOrGroups("#add-user-form #id_users", searchUsersUrl, "Search users");
 	    },
         error:function(data){
             $("#form_edit_rights_errors").html(data.responseText);
@@ -43,24 +43,15 @@ call_ajax_add_user(selected, read, write)
 call_ajax_add_user = function(selected, read, write) {
     $("#banner_rights_errors").hide();
     $("#form_edit_rights_errors").html("");
-    $.ajax({
-    url : addUserToWorkspaceUrl,
-    type : "POST",
-    dataType: "json",
-    data : {
-        workspace_id: workspace_id,
-        users_id: selected,
-        read: read,
-        write: write
-    },
-    success: function(data){
-       location.reload();
-    },
-    error:function(data){
-        $("#form_edit_rights_errors").html(data.responseText);
-        $("#banner_rights_errors").show(500);
-    }
-});
+    run_in_background(addUserToWorkspaceUrl, {workspace_id: workspace_id, users_id: selected, read: read, write: write},
+        function(result){
+            location.reload();
+        },
+        function(message){
+            $("#form_edit_rights_errors").html(message);
+            $("#banner_rights_errors").show(500);
+        }
+    );
 };
 
 $('.add-user-btn').on('click', load_form_add_user);
@@ -1,2 +1,3 @@
 var editUserRightFormsUrl = "{% url 'core_workspace_edit_rights_users_form' %}";
-var addUserToWorkspaceUrl = "{% url 'core_workspace_add_user_right_to_workspace' %}";
\ No newline at end of file
+var addUserToWorkspaceUrl = "{% url 'core_workspace_add_user_right_to_workspace' %}";
+var searchUsersUrl = "{% url 'core_workspace_search_users_with_no_access' %}";
\ No newline at end of file
@@ -15,13 +15,82 @@ $(document).ready(function(){
     }
 });
 
-InitSelectMultipleUsersOrGroups = function(path_elt, place_holder)
+/**
+ * Typeahead picker: search the users or groups page by page, and add the picked ones to the multiple select
+ */
+InitSelectUsersOrGroups = function(path_elt, search_url, place_holder)
 {
-    $(path_elt).fSelect({
-        placeholder: place_holder,
-        numDisplayed: 500,
-        overflowText: '{n} selected',
-        searchText: 'Search',
-        showSearch: true
+    var $select = $(path_elt);
+    var $input = $('<input type="text" class="form-control" autocomplete="off">').attr("placeholder", place_holder);
+    var $selected = $('<div class="typeahead-selected"></div>');
+    var $results = $('<div class="list-group typeahead-results"></div>');
+    var page = 1;
+    var timer = null;
+    var request = null;
+
+    $select.hide().after($('<div class="typeahead"></div>').append($selected, $input, $results));
+
+    var search = function(append) {
+        if (request !== null) {
+            request.abort();
+        }
+        request = $.ajax({
+            url : search_url,
+            type : "POST",
+            dataType: "json",
+            data : {
+                workspace_id: workspace_id,
+                search: $input.val(),
+                page: page
+            },
+            success: function(data){
+                if (!append) {
+                    $results.empty();
+                }
+                $results.find(".typeahead-more").remove();
+                $.each(data.results, function(index, result) {
+                    if ($select.find('option[value="' + result.id + '"]').length == 0) {
+                        $('<a href="#" class="list-group-item typeahead-result"></a>').text(result.text)
+                            .data("result", result).appendTo($results);
+                    }
+                });
+                if (data.more) {
+                    $('<a href="#" class="list-group-item typeahead-more">More...</a>').appendTo($results);
+                }
+            },
+            complete: function(){
+                request = null;
+            }
+        });
+    };
+
+    $input.on("input", function() {
+        clearTimeout(timer);
+        timer = setTimeout(function() { page = 1; search(false); }, 300);
+    });
+    $input.on("focus", function() {
+        if ($results.children().length == 0) {
+            page = 1;
+            search(false);
+        }
+    });
+    $results.on("click", ".typeahead-more", function(event) {
+        event.preventDefault();
+        page += 1;
+        search(true);
+    });
+    $results.on("click", ".typeahead-result", function(event) {
+        event.preventDefault();
+        var result = $(this).data("result");
+        $('<option selected="selected"></option>').val(result.id).text(result.text).appendTo($select);
+        $('<span class="label label-primary"></span>').text(result.text + " ").data("id", result.id)
+            .append('<a href="#" class="typeahead-remove"><i class="fa fa-times"></i></a>').appendTo($selected);
+        $(this).remove();
+    });
+    $selected.on("click", ".typeahead-remove", function(event) {
+        event.preventDefault();
+        var $label = $(this).parent();
+        $select.find('option[value="' + $label.data("id") + '"]').remove();
+        $label.remove();
     });
 };
@@ -0,0 +1,51 @@
+/**
+ * Bulk operations run in background jobs
+ */
+var jobPollInterval = 1000;
+
+/**
+ * AJAX call, submit a bulk operation as a background job, then poll the job until it ends
+ */
+run_in_background = function(url, data, success, error) {
+    data.background = true;
+    // the operation is submitted only once, even if the request is sent again
+    data.idempotency_key = new Date().getTime() + "-" + Math.random().toString(36).substr(2);
+    $.ajax({
+        url : url,
+        type : "POST",
+        dataType: "json",
+        data : data,
+        success: function(job){
+            poll_job(job.job_id, success, error);
+        },
+        error:function(data){
+            error(data.responseText);
+        }
+    });
+};
+
+/**
+ * AJAX call, get the status of a job until it ends
+ */
+poll_job = function(job_id, success, error) {
+    $.ajax({
+        url : jobStatusUrl,
+        type : "GET",
+        dataType: "json",
+        data : {
+            job_id: job_id
+        },
+        success: function(job){
+            if (job.status == "success") {
+                success(job.result);
+            } else if (job.status == "failure") {
+                error(job.message);
+            } else {
+                setTimeout(function() { poll_job(job_id, success, error); }, jobPollInterval);
+            }
+        },
+        error:function(data){
+            error(data.responseText);
+        }
+    });
+};
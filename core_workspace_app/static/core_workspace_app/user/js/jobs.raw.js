@@ -0,0 +1 @@
+var jobStatusUrl = "{% url 'core_workspace_job_status' %}";
\ No newline at end of file
@@ -27,22 +27,21 @@ load_form_change_workspace = function() {
 
 assign_workspace = function() {
 var workspace_id = $( "#id_workspaces" ).val().trim();
-$.ajax({
-        url : assignWorkspaceUrl,
-        type : "POST",
-        dataType: "json",
-        data : {
-            workspace_id: workspace_id,
-            document_id: getSelectedDocument()
+run_in_background(assignWorkspaceUrl, {workspace_id: workspace_id, document_id: getSelectedDocument()},
+        function(result){
+            var errors = Object.keys(result.errors);
+            if (errors.length > 0) {
+                $("#assign_workspace_errors").text(errors.length + " record(s) could not be assigned.");
+                $("#banner_edit_errors").show(500)
+            } else {
+                location.reload();
+            }
         },
-		success: function(data){
-           location.reload();
-	    },
-        error:function(data){
-            $("#assign_workspace_errors").html(data.responseText);
+        function(message){
+            $("#assign_workspace_errors").html(message);
             $("#banner_edit_errors").show(500)
         }
-    });
+    );
 };
 
 
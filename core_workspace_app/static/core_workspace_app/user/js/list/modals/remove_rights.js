@@ -40,6 +40,6 @@ remove_rights = function(type) {
     });
 };
 
-$('.remove-user-btn').on('click', removeRightsUser);
-$('.remove-group-btn').on('click', removeRightsGroup);
+$(document).on('click', '.remove-user-btn', removeRightsUser);
+$(document).on('click', '.remove-group-btn', removeRightsGroup);
 $('#remove-yes').on('click', remove_rights);
@@ -12,21 +12,15 @@ setPublicWorkspace = function() {
  * AJAX call, public workspace
  */
 set_public_workspace = function(){
-    $.ajax({
-        url : publicWorkspaceUrl,
-        type : "POST",
-        dataType: "json",
-        data : {
-            workspace_id: getSelectedDocument()
+    run_in_background(publicWorkspaceUrl, {workspace_id: getSelectedDocument()},
+        function(result){
+            location.reload();
         },
-		success: function(data){
-			location.reload();
-	    },
-        error:function(data){
-            $("#public_workspace_errors").html(data.responseText);
+        function(message){
+            $("#public_workspace_errors").html(message);
             $("#banner_errors").show(500)
         }
-    });
+    );
 };
 
 
@@ -45,7 +45,7 @@ call_ajax_switch_right = function(selected, action, obj, group_or_user) {
 };
 
 
-$( "input[id*='btn-read-user']" ).on('change', switch_read_user);
-$( "input[id*='btn-write-user']" ).on('change', switch_write_user);
-$( "input[id*='btn-read-group']" ).on('change', switch_read_group);
-$( "input[id*='btn-write-group']" ).on('change', switch_write_group);
+$(document).on('change', "input[id*='btn-read-user']", switch_read_user);
+$(document).on('change', "input[id*='btn-write-user']", switch_write_user);
+$(document).on('change', "input[id*='btn-read-group']", switch_read_group);
+$(document).on('change', "input[id*='btn-write-group']", switch_write_group);
@@ -1,27 +1,83 @@
-if ( ! $.fn.dataTable.isDataTable( '#table-rights-user' ) ) {
-    $('#table-rights-user').DataTable({
-        "scrollY": "226px",
-        "iDisplayLength": 5,
-        "scrollCollapse": true,
-        "lengthMenu": [5, 10, 15, 20],
-        "columnDefs": [
-            {"className": "dt-center", "targets": 0}
-        ],
-        order: [[0, 'asc']],
-        "columns": [ null, { "orderable": false }, { "orderable": false }, { "orderable": false } ]
-    });
-}
+/**
+ * Rights tables, the rows are loaded page by page from the server
+ */
+escapeHtml = function(text) {
+    return $('<div/>').text(text).html();
+};
 
-if ( ! $.fn.dataTable.isDataTable( '#table-rights-group' ) ) {
-    $('#table-rights-group').DataTable({
-        "scrollY": "226px",
-        "iDisplayLength": 5,
-        "scrollCollapse": true,
-        "lengthMenu": [5, 10, 15, 20],
-        "columnDefs": [
-            {"className": "dt-center", "targets": 0}
-        ],
-        order: [[0, 'asc']],
-        "columns": [ null, { "orderable": false }, { "orderable": false }, { "orderable": false } ]
-    });
-}
+renderSwitch = function(right, group_or_user, object_id, checked) {
+    return '<label class="switch">' +
+                '<input id="btn-' + right + '-' + group_or_user + '-' + object_id + '" type="checkbox"' +
+                (checked ? ' checked' : '') + '>' +
+                '<span class="slider"></span>' +
+           '</label>';
+};
+
+initRightsTable = function(group_or_user) {
+    var table_id = '#table-rights-' + group_or_user;
+    if ( ! $.fn.dataTable.isDataTable( table_id ) ) {
+        $(table_id).DataTable({
+            "serverSide": true,
+            "processing": true,
+            "ajax": {
+                "url": rightsTableUrl,
+                "type": "POST",
+                "data": function(data) {
+                    data.workspace_id = workspace_id;
+                    data.group_or_user = group_or_user;
+                }
+            },
+            "scrollY": "226px",
+            "iDisplayLength": 5,
+            "scrollCollapse": true,
+            "lengthMenu": [5, 10, 15, 20],
+            "columnDefs": [
+                {"className": "dt-center", "targets": 0}
+            ],
+            order: [[0, 'asc']],
+            "columns": [
+                {
+                    "data": "object_name",
+                    "render": function(data) { return escapeHtml(data); }
+                },
+                {
+                    "data": "can_read",
+                    "orderable": false,
+                    "render": function(data, type, row) { return renderSwitch('read', group_or_user, row.object_id, data); }
+                },
+                {
+                    "data": "can_write",
+                    "orderable": false,
+                    "render": function(data, type, row) { return renderSwitch('write', group_or_user, row.object_id, data); }
+                },
+                {
+                    "data": null,
+                    "orderable": false,
+                    "render": function() {
+                        return '<a class="btn btn-default remove-' + group_or_user + '-btn">' +
+                                    '<i class="fa fa-edit"></i> Remove ' + group_or_user + ' access' +
+                               '</a>';
+                    }
+                }
+            ],
+            "createdRow": function(row, data) {
+                $(row).attr("objectid", data.object_id);
+            }
+        });
+    }
+};
+
+filterRightsTable = function() {
+    var $filter = $(this);
+    $('#' + $filter.parent().attr("data-table")).DataTable()
+        .column($filter.attr("data-column"))
+        .search($filter.val())
+        .draw();
+};
+
+$(document).on('change', '.rights-filter', filterRightsTable);
+
+$(document).ready(function() {
+    initRightsTable(user);
+    initRightsTable(group);
+});
@@ -0,0 +1 @@
+var rightsTableUrl = "{% url 'core_workspace_rights_table' %}";
\ No newline at end of file
@@ -7,18 +7,29 @@ from core_workspace_app.views import ajax as workspace_ajax, views as workspace_
 urlpatterns = [
     # Ajax
     url(r'^create-workspace', workspace_ajax.create_workspace, name='core_workspace_create_workspace'),
+    url(r'^delete-workspace', workspace_ajax.delete_workspace, name='core_workspace_delete_workspace'),
+    url(r'^workspace-deletion-status', workspace_ajax.get_workspace_deletion_status,
+        name='core_workspace_deletion_status'),
     url(r'^change-workspace', workspace_ajax.load_form_change_workspace, name='core_workspace_change_workspace'),
     url(r'^assign-workspace', workspace_ajax.assign_workspace, name='core_workspace_assign_workspace'),
     url(r'^public-workspace', workspace_ajax.set_public_workspace, name='core_workspace_public_workspace'),
     url(r'^edit-rights/(?P<workspace_id>\w+)$', workspace_views.edit_rights,
         name='core_workspace_edit_rights_workspace'),
+    url(r'^rights-table', workspace_ajax.load_rights_table, name='core_workspace_rights_table'),
     url(r'^add-user-form', workspace_ajax.load_add_user_form, name='core_workspace_edit_rights_users_form'),
     url(r'^add-user-right-to-workspace', workspace_ajax.add_user_right_to_workspace,
         name='core_workspace_add_user_right_to_workspace'),
     url(r'^switch-right', workspace_ajax.switch_right, name='core_workspace_switch_right'),
     url(r'^remove-rights', workspace_ajax.remove_user_or_group_rights, name='core_workspace_remove_rights'),
     url(r'^add-group-form', workspace_ajax.load_add_group_form, name='core_workspace_edit_rights_groups_form'),
+    url(r'^search-users-with-no-access', workspace_ajax.search_users_with_no_access,
+        name='core_workspace_search_users_with_no_access'),
+    url(r'^search-groups-with-no-access', workspace_ajax.search_groups_with_no_access,
+        name='core_workspace_search_groups_with_no_access'),
     url(r'^add-group-right-to-workspace', workspace_ajax.add_group_right_to_workspace,
         name='core_workspace_add_group_right_to_workspace'),
+    url(r'^job-status', workspace_ajax.get_job_status, name='core_workspace_job_status'),
+    url(r'^retry-job', workspace_ajax.retry_job, name='core_workspace_retry_job'),
+    url(r'^metrics$', workspace_views.metrics, name='core_workspace_metrics'),
 
 ]
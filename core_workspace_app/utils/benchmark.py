@@ -0,0 +1,248 @@
+"""
+    Synthetic populations and measures for the benchmarks of the workspace and permission APIs
+"""
+import gc
+import random
+from timeit import default_timer
+
+from bson.objectid import ObjectId
+from django.contrib.auth.models import Group, User
+from django.db import connections
+from mongoengine import connection as mongoengine_connection
+
+from core_main_app.components.data.models import Data
+from core_workspace_app.components.workspace import api as workspace_api
+from core_workspace_app.components.workspace.models import Workspace
+from core_workspace_app.permissions import api as permission_api
+from core_workspace_app.components.workspace import cache as workspace_cache
+from core_workspace_app.utils import group as group_utils
+from core_workspace_app.utils import query_count
+from core_workspace_app.utils import request_cache
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2 without the pytracemalloc backport: the memory is not measured
+    tracemalloc = None
+
+
+class Population(object):
+    """ Users, groups, workspaces and data created for a benchmark. Their names start with the prefix.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.users = []
+        self.groups = []
+        self.workspaces = []
+        self.data_ids_by_owner_id = {}
+
+
+def get_live_databases():
+    """ Return the configured databases that may hold real data: the SQL databases that are not sqlite, and the Mongo
+    database if it is not mongomock.
+
+    Returns:
+        list: names of the databases
+    """
+    live_databases = ['sql:' + alias for alias in connections if connections[alias].vendor != 'sqlite']
+    try:
+        client = mongoengine_connection.get_connection()
+    except Exception:
+        # no Mongo connection configured
+        client = None
+    if client is not None and not type(client).__module__.startswith('mongomock'):
+        live_databases.append('mongo')
+    return live_databases
+
+
+def generate_population(prefix, nb_users, nb_groups, nb_workspaces, nb_data, max_acl_size=10, public_ratio=0.1,
+                        seed=0):
+    """ Create users, groups, workspaces with random access control lists, and data.
+
+    Args:
+        prefix: prefix of the names, to find the objects again
+        nb_users:
+        nb_groups:
+        nb_workspaces:
+        nb_data:
+        max_acl_size: maximum number of users and of groups given access to each workspace
+        public_ratio: part of the workspaces set public
+        seed: seed of the random generator, to build the same population again
+
+    Returns:
+        Population
+    """
+    rand = random.Random(seed)
+    population = Population(prefix)
+
+    User.objects.bulk_create([User(username='{0}user_{1}'.format(prefix, index)) for index in range(nb_users)])
+    population.users = list(User.objects.filter(username__startswith=prefix + 'user_').order_by('id'))
+
+    Group.objects.bulk_create([Group(name='{0}group_{1}'.format(prefix, index)) for index in range(nb_groups)])
+    population.groups = list(Group.objects.filter(name__startswith=prefix + 'group_').order_by('id'))
+
+    # each user is a member of up to 3 groups
+    if len(population.groups) > 0:
+        memberships = []
+        for user in population.users:
+            for group in rand.sample(population.groups, min(rand.randint(0, 3), len(population.groups))):
+                memberships.append(User.groups.through(user_id=user.id, group_id=group.id))
+        User.groups.through.objects.bulk_create(memberships)
+
+    can_set_public = group_utils.get_anonymous_group() is not None and group_utils.get_default_group() is not None
+    for index in range(nb_workspaces):
+        owner = rand.choice(population.users)
+        workspace = workspace_api.create_and_save(owner.id, '{0}workspace_{1}'.format(prefix, index))
+
+        readers = rand.sample(population.users, min(rand.randint(0, max_acl_size), len(population.users)))
+        writers = rand.sample(readers, rand.randint(0, len(readers)))
+        groups = rand.sample(population.groups, min(rand.randint(0, max_acl_size), len(population.groups)))
+        if len(readers) > 0:
+            workspace_api.add_users_access_to_workspace(workspace, readers, True, False, owner)
+        if len(writers) > 0:
+            workspace_api.add_users_access_to_workspace(workspace, writers, False, True, owner)
+        if len(groups) > 0:
+            workspace_api.add_groups_access_to_workspace(workspace, groups, True, rand.random() < 0.5, owner)
+        if can_set_public and rand.random() < public_ratio:
+            workspace_api.set_workspace_public(workspace)
+
+        population.workspaces.append(workspace)
+
+    # the data only have the fields used by the workspace app (no template)
+    data_list = []
+    for index in range(nb_data):
+        owner = rand.choice(population.users)
+        workspace = rand.choice(population.workspaces) if len(population.workspaces) > 0 else None
+        data_list.append(Data(title='{0}data_{1}'.format(prefix, index),
+                              user_id=str(owner.id),
+                              xml_content='<root/>',
+                              workspace=workspace if rand.random() < 0.5 else None))
+    if len(data_list) > 0:
+        for data_id, data in zip(Data.objects.insert(data_list, load_bulk=False), data_list):
+            population.data_ids_by_owner_id.setdefault(data.user_id, []).append(str(data_id))
+
+    return population
+
+
+def delete_population(prefix):
+    """ Delete the users, groups, workspaces and data created with the prefix.
+
+    Args:
+        prefix:
+
+    Returns:
+    """
+    Data.objects(title__startswith=prefix + 'data_').delete()
+    for workspace in Workspace.objects(title__startswith=prefix + 'workspace_'):
+        permission_api.delete_permission(workspace.read_perm_id)
+        permission_api.delete_permission(workspace.write_perm_id)
+        workspace.delete()
+    User.objects.filter(username__startswith=prefix + 'user_').delete()
+    Group.objects.filter(name__startswith=prefix + 'group_').delete()
+
+
+def get_data_workspaces(data_ids):
+    """ Return the workspace of each data, to restore the assignments after a run (see set_data_workspaces).
+
+    Args:
+        data_ids:
+
+    Returns:
+        dict: workspace object id (None if not assigned) by data id
+    """
+    return {str(document['_id']): document.get('workspace') for document in
+            Data._get_collection().find({'_id': {'$in': [ObjectId(data_id) for data_id in data_ids]}},
+                                        {'workspace': 1})}
+
+
+def set_data_workspaces(data_workspaces):
+    """ Assign the data to the given workspaces again.
+
+    Args:
+        data_workspaces: workspace object id (None if not assigned) by data id
+
+    Returns:
+    """
+    data_ids_by_workspace = {}
+    for data_id, workspace_id in data_workspaces.items():
+        data_ids_by_workspace.setdefault(workspace_id, []).append(ObjectId(data_id))
+
+    collection = Data._get_collection()
+    for workspace_id, object_ids in data_ids_by_workspace.items():
+        if workspace_id is None:
+            collection.update_many({'_id': {'$in': object_ids}}, {'$unset': {'workspace': ''}})
+        else:
+            collection.update_many({'_id': {'$in': object_ids}}, {'$set': {'workspace': workspace_id}})
+
+
+def measure(name, func, repeat=5, reset=None):
+    """ Run a function several times, and measure its duration, its queries and its memory peak.
+    The caches are cleared and the state is reset before each run, so that each run does the same work.
+
+    Args:
+        name: name of the measure
+        func: function without arguments
+        repeat: number of runs
+        reset: function without arguments restoring the state changed by func, not timed
+
+    Returns:
+        dict: durations in seconds, numbers of queries and memory peak in bytes (None if not measured) of a run
+    """
+    if repeat < 1:
+        raise ValueError('At least one run is needed.')
+
+    def _reset():
+        if reset is not None:
+            reset()
+        workspace_cache.invalidate_all()
+        request_cache.clear()
+
+    durations = []
+    for index in range(repeat):
+        _reset()
+        gc.collect()
+        start = default_timer()
+        func()
+        durations.append(default_timer() - start)
+
+    # queries and memory of a separate run, not to slow down the timed runs
+    _reset()
+    with query_count.count_queries() as counter:
+        memory_peak = None
+        if tracemalloc is not None:
+            tracemalloc.start()
+            func()
+            memory_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            func()
+    _reset()
+
+    first = durations[0]
+    durations.sort()
+    return {'name': name,
+            'repeat': repeat,
+            'first': first,
+            'min': durations[0],
+            'median': durations[len(durations) // 2],
+            'mean': sum(durations) / len(durations),
+            'max': durations[-1],
+            'sql_queries': counter.sql,
+            'mongo_commands': counter.mongo,
+            'memory_peak': memory_peak}
+
+
+def percentile(sorted_values, ratio):
+    """ Return a percentile of sorted values (nearest rank).
+
+    Args:
+        sorted_values:
+        ratio: between 0 and 1 (0.95 for the 95th percentile)
+
+    Returns:
+    """
+    if len(sorted_values) == 0:
+        return None
+    index = int(round(ratio * len(sorted_values) + 0.5)) - 1
+    return sorted_values[max(0, min(index, len(sorted_values) - 1))]
@@ -0,0 +1,100 @@
+"""
+    Bounded thread pool running background tasks in the web process
+"""
+import logging
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from django.db import connection
+
+from core_workspace_app import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedExecutor(object):
+    """ Run functions in a fixed number of daemon threads, with a bounded queue of waiting tasks.
+    The threads are started on the first submission, so that they are created in the worker process.
+    """
+
+    def __init__(self, max_workers, max_pending):
+        """ Create the executor.
+
+        Args:
+            max_workers: number of threads
+            max_pending: maximum number of tasks waiting for a thread
+        """
+        self._max_workers = max_workers
+        self._tasks = queue.Queue(max_pending)
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """ Queue a function call.
+
+        Args:
+            func:
+            *args:
+            **kwargs:
+
+        Returns:
+            bool: True if the task was queued, False if the queue is full
+
+        """
+        self._start_threads()
+        try:
+            self._tasks.put_nowait((func, args, kwargs))
+        except queue.Full:
+            logger.warning("Background task queue is full, task %s not queued.", func.__name__)
+            return False
+        return True
+
+    def _start_threads(self):
+        """ Start the missing threads.
+
+        Returns:
+        """
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self._max_workers:
+                thread = threading.Thread(target=self._run, name='core_workspace_app_worker')
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self):
+        """ Run the queued tasks.
+
+        Returns:
+        """
+        while True:
+            func, args, kwargs = self._tasks.get()
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                logger.exception("Background task %s failed.", func.__name__)
+            finally:
+                # the threads are long lived: do not keep a database connection between tasks
+                connection.close()
+                self._tasks.task_done()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """ Return the executor of the process.
+
+    Returns:
+        BoundedExecutor
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = BoundedExecutor(settings.WORKSPACE_BACKGROUND_WORKERS, settings.WORKSPACE_BACKGROUND_QUEUE_SIZE)
+        return _executor
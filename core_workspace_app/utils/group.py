@@ -1,6 +1,10 @@
 """
     Utils for groups
 """
+from core_main_app.components.group import api as group_api
+from core_workspace_app.utils import request_cache
+
+_special_groups = {}
 
 
 def remove_list_object_from_list(list_object, list_object_to_be_removed):
@@ -16,3 +20,48 @@ def remove_list_object_from_list(list_object, list_object_to_be_removed):
         if group in list_object:
             list_object.remove(group)
 
+
+def _get_special_group(name, get_group):
+    """ Return the special group, loaded once per process.
+
+    Args:
+        name: key of the group
+        get_group: function loading the group
+
+    Returns:
+    """
+    group = _special_groups.get(name)
+    if group is None:
+        group = get_group()
+        # The group may not be created yet (first migrations), do not cache it
+        if group is not None:
+            _special_groups[name] = group
+    return group
+
+
+def get_anonymous_group():
+    """ Return the anonymous group, loaded once per process.
+
+    Returns:
+    """
+    return _get_special_group('anonymous', group_api.get_anonymous_group)
+
+
+def get_default_group():
+    """ Return the default group, loaded once per process.
+
+    Returns:
+    """
+    return _get_special_group('default', group_api.get_default_group)
+
+
+@request_cache.memoize(lambda user: str(user.id))
+def get_group_ids_by_user(user):
+    """ Return the ids of the groups of the user.
+
+    Args:
+        user:
+
+    Returns:
+    """
+    return [str(group_id) for group_id in user.groups.values_list('id', flat=True)]
@@ -0,0 +1,77 @@
+"""
+    Bounded in-process cache
+"""
+import collections
+import threading
+import time
+
+
+class LRUCache(object):
+    """
+        Thread-safe cache keeping the most recently used values, up to a maximum size and for a limited time.
+    """
+
+    def __init__(self, max_size, timeout=None):
+        """ Create an empty cache.
+
+        Args:
+            max_size: maximum number of values kept in the cache
+            timeout: number of seconds a value is kept, None to keep it until it is evicted
+        """
+        self.max_size = max_size
+        self.timeout = timeout
+        self._values = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """ Return the value cached under the key, and mark it as recently used.
+
+        Args:
+            key:
+            default: returned when the key is not cached, or expired
+
+        Returns:
+        """
+        with self._lock:
+            try:
+                value, expiry = self._values.pop(key)
+            except KeyError:
+                return default
+            if expiry is not None and expiry <= time.time():
+                return default
+            self._values[key] = (value, expiry)
+            return value
+
+    def set(self, key, value):
+        """ Cache the value under the key, evict the least recently used value if the cache is full.
+
+        Args:
+            key:
+            value:
+
+        Returns:
+        """
+        with self._lock:
+            self._values.pop(key, None)
+            self._values[key] = (value, None if self.timeout is None else time.time() + self.timeout)
+            while len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+
+    def delete(self, key):
+        """ Remove the value cached under the key.
+
+        Args:
+            key:
+
+        Returns:
+        """
+        with self._lock:
+            self._values.pop(key, None)
+
+    def clear(self):
+        """ Remove all the cached values.
+
+        Returns:
+        """
+        with self._lock:
+            self._values.clear()
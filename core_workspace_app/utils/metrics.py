@@ -0,0 +1,177 @@
+"""
+    Opt-in instrumentation of the hot paths: call counts, latency histograms and slow calls.
+    The values are kept in memory by each process: with several worker processes, each scrape only sees one of them.
+"""
+import functools
+import logging
+import threading
+from timeit import default_timer
+
+from core_main_app.utils.access_control.decorators import access_control
+from core_workspace_app import settings
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+# number of calls by (label, outcome)
+_calls = {}
+# latency by label: [count of each bucket, sum of the durations, number of calls]
+_durations = {}
+# number of slow calls by label
+_slow_calls = {}
+
+
+def _get_label(func):
+    """ Return the label of a function in the metrics.
+
+    Args:
+        func:
+
+    Returns:
+    """
+    module = func.__module__
+    if module.startswith('core_workspace_app.'):
+        module = module[len('core_workspace_app.'):]
+    return '{0}.{1}'.format(module, func.__name__)
+
+
+def observe(label, duration, error=False):
+    """ Record a call.
+
+    Args:
+        label: label of the function
+        duration: in seconds
+        error: the call raised an exception
+
+    Returns:
+    """
+    outcome = 'error' if error else 'success'
+    threshold = settings.WORKSPACE_METRICS_SLOW_CALL_THRESHOLDS.get(label,
+                                                                    settings.WORKSPACE_METRICS_SLOW_CALL_THRESHOLD)
+    is_slow = duration >= threshold
+
+    with _lock:
+        _calls[(label, outcome)] = _calls.get((label, outcome), 0) + 1
+
+        durations = _durations.get(label)
+        if durations is None:
+            durations = [[0] * len(settings.WORKSPACE_METRICS_BUCKETS), 0.0, 0]
+            _durations[label] = durations
+        for index, bound in enumerate(settings.WORKSPACE_METRICS_BUCKETS):
+            if duration <= bound:
+                durations[0][index] += 1
+                break
+        durations[1] += duration
+        durations[2] += 1
+
+        if is_slow:
+            _slow_calls[label] = _slow_calls.get(label, 0) + 1
+
+    if is_slow:
+        logger.warning("Slow call: %s took %.3fs (%s).", label, duration, outcome)
+
+
+def _instrument(func, original):
+    """ Wrap a function to record its calls.
+
+    Args:
+        func: function to call
+        original: function giving the name of the wrapper and the label
+
+    Returns:
+    """
+    label = _get_label(original)
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        start = default_timer()
+        error = True
+        try:
+            result = func(*args, **kwargs)
+            error = False
+            return result
+        finally:
+            observe(label, default_timer() - start, error)
+    return wrapper
+
+
+def timed(func):
+    """ Decorator recording the calls of a function, if WORKSPACE_METRICS is enabled.
+
+    Args:
+        func:
+
+    Returns:
+    """
+    if not settings.WORKSPACE_METRICS:
+        return func
+    return _instrument(func, func)
+
+
+def timed_access_control(check_func):
+    """ Access control decorator (see core_main_app access_control) recording the calls, access check included,
+    if WORKSPACE_METRICS is enabled.
+
+    Args:
+        check_func: function that checks access
+
+    Returns:
+    """
+    def decorator(func):
+        controlled_func = access_control(check_func)(func)
+        if not settings.WORKSPACE_METRICS:
+            return controlled_func
+        return _instrument(controlled_func, func)
+    return decorator
+
+
+def _format_labels(**labels):
+    """ Format the labels of a sample.
+
+    Args:
+        **labels:
+
+    Returns:
+    """
+    return ','.join('{0}="{1}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                    for name, value in sorted(labels.items()))
+
+
+def render_prometheus():
+    """ Return the metrics in the Prometheus text format.
+
+    Returns:
+        str
+    """
+    with _lock:
+        calls = dict(_calls)
+        durations = {label: [list(values[0]), values[1], values[2]] for label, values in _durations.items()}
+        slow_calls = dict(_slow_calls)
+
+    lines = ['# HELP core_workspace_calls_total Number of calls of the instrumented functions.',
+             '# TYPE core_workspace_calls_total counter']
+    for (label, outcome), count in sorted(calls.items()):
+        lines.append('core_workspace_calls_total{{{0}}} {1}'.format(_format_labels(function=label, outcome=outcome),
+                                                                   count))
+
+    lines += ['# HELP core_workspace_call_duration_seconds Duration of the calls of the instrumented functions.',
+              '# TYPE core_workspace_call_duration_seconds histogram']
+    for label, (bucket_counts, total, count) in sorted(durations.items()):
+        cumulative_count = 0
+        for bound, bucket_count in zip(settings.WORKSPACE_METRICS_BUCKETS, bucket_counts):
+            cumulative_count += bucket_count
+            lines.append('core_workspace_call_duration_seconds_bucket{{{0}}} {1}'
+                         .format(_format_labels(function=label, le=repr(float(bound))), cumulative_count))
+        lines.append('core_workspace_call_duration_seconds_bucket{{{0}}} {1}'
+                     .format(_format_labels(function=label, le='+Inf'), count))
+        lines.append('core_workspace_call_duration_seconds_sum{{{0}}} {1!r}'.format(_format_labels(function=label),
+                                                                                   total))
+        lines.append('core_workspace_call_duration_seconds_count{{{0}}} {1}'.format(_format_labels(function=label),
+                                                                                   count))
+
+    lines += ['# HELP core_workspace_slow_calls_total Number of calls slower than their threshold.',
+              '# TYPE core_workspace_slow_calls_total counter']
+    for label, count in sorted(slow_calls.items()):
+        lines.append('core_workspace_slow_calls_total{{{0}}} {1}'.format(_format_labels(function=label), count))
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,67 @@
+"""
+    Listener of the Mongo commands, counted by query_count.
+    The module does not import Django, so that the listener can be given to the Mongo client by the project settings:
+
+        from core_workspace_app.utils.mongo_monitoring import MONGO_COMMAND_LISTENER
+        connect(MONGODB_NAME, host=MONGODB_URI, event_listeners=[MONGO_COMMAND_LISTENER])
+"""
+import threading
+
+from pymongo import monitoring
+
+_local = threading.local()
+
+
+def get_active_counters():
+    """ Return the counters running in the current thread.
+
+    Returns:
+        list: objects with a mongo_commands list
+    """
+    counters = getattr(_local, 'counters', None)
+    if counters is None:
+        counters = []
+        _local.counters = counters
+    return counters
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """ Record the Mongo commands in the counters of the thread running them.
+    """
+
+    def started(self, event):
+        # the same event is published twice when the listener is given to the client and registered globally
+        if getattr(_local, 'last_event', None) is event:
+            return
+        _local.last_event = event
+
+        counters = get_active_counters()
+        if len(counters) == 0:
+            return
+        command = '{0} {1}'.format(event.command_name, event.command.get(event.command_name))
+        for counter in counters:
+            counter.mongo_commands.append(command)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+MONGO_COMMAND_LISTENER = MongoCommandListener()
+
+
+def is_listened(client):
+    """ Check if the commands of a Mongo client are sent to the listener.
+
+    Args:
+        client: MongoClient
+
+    Returns:
+        bool: None if the client does not tell (e.g. mongomock, which does not publish any event)
+    """
+    event_listeners = getattr(client, '_event_listeners', None)
+    if event_listeners is None or not hasattr(event_listeners, 'event_listeners'):
+        return None
+    return MONGO_COMMAND_LISTENER in event_listeners.event_listeners()
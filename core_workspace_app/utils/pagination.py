@@ -0,0 +1,72 @@
+"""
+    Keyset pagination of mongoengine querysets
+"""
+import collections
+
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+
+from core_main_app.commons import exceptions
+from core_workspace_app import settings
+
+Page = collections.namedtuple('Page', ['items', 'next_cursor', 'total_count', 'total_count_is_exact'])
+""" Page of results.
+    items: documents of the page
+    next_cursor: cursor of the next page, None on the last page
+    total_count: number of documents of the listing (a lower bound if total_count_is_exact is False)
+    total_count_is_exact: False when the count stopped at WORKSPACE_PAGINATION_COUNT_LIMIT
+"""
+
+
+def get_keyset_page(queryset, cursor=None, limit=25, fields=None):
+    """ Return a page of the queryset, ordered by id, starting after the cursor.
+
+    Args:
+        queryset: mongoengine queryset
+        cursor: id of the last document of the previous page, None for the first page
+        limit: maximum number of documents in the page, at least 1
+        fields: names of the fields to load, None to load the whole documents
+
+    Returns:
+        Page
+    """
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise exceptions.ModelError('Invalid limit: ' + str(limit))
+    if limit < 1:
+        raise exceptions.ModelError('The limit must be at least 1.')
+
+    total_count, total_count_is_exact = _get_count_hint(queryset)
+
+    page_queryset = queryset.clone()
+    if cursor is not None:
+        try:
+            page_queryset = page_queryset.filter(pk__gt=ObjectId(str(cursor)))
+        except (InvalidId, TypeError):
+            raise exceptions.ModelError('Invalid cursor: ' + str(cursor))
+    if fields is not None:
+        page_queryset = page_queryset.only(*fields)
+
+    # One more document tells if there is a next page
+    items = list(page_queryset.order_by('pk').limit(limit + 1))
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = str(items[-1].pk)
+
+    return Page(items=items, next_cursor=next_cursor, total_count=total_count,
+                total_count_is_exact=total_count_is_exact)
+
+
+def _get_count_hint(queryset):
+    """ Return a count of the queryset bounded by WORKSPACE_PAGINATION_COUNT_LIMIT, and if it is exact.
+
+    Args:
+        queryset:
+
+    Returns:
+    """
+    count_limit = settings.WORKSPACE_PAGINATION_COUNT_LIMIT
+    total_count = queryset.clone().limit(count_limit).count(with_limit_and_skip=True)
+    return total_count, total_count < count_limit
@@ -0,0 +1,142 @@
+"""
+    Count the SQL queries and Mongo commands run by a block of code (a request, an API call, a test)
+"""
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from mongoengine import connection as mongoengine_connection
+from pymongo import monitoring
+
+from core_workspace_app.utils import mongo_monitoring
+
+logger = logging.getLogger(__name__)
+
+_listener_lock = threading.Lock()
+_listener_registered = False
+
+
+class QueryCounter(object):
+    """ SQL queries and Mongo commands run by the current thread between start and stop.
+    """
+
+    def __init__(self):
+        self.sql_queries = []
+        self.mongo_commands = []
+        self._sql_contexts = []
+
+    @property
+    def sql(self):
+        """ Number of SQL queries.
+
+        Returns:
+        """
+        return len(self.sql_queries)
+
+    @property
+    def mongo(self):
+        """ Number of Mongo commands.
+
+        Returns:
+        """
+        return len(self.mongo_commands)
+
+    def start(self):
+        """ Start counting.
+
+        Returns:
+            QueryCounter
+        """
+        self._sql_contexts = [CaptureQueriesContext(connection) for connection in connections.all()]
+        for context in self._sql_contexts:
+            context.__enter__()
+        mongo_monitoring.get_active_counters().append(self)
+        return self
+
+    def stop(self):
+        """ Stop counting.
+
+        Returns:
+        """
+        mongo_monitoring.get_active_counters().remove(self)
+        for context in self._sql_contexts:
+            context.__exit__(None, None, None)
+            self.sql_queries.extend(query['sql'] for query in context.captured_queries)
+        self._sql_contexts = []
+
+
+def register_mongo_listener():
+    """ Register the listener counting the Mongo commands for all clients.
+    Only the clients created afterwards are listened to: give the listener to the client created by the project
+    settings (see mongo_monitoring).
+
+    Returns:
+    """
+    global _listener_registered
+    with _listener_lock:
+        if not _listener_registered:
+            monitoring.register(mongo_monitoring.MONGO_COMMAND_LISTENER)
+            _listener_registered = True
+
+
+def check_mongo_listener():
+    """ Log a warning if the commands of the default Mongo client are not counted.
+
+    Returns:
+        bool: None if it can't be checked
+    """
+    try:
+        client = mongoengine_connection.get_connection()
+    except Exception:
+        # no Mongo connection configured
+        return None
+
+    is_listened = mongo_monitoring.is_listened(client)
+    if is_listened is False:
+        logger.warning("The Mongo commands are not counted: the Mongo client was created before the listener was "
+                       "registered. Pass event_listeners=[MONGO_COMMAND_LISTENER] "
+                       "(core_workspace_app.utils.mongo_monitoring) to connect() in the settings.")
+    return is_listened
+
+
+@contextmanager
+def count_queries():
+    """ Count the SQL queries and Mongo commands of a block.
+
+    Returns:
+        QueryCounter
+    """
+    counter = QueryCounter().start()
+    try:
+        yield counter
+    finally:
+        counter.stop()
+
+
+@contextmanager
+def assert_max_queries(sql=None, mongo=None):
+    """ Fail if a block runs more SQL queries or Mongo commands than its budget (test helper).
+
+        with assert_max_queries(sql=2, mongo=1):
+            workspace_api.get_all_workspaces_with_read_access_by_user(user)
+
+    Args:
+        sql: maximum number of SQL queries, None for no limit
+        mongo: maximum number of Mongo commands, None for no limit
+
+    Returns:
+        QueryCounter
+    """
+    with count_queries() as counter:
+        yield counter
+
+    errors = []
+    if sql is not None and counter.sql > sql:
+        errors.append('{0} SQL queries, budget {1}:\n{2}'.format(counter.sql, sql, '\n'.join(counter.sql_queries)))
+    if mongo is not None and counter.mongo > mongo:
+        errors.append('{0} Mongo commands, budget {1}:\n{2}'.format(counter.mongo, mongo,
+                                                                     '\n'.join(counter.mongo_commands)))
+    if len(errors) > 0:
+        raise AssertionError('\n'.join(errors))
@@ -0,0 +1,91 @@
+"""
+    Request-scoped cache for access decisions
+"""
+import copy
+import functools
+import threading
+
+_local = threading.local()
+
+
+def activate():
+    """ Start caching for the current thread (beginning of a request).
+
+    Returns:
+    """
+    _local.cache = {}
+
+
+def deactivate():
+    """ Stop caching for the current thread (end of a request).
+
+    Returns:
+    """
+    _local.cache = None
+
+
+def is_active():
+    """ Check if the cache is active for the current thread.
+
+    Returns:
+    """
+    return getattr(_local, 'cache', None) is not None
+
+
+def get_or_set(key, compute):
+    """ Return the cached value for the key, or compute it and cache it if the cache is active.
+
+    Args:
+        key: hashable key
+        compute: function without arguments returning the value
+
+    Returns:
+        a copy of the cached value if it is a list, a set or a dict, so that the caller can't change the cache
+    """
+    cache = getattr(_local, 'cache', None)
+    if cache is None:
+        return compute()
+
+    if key not in cache:
+        cache[key] = compute()
+    return _copy(cache[key])
+
+
+def _copy(value):
+    """ Return a shallow copy of a mutable container, the value itself otherwise.
+
+    Args:
+        value:
+
+    Returns:
+    """
+    if isinstance(value, (list, set, dict)):
+        return copy.copy(value)
+    return value
+
+
+def clear():
+    """ Clear the cached values of the current thread (after an access change).
+
+    Returns:
+    """
+    cache = getattr(_local, 'cache', None)
+    if cache is not None:
+        cache.clear()
+
+
+def memoize(key_func):
+    """ Decorator caching the result of a function for the current request.
+
+    Args:
+        key_func: function building a hashable key from the arguments of the decorated function
+
+    Returns:
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__module__, func.__name__, key_func(*args, **kwargs))
+            return get_or_set(key, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
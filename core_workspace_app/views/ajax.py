@@ -7,17 +7,19 @@ from django.template import loader
 
 import core_workspace_app.constants as workspace_constants
 from core_main_app.commons.exceptions import DoesNotExist, NotUniqueError
-from core_main_app.components.data import api as data_api
 from core_main_app.components.group import api as group_api
 from core_main_app.components.user import api as user_api
 from core_main_app.utils.access_control.exceptions import AccessControlError
 from core_workspace_app import constants
-from core_workspace_app.utils import group as group_utils
 from core_workspace_app.components.data import api as data_workspace_api
+from core_workspace_app.components.job import api as job_api
+from core_workspace_app.components.job import tasks as job_tasks
 from core_workspace_app.components.workspace import api as workspace_api
 from core_workspace_app.forms import ChangeWorkspaceForm, UserRightForm, GroupRightForm
+from core_workspace_app.utils import metrics
 
 
+@metrics.timed
 def set_public_workspace(request):
     """ Set a workspace public.
 
@@ -27,19 +29,22 @@ def set_public_workspace(request):
     Returns:
     """
     workspace_id_list = request.POST.getlist('workspace_id[]', [])
+    if _is_background(request):
+        return _submit_job(request, 'set_public_workspaces', {'workspace_ids': workspace_id_list})
+
     try:
-        list_workspace = workspace_api.get_by_id_list(workspace_id_list)
+        job_tasks.set_public_workspaces(request.user, workspace_id_list)
+    except AccessControlError, ace:
+        return HttpResponseBadRequest(ace.message)
     except DoesNotExist, dne:
         return HttpResponseBadRequest(dne.message)
-    try:
-        for workspace in list_workspace:
-            workspace_api.set_workspace_public(workspace)
     except:
         return HttpResponseBadRequest("Something wrong happened.")
 
     return HttpResponse(json.dumps({}), content_type='application/javascript')
 
 
+@metrics.timed
 def assign_workspace(request):
     """ Assign the record to a workspace.
 
@@ -50,18 +55,66 @@ def assign_workspace(request):
     """
     document_ids = request.POST.getlist('document_id[]', [])
     workspace_id = request.POST.get('workspace_id', None)
+    if _is_background(request):
+        return _submit_job(request, 'assign_data_to_workspace', {'data_ids': document_ids,
+                                                                 'workspace_id': str(workspace_id)})
 
-    for data_id in document_ids:
-        try:
-            data_workspace_api.assign(data_api.get_by_id(data_id, request.user),
-                                      workspace_api.get_by_id(str(workspace_id)),
-                                      request.user)
-        except Exception, exc:
-            return HttpResponseBadRequest(exc.message)
+    try:
+        errors = job_tasks.assign_data_to_workspace(request.user, document_ids, workspace_id)['errors']
+    except Exception, exc:
+        return HttpResponseBadRequest(exc.message)
+
+    if len(errors) > 0:
+        return HttpResponseBadRequest("{0} record(s) could not be assigned: {1}"
+                                      .format(len(errors), " ".join(sorted(set(errors.values())))))
 
     return HttpResponse(json.dumps({}), content_type='application/javascript')
 
 
+@metrics.timed
+def delete_workspace(request):
+    """ Delete a workspace. The deletion ends in the background.
+
+    Args:
+        request:
+
+    Returns:
+    """
+    workspace_id = request.POST.get('workspace_id', None)
+    try:
+        workspace = workspace_api.get_by_id(str(workspace_id))
+        workspace_api.delete(workspace, request.user)
+    except AccessControlError, ace:
+        return HttpResponseBadRequest(ace.message)
+    except DoesNotExist, dne:
+        return HttpResponseBadRequest(dne.message)
+    except:
+        return HttpResponseBadRequest("Something wrong happened.")
+
+    return HttpResponse(json.dumps({'workspace_id': str(workspace.id)}), content_type='application/javascript')
+
+
+@metrics.timed
+def get_workspace_deletion_status(request):
+    """ Get the progress of the deletion of a workspace.
+
+    Args:
+        request:
+
+    Returns:
+    """
+    workspace_id = request.GET.get('workspace_id', None)
+    try:
+        deletion_status = workspace_api.get_deletion_status(str(workspace_id), request.user)
+    except AccessControlError, ace:
+        return HttpResponseBadRequest(ace.message)
+    except:
+        return HttpResponseBadRequest("Something wrong happened.")
+
+    return HttpResponse(json.dumps(deletion_status), content_type='application/javascript')
+
+
+@metrics.timed
 def load_form_change_workspace(request):
     """ Load the form to list the workspaces.
 
@@ -71,17 +124,13 @@ def load_form_change_workspace(request):
     Returns:
     """
     document_ids = request.POST.getlist('document_id[]', [])
-    list_workspace = set()
     try:
-        list_data = data_api.get_by_id_list(document_ids, request.user)
-        for data in list_data:
-            if hasattr(data, 'workspace') and data.workspace is not None:
-                list_workspace.add(data.workspace)
+        list_workspace_id = data_workspace_api.get_workspace_ids_by_data_id_list(document_ids, request.user)
     except:
-       pass
+        list_workspace_id = []
 
     try:
-        form = ChangeWorkspaceForm(request.user, list(list_workspace))
+        form = ChangeWorkspaceForm(request.user, list_workspace_id)
     except DoesNotExist, dne:
         return HttpResponseBadRequest(dne.message)
     except:
@@ -95,6 +144,7 @@ def load_form_change_workspace(request):
                         'application/javascript')
 
 
+@metrics.timed
 def create_workspace(request):
     """ Create a workspace.
 
@@ -115,6 +165,7 @@ def create_workspace(request):
     return HttpResponse(json.dumps({}), content_type='application/javascript')
 
 
+@metrics.timed
 def load_add_user_form(request):
     """ Load the form to list the users with no access to the workspace.
 
@@ -130,16 +181,13 @@ def load_add_user_form(request):
         return HttpResponseBadRequest(exc.message)
 
     try:
-        # We retrieve all users with no access
-        users_with_no_access = list(workspace_api.get_list_user_with_no_access_workspace(workspace, request.user))
-
-        # We remove the owner of the workspace
-        users_with_no_access.remove(user_api.get_user_by_id(workspace.owner))
-
+        # The users are searched page by page by the picker (search_users_with_no_access)
+        users_with_no_access = workspace_api.search_user_with_no_access_workspace(workspace, request.user,
+                                                                                  length=1)[0]
         if len(users_with_no_access) == 0:
             return HttpResponseBadRequest("There is no users that can be added.")
 
-        form = UserRightForm(users_with_no_access)
+        form = UserRightForm([])
     except AccessControlError, ace:
         return HttpResponseBadRequest(ace.message)
     except DoesNotExist, dne:
@@ -155,6 +203,130 @@ def load_add_user_form(request):
                         'application/javascript')
 
 
+@metrics.timed
+def search_users_with_no_access(request):
+    """ Search the users with no access to the workspace (paginated, for a typeahead picker).
+
+    Args:
+        request:
+
+    Returns:
+    """
+    return _search_with_no_access(request, workspace_api.search_user_with_no_access_workspace)
+
+
+@metrics.timed
+def search_groups_with_no_access(request):
+    """ Search the groups with no access to the workspace (paginated, for a typeahead picker).
+
+    Args:
+        request:
+
+    Returns:
+    """
+    return _search_with_no_access(request, workspace_api.search_group_with_no_access_workspace)
+
+
+def _search_with_no_access(request, search_function):
+    """ Run a search of users or groups with no access to the workspace.
+
+    Args:
+        request: workspace_id, search (optional) and page (optional, starts at 1)
+        search_function:
+
+    Returns:
+    """
+    workspace_id = request.POST.get('workspace_id', None)
+    search = request.POST.get('search', '')
+    try:
+        page = max(int(request.POST.get('page', 1)), 1)
+    except ValueError:
+        return HttpResponseBadRequest("The page number is not valid.")
+
+    try:
+        workspace = workspace_api.get_by_id(str(workspace_id))
+        results, more = search_function(workspace, request.user, search,
+                                        (page - 1) * constants.SEARCH_PAGE_SIZE, constants.SEARCH_PAGE_SIZE)
+    except AccessControlError, ace:
+        return HttpResponseBadRequest(ace.message)
+    except DoesNotExist, dne:
+        return HttpResponseBadRequest(dne.message)
+    except:
+        return HttpResponseBadRequest("Something wrong happened.")
+
+    return HttpResponse(json.dumps({'results': [{'id': object_id, 'text': name} for object_id, name in results],
+                                    'more': more}),
+                        content_type='application/javascript')
+
+
+@metrics.timed
+def load_rights_table(request):
+    """ Load a page of the users or groups with access to the workspace (DataTables server-side processing).
+
+    Args:
+        request: workspace_id, group_or_user and the DataTables parameters (draw, start, length, search, order,
+        search of the read and write columns)
+
+    Returns:
+    """
+    workspace_id = request.POST.get('workspace_id', None)
+    group_or_user = request.POST.get('group_or_user', None)
+    try:
+        draw = int(request.POST.get('draw', 0))
+        start = max(int(request.POST.get('start', 0)), 0)
+        length = int(request.POST.get('length', constants.RIGHTS_TABLE_MAX_PAGE_SIZE))
+    except ValueError:
+        return HttpResponseBadRequest("The table parameters are not valid.")
+    if length < 0 or length > constants.RIGHTS_TABLE_MAX_PAGE_SIZE:
+        length = constants.RIGHTS_TABLE_MAX_PAGE_SIZE
+
+    try:
+        workspace = workspace_api.get_by_id(str(workspace_id))
+        if group_or_user == constants.USER:
+            acl_queryset = workspace_api.get_queryset_user_acl(workspace, request.user)
+        elif group_or_user == constants.GROUP:
+            acl_queryset = workspace_api.get_queryset_group_acl(workspace, request.user)
+        else:
+            return HttpResponseBadRequest("The type of the rights is not valid.")
+
+        records_total, records_filtered, rows = workspace_api.get_acl_page(
+            acl_queryset,
+            start=start,
+            length=length,
+            search=request.POST.get('search[value]', ''),
+            descending=request.POST.get('order[0][dir]', 'asc') == 'desc',
+            can_read=_get_boolean_filter(request.POST.get('columns[1][search][value]', '')),
+            can_write=_get_boolean_filter(request.POST.get('columns[2][search][value]', '')))
+    except AccessControlError, ace:
+        return HttpResponseBadRequest(ace.message)
+    except DoesNotExist, dne:
+        return HttpResponseBadRequest(dne.message)
+    except:
+        return HttpResponseBadRequest("Something wrong happened.")
+
+    return HttpResponse(json.dumps({'draw': draw,
+                                    'recordsTotal': records_total,
+                                    'recordsFiltered': records_filtered,
+                                    'data': rows}),
+                        content_type='application/javascript')
+
+
+def _get_boolean_filter(value):
+    """ Convert the search value of a boolean column.
+
+    Args:
+        value: 'true', 'false' or anything else for no filter
+
+    Returns:
+    """
+    if value == 'true':
+        return True
+    if value == 'false':
+        return False
+    return None
+
+
+@metrics.timed
 def add_user_right_to_workspace(request):
     """ Add rights to user for the workspace.
 
@@ -173,13 +345,15 @@ def add_user_right_to_workspace(request):
     if not is_read_checked and not is_write_checked:
         return HttpResponseBadRequest("You need to select at least one permission (read and/or write).")
 
+    if _is_background(request):
+        return _submit_job(request, 'add_users_rights_to_workspace', {'workspace_id': str(workspace_id),
+                                                                      'user_ids': users_ids,
+                                                                      'read': is_read_checked,
+                                                                      'write': is_write_checked})
+
     try:
-        workspace = workspace_api.get_by_id(str(workspace_id))
-        for user in user_api.get_all_users_by_list_id(users_ids):
-            if is_read_checked:
-                workspace_api.add_user_read_access_to_workspace(workspace, user, request.user)
-            if is_write_checked:
-                workspace_api.add_user_write_access_to_workspace(workspace, user, request.user)
+        job_tasks.add_users_rights_to_workspace(request.user, workspace_id, users_ids,
+                                                is_read_checked, is_write_checked)
     except AccessControlError, ace:
         return HttpResponseBadRequest(ace.message)
     except DoesNotExist, dne:
@@ -190,6 +364,7 @@ def add_user_right_to_workspace(request):
     return HttpResponse(json.dumps({}), content_type='application/javascript')
 
 
+@metrics.timed
 def switch_right(request):
     """ Switch user's right for the workspace.
 
@@ -275,6 +450,7 @@ def _switch_group_right(group_id, action, value, workspace, request_user):
             workspace_api.remove_group_write_access_to_workspace(workspace, group, request_user)
 
 
+@metrics.timed
 def remove_user_or_group_rights(request):
     """ Remove user's right for the workspace.
 
@@ -316,8 +492,7 @@ def _remove_user_rights(object_id, workspace, request_user):
     Returns:
     """
     user = user_api.get_user_by_id(object_id)
-    workspace_api.remove_user_read_access_to_workspace(workspace, user, request_user)
-    workspace_api.remove_user_write_access_to_workspace(workspace, user, request_user)
+    workspace_api.remove_users_access_to_workspace(workspace, [user], True, True, request_user)
 
 
 def _remove_group_rights(object_id, workspace, request_user):
@@ -331,10 +506,10 @@ def _remove_group_rights(object_id, workspace, request_user):
     Returns:
     """
     group = group_api.get_group_by_id(object_id)
-    workspace_api.remove_group_read_access_to_workspace(workspace, group, request_user)
-    workspace_api.remove_group_write_access_to_workspace(workspace, group, request_user)
+    workspace_api.remove_groups_access_to_workspace(workspace, [group], True, True, request_user)
 
 
+@metrics.timed
 def load_add_group_form(request):
     """ Load the form to list the groups with no access to the workspace.
 
@@ -350,15 +525,13 @@ def load_add_group_form(request):
         return HttpResponseBadRequest(exc.message)
 
     try:
-        # We retrieve all groups with no access
-        groups_with_no_access = list(workspace_api.get_list_group_with_no_access_workspace(workspace, request.user))
-
-        group_utils.remove_list_object_from_list(groups_with_no_access,
-                                                 [group_api.get_anonymous_group(), group_api.get_default_group()])
+        # The groups are searched page by page by the picker (search_groups_with_no_access)
+        groups_with_no_access = workspace_api.search_group_with_no_access_workspace(workspace, request.user,
+                                                                                    length=1)[0]
         if len(groups_with_no_access) == 0:
             return HttpResponseBadRequest("There is no groups that can be added.")
 
-        form = GroupRightForm(groups_with_no_access)
+        form = GroupRightForm([])
     except AccessControlError, ace:
         return HttpResponseBadRequest(ace.message)
     except DoesNotExist, dne:
@@ -374,6 +547,7 @@ def load_add_group_form(request):
                         'application/javascript')
 
 
+@metrics.timed
 def add_group_right_to_workspace(request):
     """ Add rights to group for the workspace.
 
@@ -392,13 +566,15 @@ def add_group_right_to_workspace(request):
     if not is_read_checked and not is_write_checked:
         return HttpResponseBadRequest("You need to select at least one permission (read and/or write).")
 
+    if _is_background(request):
+        return _submit_job(request, 'add_groups_rights_to_workspace', {'workspace_id': str(workspace_id),
+                                                                       'group_ids': groups_ids,
+                                                                       'read': is_read_checked,
+                                                                       'write': is_write_checked})
+
     try:
-        workspace = workspace_api.get_by_id(str(workspace_id))
-        for group in group_api.get_all_groups_by_list_id(groups_ids):
-            if is_read_checked:
-                workspace_api.add_group_read_access_to_workspace(workspace, group, request.user)
-            if is_write_checked:
-                workspace_api.add_group_write_access_to_workspace(workspace, group, request.user)
+        job_tasks.add_groups_rights_to_workspace(request.user, workspace_id, groups_ids,
+                                                 is_read_checked, is_write_checked)
     except AccessControlError, ace:
         return HttpResponseBadRequest(ace.message)
     except DoesNotExist, dne:
@@ -407,3 +583,77 @@ def add_group_right_to_workspace(request):
         return HttpResponseBadRequest('Something wrong happened.')
 
     return HttpResponse(json.dumps({}), content_type='application/javascript')
+
+
+@metrics.timed
+def get_job_status(request):
+    """ Get the status of a job.
+
+    Args:
+        request:
+
+    Returns:
+    """
+    try:
+        job = job_api.get_by_id(request.GET.get('job_id', None))
+        job_status = job_api.get_job_status(job, request.user)
+    except AccessControlError, ace:
+        return HttpResponseBadRequest(ace.message)
+    except DoesNotExist, dne:
+        return HttpResponseBadRequest(dne.message)
+    except:
+        return HttpResponseBadRequest("Something wrong happened.")
+
+    return HttpResponse(json.dumps(job_status), content_type='application/javascript')
+
+
+@metrics.timed
+def retry_job(request):
+    """ Run a failed job again.
+
+    Args:
+        request:
+
+    Returns:
+    """
+    try:
+        job = job_api.retry(job_api.get_by_id(request.POST.get('job_id', None)), request.user)
+    except AccessControlError, ace:
+        return HttpResponseBadRequest(ace.message)
+    except DoesNotExist, dne:
+        return HttpResponseBadRequest(dne.message)
+    except:
+        return HttpResponseBadRequest("Something wrong happened.")
+
+    return HttpResponse(json.dumps({'job_id': str(job.id), 'status': job.status}),
+                        content_type='application/javascript')
+
+
+def _is_background(request):
+    """ Check if the bulk operation has to run in a background job.
+
+    Args:
+        request:
+
+    Returns:
+    """
+    return request.POST.get('background', None) == 'true'
+
+
+def _submit_job(request, task, params):
+    """ Submit a bulk operation as a background job. The client polls the job status.
+
+    Args:
+        request: can give an idempotency_key, to submit the operation only once
+        task:
+        params:
+
+    Returns:
+    """
+    try:
+        job = job_api.submit(task, params, request.user, request.POST.get('idempotency_key', None))
+    except:
+        return HttpResponseBadRequest("Something wrong happened.")
+
+    return HttpResponse(json.dumps({'job_id': str(job.id), 'status': job.status}),
+                        content_type='application/javascript')
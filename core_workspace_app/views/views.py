@@ -3,14 +3,14 @@
 """
 import copy
 
-from django.http import HttpResponseBadRequest, HttpResponseForbidden
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, HttpResponseNotFound
 
 from core_main_app.commons.exceptions import DoesNotExist
-from core_main_app.components.group import api as group_api
 from core_main_app.utils.rendering import render
 from core_workspace_app import constants as workspace_constants
-from core_workspace_app.utils import group as group_utils
+from core_workspace_app import settings
 from core_workspace_app.components.workspace import api as workspace_api
+from core_workspace_app.utils import metrics as workspace_metrics
 
 
 def edit_rights(request, workspace_id):
@@ -31,44 +31,8 @@ def edit_rights(request, workspace_id):
     if workspace.owner != str(request.user.id):
         return HttpResponseForbidden("Only the workspace owner can edit the rights.")
 
-    try:
-        # Users
-        users_read_workspace = workspace_api.get_list_user_can_read_workspace(workspace, request.user)
-        users_write_workspace = workspace_api.get_list_user_can_write_workspace(workspace, request.user)
-
-        users_access_workspace = list(set(users_read_workspace + users_write_workspace))
-        detailed_users = []
-        for user in users_access_workspace:
-            detailed_users.append({'object_id': user.id,
-                                   'object_name': user.username,
-                                   'can_read': user in users_read_workspace,
-                                   'can_write': user in users_write_workspace,
-                                   })
-    except:
-        detailed_users = []
-
-    try:
-        # Groups
-        groups_read_workspace = workspace_api.get_list_group_can_read_workspace(workspace, request.user)
-        groups_write_workspace = workspace_api.get_list_group_can_write_workspace(workspace, request.user)
-
-        groups_access_workspace = list(set(groups_read_workspace + groups_write_workspace))
-        group_utils.remove_list_object_from_list(groups_access_workspace,
-                                                 [group_api.get_anonymous_group(), group_api.get_default_group()])
-        detailed_groups = []
-        for group in groups_access_workspace:
-            detailed_groups.append({'object_id': group.id,
-                                    'object_name': group.name,
-                                    'can_read': group in groups_read_workspace,
-                                    'can_write': group in groups_write_workspace,
-                                    })
-    except:
-        detailed_groups = []
-
     context = {
         'workspace': workspace,
-        'user_data': detailed_users,
-        'group_data': detailed_groups,
         'template': workspace_constants.EDIT_RIGHTS_TEMPLATE_TABLE,
         'action_read': workspace_constants.ACTION_READ,
         'action_write': workspace_constants.ACTION_WRITE,
@@ -77,17 +41,12 @@ def edit_rights(request, workspace_id):
     }
 
     assets = {
-        "css": ['core_main_app/libs/datatables/1.10.13/css/jquery.dataTables.css',
-                "core_main_app/libs/fSelect/css/fSelect.css"],
+        "css": ['core_main_app/libs/datatables/1.10.13/css/jquery.dataTables.css'],
 
         "js": [{
                     "path": 'core_main_app/libs/datatables/1.10.13/js/jquery.dataTables.js',
                     "is_raw": True
                 },
-                {
-                    "path": "core_main_app/libs/fSelect/js/fSelect.js",
-                    "is_raw": False
-                },
                 {
                     "path": 'core_main_app/common/js/backtoprevious.js',
                     "is_raw": True
@@ -111,3 +70,17 @@ def edit_rights(request, workspace_id):
                   context=context,
                   assets=assets,
                   modals=modals)
+
+
+def metrics(request):
+    """ Serve the metrics of the process in the Prometheus text format (WORKSPACE_METRICS).
+
+    Args:   request
+    Returns:
+    """
+    if not settings.WORKSPACE_METRICS:
+        return HttpResponseNotFound("The metrics are not enabled.")
+    if not request.user.is_staff and request.META.get('REMOTE_ADDR') not in settings.WORKSPACE_METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden("The metrics are only available to the staff users and the allowed addresses.")
+
+    return HttpResponse(workspace_metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
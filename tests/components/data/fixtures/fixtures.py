@@ -0,0 +1,57 @@
+""" Fixtures files for Data
+"""
+from core_main_app.components.data.models import Data
+from core_main_app.components.template.models import Template
+from core_workspace_app.components.workspace import api as workspace_api
+from tests.components.user.fixtures.fixtures import UserFixtures
+from tests.components.workspace.fixtures.fixtures import WorkspaceAccessFixtures
+
+
+class DataWorkspaceFixtures(WorkspaceAccessFixtures):
+    """ Data of the owner in and out of his workspaces, and a writer of the first workspace with his own workspace
+    """
+    writer = None
+    writer_workspace = None
+    template = None
+    data_in_writable_workspace = None
+    data_in_readonly_workspace = None
+    data_without_workspace = None
+    data_of_writer = None
+
+    def insert_data(self):
+        super(DataWorkspaceFixtures, self).insert_data()
+        self.writer = UserFixtures.create_user(username="writer")
+        workspace_api.add_users_access_to_workspace(self.workspaces[0], [self.writer], True, True, self.owner)
+        self.writer_workspace = workspace_api.create_and_save(self.writer.id, "writer workspace")
+        self.generate_template()
+
+        self.data_in_writable_workspace = self.create_data(self.owner, self.workspaces[0])
+        self.data_in_readonly_workspace = self.create_data(self.owner, self.workspaces[1])
+        self.data_without_workspace = self.create_data(self.owner, None)
+        self.data_of_writer = self.create_data(self.writer, None)
+
+    def generate_template(self):
+        """ Generate an unique Template.
+
+        Returns:
+
+        """
+        template = Template()
+        xsd = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">' \
+              '<xs:element name="tag"></xs:element></xs:schema>'
+        template.content = xsd
+        template.hash = ""
+        template.filename = "filename"
+        self.template = template.save()
+
+    def create_data(self, user, workspace):
+        """ Create a data of the user, in the workspace.
+
+        Returns:
+
+        """
+        # NOTE: no xml_content to avoid using unsupported GridFS mock
+        data = Data(template=self.template, user_id=str(user.id), dict_content=None, title='title').save()
+        if workspace is not None:
+            Data.objects(pk=data.pk).update(set__workspace=workspace)
+        return data
@@ -0,0 +1,133 @@
+""" Integration Test for the Data workspace API
+"""
+from mock.mock import patch
+
+from core_main_app.commons import exceptions
+from core_main_app.components.data.models import Data
+from core_main_app.utils.access_control.exceptions import AccessControlError
+from core_workspace_app.components.data import api as data_workspace_api
+from core_workspace_app.components.workspace import api as workspace_api
+from core_workspace_app.components.workspace.models import Workspace
+from core_workspace_app.utils.query_count import assert_max_queries
+from tests.components.data.fixtures.fixtures import DataWorkspaceFixtures
+from tests.utils.integration_base_transaction_test_case import WorkspaceIntegrationTransactionTestCase
+
+
+def _get_workspace_id(data):
+    workspace_id = Data._get_collection().find_one({'_id': data.pk}, {'workspace': 1}).get('workspace')
+    return None if workspace_id is None else str(workspace_id)
+
+
+class TestAssignMany(WorkspaceIntegrationTransactionTestCase):
+
+    fixture = DataWorkspaceFixtures()
+
+    def test_user_assigns_own_data(self):
+        # Act
+        errors = data_workspace_api.assign_many([self.fixture.data_of_writer.id], self.fixture.writer_workspace,
+                                                self.fixture.writer)
+        # Assert
+        self.assertEqual(errors, {})
+        self.assertEqual(_get_workspace_id(self.fixture.data_of_writer), str(self.fixture.writer_workspace.id))
+
+    def test_user_assigns_data_of_other_user_from_workspace_he_can_write(self):
+        # Act
+        errors = data_workspace_api.assign_many([self.fixture.data_in_writable_workspace.id],
+                                                self.fixture.writer_workspace,
+                                                self.fixture.writer)
+        # Assert
+        self.assertEqual(errors, {})
+        self.assertEqual(_get_workspace_id(self.fixture.data_in_writable_workspace),
+                         str(self.fixture.writer_workspace.id))
+
+    def test_user_can_not_assign_data_of_other_user_from_workspace_he_can_only_read(self):
+        # Context
+        workspace_api.add_users_access_to_workspace(self.fixture.workspaces[1], [self.fixture.writer], True, False,
+                                                    self.fixture.owner)
+        data_id = str(self.fixture.data_in_readonly_workspace.id)
+        # Act
+        errors = data_workspace_api.assign_many([data_id], self.fixture.writer_workspace, self.fixture.writer)
+        # Assert
+        self.assertEqual(list(errors.keys()), [data_id])
+        self.assertEqual(_get_workspace_id(self.fixture.data_in_readonly_workspace),
+                         str(self.fixture.workspaces[1].id))
+
+    def test_user_can_not_assign_data_of_other_user_without_workspace(self):
+        # Context
+        data_id = str(self.fixture.data_without_workspace.id)
+        # Act
+        errors = data_workspace_api.assign_many([data_id], self.fixture.writer_workspace, self.fixture.writer)
+        # Assert
+        self.assertEqual(list(errors.keys()), [data_id])
+        self.assertIsNone(_get_workspace_id(self.fixture.data_without_workspace))
+
+    def test_assignable_data_are_assigned_and_others_reported(self):
+        # Context
+        invalid_id = 'invalid'
+        missing_id = '5b0f0f0f0f0f0f0f0f0f0f0f'
+        # Act
+        errors = data_workspace_api.assign_many([self.fixture.data_of_writer.id,
+                                                 self.fixture.data_without_workspace.id,
+                                                 invalid_id,
+                                                 missing_id],
+                                                self.fixture.writer_workspace,
+                                                self.fixture.writer)
+        # Assert
+        self.assertEqual(set(errors.keys()), {str(self.fixture.data_without_workspace.id), invalid_id, missing_id})
+        self.assertEqual(_get_workspace_id(self.fixture.data_of_writer), str(self.fixture.writer_workspace.id))
+
+    def test_user_can_not_assign_to_workspace_he_can_not_write(self):
+        # Act # Assert
+        with self.assertRaises(AccessControlError):
+            data_workspace_api.assign_many([self.fixture.data_of_writer.id], self.fixture.workspaces[1],
+                                           self.fixture.writer)
+
+    @patch('core_workspace_app.components.data.api.Workspace.get_by_id')
+    def test_data_are_unassigned_if_workspace_deletion_started_during_the_update(self, mock_get_by_id):
+        # Context
+        mock_get_by_id.side_effect = exceptions.DoesNotExist('pending deletion')
+        data_id = str(self.fixture.data_of_writer.id)
+        # Act
+        errors = data_workspace_api.assign_many([data_id], self.fixture.writer_workspace, self.fixture.writer)
+        # Assert
+        self.assertEqual(list(errors.keys()), [data_id])
+        self.assertIsNone(_get_workspace_id(self.fixture.data_of_writer))
+
+    def test_data_are_not_assigned_to_workspace_pending_deletion(self):
+        # Context
+        Workspace.set_pending_delete(self.fixture.writer_workspace.id)
+        workspace = Workspace.get_by_id(self.fixture.writer_workspace.id, include_pending_delete=True)
+        # Act # Assert
+        with self.assertRaises(AccessControlError):
+            data_workspace_api.assign_many([self.fixture.data_of_writer.id], workspace, self.fixture.writer)
+        self.assertIsNone(_get_workspace_id(self.fixture.data_of_writer))
+
+
+class TestAssignManyQueries(WorkspaceIntegrationTransactionTestCase):
+    """ Query budgets of assign_many, without the request cache nor the shared cache. The budgets do not grow with the
+    number of data: one find of the owners and workspaces, one update, one find of the workspace, plus the writable
+    workspaces of the user if he assigns data of other users. The Mongo budgets are only checked against a test
+    mongod (WORKSPACE_TEST_MONGO_HOST): mongomock does not publish the Mongo commands.
+    """
+
+    fixture = DataWorkspaceFixtures()
+    nb_data = 10
+
+    def test_assign_own_data(self):
+        # Context
+        data_ids = [self.fixture.create_data(self.fixture.writer, None).id for _ in range(self.nb_data)]
+        # Act
+        with assert_max_queries(sql=0, mongo=3):
+            errors = data_workspace_api.assign_many(data_ids, self.fixture.writer_workspace, self.fixture.writer)
+        # Assert
+        self.assertEqual(errors, {})
+
+    def test_assign_data_from_writable_workspace(self):
+        # Context
+        data_ids = [self.fixture.create_data(self.fixture.owner, self.fixture.workspaces[0]).id
+                    for _ in range(self.nb_data)]
+        # Act
+        with assert_max_queries(sql=2, mongo=4):
+            errors = data_workspace_api.assign_many(data_ids, self.fixture.writer_workspace, self.fixture.writer)
+        # Assert
+        self.assertEqual(errors, {})
@@ -0,0 +1,164 @@
+""" Integration Test for the Job API
+"""
+import datetime
+
+from mock.mock import patch
+
+from core_workspace_app.components.job import api as job_api
+from core_workspace_app.components.job import tasks
+from core_workspace_app.components.job.models import Job
+from core_workspace_app.components.workspace import api as workspace_api
+from core_workspace_app.constants import JOB_FAILURE, JOB_PENDING, JOB_RUNNING, JOB_SUCCESS
+from tests.components.user.fixtures.fixtures import UserFixtures
+from tests.components.workspace.fixtures.fixtures import WorkspaceAccessFixtures
+from tests.utils.integration_base_transaction_test_case import WorkspaceIntegrationTransactionTestCase
+
+TASK = 'add_users_rights_to_workspace'
+
+
+class JobTestCase(WorkspaceIntegrationTransactionTestCase):
+    """ The jobs are run synchronously by the tests: the executor threads would not see the in-memory database.
+    """
+
+    fixture = WorkspaceAccessFixtures()
+
+    def _get_params(self, user_ids):
+        return {'workspace_id': str(self.fixture.workspaces[0].id), 'user_ids': user_ids, 'read': True, 'write': False}
+
+
+@patch('core_workspace_app.components.job.api._enqueue')
+class TestSubmitJob(JobTestCase):
+
+    def test_submit_twice_with_same_key_returns_first_job(self, mock_enqueue):
+        # Context
+        new_user = UserFixtures.create_user(username="new user")
+        params = self._get_params([str(new_user.id)])
+        # Act
+        first_job = job_api.submit(TASK, params, self.fixture.owner, idempotency_key='key')
+        second_job = job_api.submit(TASK, params, self.fixture.owner, idempotency_key='key')
+        # Assert
+        self.assertEqual(first_job.id, second_job.id)
+        self.assertEqual(Job.objects(user_id=str(self.fixture.owner.id)).count(), 1)
+        self.assertEqual(mock_enqueue.call_count, 1)
+
+    def test_submit_with_key_of_failed_job_runs_it_again(self, mock_enqueue):
+        # Context
+        params = self._get_params([str(self.fixture.reader.id)])
+        first_job = job_api.submit(TASK, params, self.fixture.owner, idempotency_key='key')
+        Job.start(first_job.id)
+        Job.finish(first_job.id, JOB_FAILURE, message='error')
+        # Act
+        second_job = job_api.submit(TASK, params, self.fixture.owner, idempotency_key='key')
+        # Assert
+        self.assertEqual(first_job.id, second_job.id)
+        self.assertEqual(second_job.status, JOB_PENDING)
+        self.assertEqual(mock_enqueue.call_count, 2)
+
+    def test_submit_with_key_of_succeeded_job_does_not_run_it_again(self, mock_enqueue):
+        # Context
+        params = self._get_params([str(self.fixture.reader.id)])
+        first_job = job_api.submit(TASK, params, self.fixture.owner, idempotency_key='key')
+        job_api.run(first_job.id)
+        # Act
+        second_job = job_api.submit(TASK, params, self.fixture.owner, idempotency_key='key')
+        # Assert
+        self.assertEqual(second_job.status, JOB_SUCCESS)
+        self.assertEqual(second_job.attempts, 1)
+        self.assertEqual(mock_enqueue.call_count, 1)
+
+    def test_same_key_of_other_user_creates_another_job(self, mock_enqueue):
+        # Context
+        params = self._get_params([str(self.fixture.reader.id)])
+        # Act
+        first_job = job_api.submit(TASK, params, self.fixture.owner, idempotency_key='key')
+        second_job = job_api.submit(TASK, params, self.fixture.reader, idempotency_key='key')
+        # Assert
+        self.assertNotEqual(first_job.id, second_job.id)
+
+
+@patch('core_workspace_app.components.job.api._enqueue')
+class TestRunJob(JobTestCase):
+
+    def test_run_reports_users_given_access(self, mock_enqueue):
+        # Context
+        new_user = UserFixtures.create_user(username="new user")
+        job = job_api.submit(TASK, self._get_params([str(new_user.id)]), self.fixture.owner)
+        # Act
+        job_api.run(job.id)
+        # Assert
+        job = Job.get_by_id(job.id)
+        self.assertEqual(job.status, JOB_SUCCESS)
+        self.assertEqual(job.result['nb_users'], 1)
+        self.assertTrue(workspace_api.can_user_read_workspace(self.fixture.workspaces[0], new_user))
+
+    def test_retry_of_applied_job_reports_nothing_applied(self, mock_enqueue):
+        # Context
+        new_user = UserFixtures.create_user(username="new user")
+        job = job_api.submit(TASK, self._get_params([str(new_user.id)]), self.fixture.owner)
+        job_api.run(job.id)
+        Job.objects(pk=job.id).update_one(set__status=JOB_FAILURE)
+        # Act
+        job_api.retry(Job.get_by_id(job.id), self.fixture.owner)
+        job_api.run(job.id)
+        # Assert
+        job = Job.get_by_id(job.id)
+        self.assertEqual(job.status, JOB_SUCCESS)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(job.result['nb_users'], 0)
+
+
+class TestAddRightsTasks(JobTestCase):
+
+    def test_add_users_rights_counts_only_applied_and_missing_users(self):
+        # Context
+        new_user = UserFixtures.create_user(username="new user")
+        missing_user_id = str(new_user.id + 1000)
+        # Act
+        result = tasks.add_users_rights_to_workspace(self.fixture.owner, str(self.fixture.workspaces[0].id),
+                                                     [str(new_user.id), str(self.fixture.reader.id), missing_user_id],
+                                                     True, False)
+        # Assert
+        self.assertEqual(result, {'nb_users': 1, 'nb_not_found': 1})
+
+
+class TestResetExpiredJobs(JobTestCase):
+
+    def _create_running_job(self, start_date):
+        job = Job(task=TASK, user_id=str(self.fixture.owner.id), params={}).save_object()
+        Job.start(job.id)
+        Job.objects(pk=job.id).update_one(set__start_date=start_date)
+        return job
+
+    def test_job_running_longer_than_lease_is_pending_again(self):
+        # Context
+        job = self._create_running_job(datetime.datetime.utcnow() - datetime.timedelta(seconds=7200))
+        # Act
+        nb_reset = Job.reset_expired(3600)
+        # Assert
+        self.assertEqual(nb_reset, 1)
+        self.assertEqual(Job.get_by_id(job.id).status, JOB_PENDING)
+
+    def test_job_running_within_lease_is_not_reset(self):
+        # Context
+        job = self._create_running_job(datetime.datetime.utcnow())
+        # Act
+        nb_reset = Job.reset_expired(3600)
+        # Assert
+        self.assertEqual(nb_reset, 0)
+        self.assertEqual(Job.get_by_id(job.id).status, JOB_RUNNING)
+
+    def test_get_pending_job_ids_including_running_recovers_expired_jobs(self):
+        # Context
+        job = self._create_running_job(datetime.datetime.utcnow() - datetime.timedelta(days=1))
+        # Act
+        job_ids = job_api.get_pending_job_ids(include_running=True)
+        # Assert
+        self.assertIn(str(job.id), job_ids)
+
+    def test_get_pending_job_ids_without_running_keeps_running_jobs(self):
+        # Context
+        job = self._create_running_job(datetime.datetime.utcnow() - datetime.timedelta(days=1))
+        # Act
+        job_ids = job_api.get_pending_job_ids()
+        # Assert
+        self.assertNotIn(str(job.id), job_ids)
@@ -0,0 +1,23 @@
+""" Fixtures files for Workspace
+"""
+
+from core_main_app.utils.integration_tests.fixture_interface import FixtureInterface
+from core_workspace_app.components.workspace import api as workspace_api
+from tests.components.user.fixtures.fixtures import UserFixtures
+
+
+class WorkspaceAccessFixtures(FixtureInterface):
+    """ Workspaces of an owner, shared in read with a reader
+    """
+    owner = None
+    reader = None
+    workspaces = None
+    nb_workspaces = 5
+
+    def insert_data(self):
+        self.owner = UserFixtures.create_user(username="owner")
+        self.reader = UserFixtures.create_user(username="reader")
+        self.workspaces = [workspace_api.create_and_save(self.owner.id, "workspace {0}".format(index))
+                           for index in range(self.nb_workspaces)]
+        for workspace in self.workspaces:
+            workspace_api.add_users_access_to_workspace(workspace, [self.reader], True, False, self.owner)
@@ -0,0 +1,136 @@
+""" Integration Test for the query budgets of the Workspace API
+"""
+from django.contrib.auth.models import Group
+from mock.mock import patch
+
+from core_workspace_app import settings
+from core_workspace_app.components.workspace import api as workspace_api
+from core_workspace_app.utils.query_count import assert_max_queries
+from tests.components.user.fixtures.fixtures import UserFixtures
+from tests.components.workspace.fixtures.fixtures import WorkspaceAccessFixtures
+from tests.utils.integration_base_transaction_test_case import WorkspaceIntegrationTransactionTestCase
+
+
+class WorkspaceQueryBudgetTestCase(WorkspaceIntegrationTransactionTestCase):
+    """ Query budgets, without the request cache nor the shared cache.
+    The budgets must not grow with the number of workspaces, users or groups. The Mongo budgets are only checked
+    against a test mongod (WORKSPACE_TEST_MONGO_HOST): mongomock does not publish the Mongo commands.
+    """
+
+    fixture = WorkspaceAccessFixtures()
+
+
+class TestGetWorkspaceAccessByUserQueries(WorkspaceQueryBudgetTestCase):
+
+    def test_get_workspace_access_by_user(self):
+        # Act
+        with assert_max_queries(sql=2, mongo=1):
+            access = workspace_api.get_workspace_access_by_user(self.fixture.reader)
+        # Assert
+        self.assertEqual(len(access.readable_ids), self.fixture.nb_workspaces)
+
+
+class TestGetAllWorkspacesWithAccessByUserQueries(WorkspaceQueryBudgetTestCase):
+
+    def test_get_all_workspaces_with_read_access_by_user(self):
+        # Act
+        with assert_max_queries(sql=2, mongo=1):
+            workspaces = list(workspace_api.get_all_workspaces_with_read_access_by_user(self.fixture.reader))
+        # Assert
+        self.assertEqual(len(workspaces), self.fixture.nb_workspaces)
+
+    def test_get_all_workspaces_with_write_access_by_user(self):
+        # Act
+        with assert_max_queries(sql=2, mongo=1):
+            workspaces = list(workspace_api.get_all_workspaces_with_write_access_by_user(self.fixture.owner))
+        # Assert
+        self.assertEqual(len(workspaces), self.fixture.nb_workspaces)
+
+
+class TestCheckUserWorkspaceAccessQueries(WorkspaceQueryBudgetTestCase):
+
+    def test_check_if_user_can_write_workspace(self):
+        # Act
+        with assert_max_queries(sql=1, mongo=0):
+            can_write = workspace_api.check_if_user_can_write_workspace(self.fixture.workspaces[0],
+                                                                        self.fixture.reader)
+        # Assert
+        self.assertFalse(can_write)
+
+    def test_check_if_user_can_read_or_write_workspace(self):
+        # Act
+        with assert_max_queries(sql=2, mongo=0):
+            can_read = workspace_api.check_if_user_can_read_or_write_workspace(self.fixture.workspaces[0],
+                                                                               self.fixture.reader)
+        # Assert
+        self.assertTrue(can_read)
+
+    def test_can_user_read_workspace(self):
+        # Act
+        with assert_max_queries(sql=2, mongo=0):
+            can_read = workspace_api.can_user_read_workspace(self.fixture.workspaces[0], self.fixture.reader)
+        # Assert
+        self.assertTrue(can_read)
+
+
+class TestBulkWorkspaceAccessQueries(WorkspaceQueryBudgetTestCase):
+    """ Granting or revoking an access costs the same for one or many users or groups: a savepoint, one select of
+    the existing rows, one insert or delete, and one select of the permissions for the signal after the commit.
+    """
+
+    nb_objects = 10
+
+    def setUp(self):
+        super(TestBulkWorkspaceAccessQueries, self).setUp()
+        self.users = [UserFixtures.create_user(username="user {0}".format(index)) for index in range(self.nb_objects)]
+        self.groups = [Group.objects.create(name="group {0}".format(index)) for index in range(self.nb_objects)]
+
+    def _assert_same_queries(self, func, objects, sql, mongo):
+        """ Run func on one object, then on all the others, within the budget both times.
+
+        Args:
+            func: function of a workspace and a list of users or groups
+            objects
+            sql
+            mongo
+
+        Returns:
+        """
+        with assert_max_queries(sql=sql, mongo=mongo) as single:
+            func(self.fixture.workspaces[0], objects[:1])
+        with assert_max_queries(sql=sql, mongo=mongo) as many:
+            func(self.fixture.workspaces[0], objects[1:])
+        self.assertEqual(many.sql, single.sql)
+        self.assertEqual(many.mongo, single.mongo)
+
+    def test_add_users_access_to_workspace(self):
+        # Act # Assert
+        self._assert_same_queries(lambda workspace, users: workspace_api.add_users_access_to_workspace(
+            workspace, users, True, True, self.fixture.owner), self.users, sql=6, mongo=0)
+
+    def test_remove_users_access_to_workspace(self):
+        # Context
+        workspace_api.add_users_access_to_workspace(self.fixture.workspaces[0], self.users, True, True,
+                                                    self.fixture.owner)
+        # Act # Assert
+        self._assert_same_queries(lambda workspace, users: workspace_api.remove_users_access_to_workspace(
+            workspace, users, True, True, self.fixture.owner), self.users, sql=5, mongo=0)
+
+    def test_add_groups_access_to_workspace(self):
+        # Act # Assert
+        self._assert_same_queries(lambda workspace, groups: workspace_api.add_groups_access_to_workspace(
+            workspace, groups, True, True, self.fixture.owner), self.groups, sql=6, mongo=0)
+
+    def test_remove_groups_access_to_workspace(self):
+        # Context
+        workspace_api.add_groups_access_to_workspace(self.fixture.workspaces[0], self.groups, True, True,
+                                                     self.fixture.owner)
+        # Act # Assert
+        self._assert_same_queries(lambda workspace, groups: workspace_api.remove_groups_access_to_workspace(
+            workspace, groups, True, True, self.fixture.owner), self.groups, sql=5, mongo=0)
+
+    @patch.object(settings, 'WORKSPACE_DENORMALIZED_ACL', True)
+    def test_add_users_access_to_workspace_with_acl(self):
+        # Act # Assert: one update of each access control list
+        self._assert_same_queries(lambda workspace, users: workspace_api.add_users_access_to_workspace(
+            workspace, users, True, True, self.fixture.owner), self.users, sql=6, mongo=2)
@@ -0,0 +1,110 @@
+""" Integration Test for the agreement of the workspace access checks
+"""
+from django.contrib.auth.models import AnonymousUser, Group
+from mock.mock import patch
+
+from core_workspace_app import settings
+from core_workspace_app.components.workspace import api as workspace_api
+from core_workspace_app.components.workspace.models import Workspace
+from tests.components.user.fixtures.fixtures import UserFixtures
+from tests.components.workspace.fixtures.fixtures import WorkspaceAccessFixtures
+from tests.utils.integration_base_transaction_test_case import WorkspaceIntegrationTransactionTestCase
+
+
+class TestWorkspaceAccessChecks(WorkspaceIntegrationTransactionTestCase):
+    """ can_user_* and check_if_user_can_* give the same answers, for users with every kind of access.
+    """
+
+    fixture = WorkspaceAccessFixtures()
+
+    def setUp(self):
+        super(TestWorkspaceAccessChecks, self).setUp()
+        owner = self.fixture.owner
+        private_workspace, public_workspace = self.fixture.workspaces[0], self.fixture.workspaces[1]
+        pending_workspace = self.fixture.workspaces[2]
+
+        writer = UserFixtures.create_user(username="writer")
+        group_reader = UserFixtures.create_user(username="group reader")
+        group_writer = UserFixtures.create_user(username="group writer")
+        stranger = UserFixtures.create_user(username="stranger")
+        reading_group = Group.objects.create(name="readers")
+        writing_group = Group.objects.create(name="writers")
+        group_reader.groups.add(reading_group)
+        group_writer.groups.add(writing_group)
+
+        for workspace in (private_workspace, public_workspace, pending_workspace):
+            workspace_api.add_users_access_to_workspace(workspace, [writer], False, True, owner)
+            workspace_api.add_groups_access_to_workspace(workspace, [reading_group], True, False, owner)
+            workspace_api.add_groups_access_to_workspace(workspace, [writing_group], False, True, owner)
+        workspace_api.set_workspace_public(public_workspace)
+        Workspace.set_pending_delete(pending_workspace.id)
+
+        self.users = {
+            'owner': owner,
+            'reader': self.fixture.reader,
+            'writer': writer,
+            'group reader': group_reader,
+            'group writer': group_writer,
+            'stranger': stranger,
+        }
+        # reloaded: the access control lists and the flags are set in the database
+        self.private_workspace = Workspace.get_by_id(private_workspace.id)
+        self.public_workspace = Workspace.get_by_id(public_workspace.id)
+        self.pending_workspace = Workspace.get_by_id(pending_workspace.id, include_pending_delete=True)
+
+    def _assert_checks(self, workspace, expected):
+        for name, user in self.users.items():
+            can_read, can_write = expected[name]
+            self.assertEqual(workspace_api.can_user_read_workspace(workspace, user), can_read, name)
+            self.assertEqual(workspace_api.can_user_write_workspace(workspace, user), can_write, name)
+            self.assertEqual(workspace_api.check_if_user_can_write_workspace(workspace, user), can_write, name)
+            self.assertEqual(workspace_api.check_if_user_can_read_or_write_workspace(workspace, user),
+                             can_read or can_write, name)
+
+    def test_checks_agree_on_private_workspace(self):
+        # Act # Assert
+        self._assert_checks(self.private_workspace, {
+            'owner': (True, True),
+            'reader': (True, False),
+            'writer': (False, True),
+            'group reader': (True, False),
+            'group writer': (False, True),
+            'stranger': (False, False),
+        })
+
+    def test_checks_agree_on_public_workspace(self):
+        # Act # Assert
+        self._assert_checks(self.public_workspace, {
+            'owner': (True, True),
+            'reader': (True, False),
+            'writer': (True, True),
+            'group reader': (True, False),
+            'group writer': (True, True),
+            'stranger': (True, False),
+        })
+
+    def test_checks_agree_on_workspace_pending_deletion(self):
+        # Act # Assert
+        self._assert_checks(self.pending_workspace, {name: (False, False) for name in self.users})
+
+    def test_checks_agree_for_anonymous_user(self):
+        # Context
+        anonymous_user = AnonymousUser()
+        # Act # Assert
+        for workspace, can_read in ((self.private_workspace, False), (self.public_workspace, True)):
+            self.assertEqual(workspace_api.can_user_read_workspace(workspace, anonymous_user), can_read)
+            self.assertFalse(workspace_api.can_user_write_workspace(workspace, anonymous_user))
+            self.assertFalse(workspace_api.check_if_user_can_write_workspace(workspace, anonymous_user))
+            self.assertEqual(workspace_api.check_if_user_can_read_or_write_workspace(workspace, anonymous_user),
+                             can_read)
+
+
+class TestWorkspaceAccessChecksWithAcl(TestWorkspaceAccessChecks):
+    """ Same answers with the denormalized access control lists (enabled before the fixture is inserted).
+    """
+
+    def setUp(self):
+        patcher = patch.object(settings, 'WORKSPACE_DENORMALIZED_ACL', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super(TestWorkspaceAccessChecksWithAcl, self).setUp()
@@ -0,0 +1,155 @@
+""" Integration Test for the bulk grant and revoke of the workspace access
+"""
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models.signals import m2m_changed
+
+from core_workspace_app.components.workspace import api as workspace_api
+from tests.components.user.fixtures.fixtures import UserFixtures
+from tests.components.workspace.fixtures.fixtures import WorkspaceAccessFixtures
+from tests.utils.integration_base_transaction_test_case import WorkspaceIntegrationTransactionTestCase
+
+
+class _BulkAccessTestCase(WorkspaceIntegrationTransactionTestCase):
+    """ Record the m2m_changed signals sent for the permission tables.
+    """
+
+    fixture = WorkspaceAccessFixtures()
+
+    def setUp(self):
+        super(_BulkAccessTestCase, self).setUp()
+        self.workspace = self.fixture.workspaces[0]
+        self.signals = []
+        for sender in (User.user_permissions.through, Group.permissions.through):
+            m2m_changed.connect(self._record_signal, sender=sender, weak=False)
+            self.addCleanup(m2m_changed.disconnect, self._record_signal, sender=sender)
+
+    def _record_signal(self, sender, instance, action, reverse, model, pk_set, **kwargs):
+        self.signals.append((action, instance.pk, reverse, model, set(pk_set)))
+
+    def _get_signals(self, action):
+        return sorted((signal for signal in self.signals if signal[0] == action), key=lambda signal: signal[1])
+
+
+class TestUsersAccessToWorkspace(_BulkAccessTestCase):
+
+    def _count_rows(self, users):
+        return User.user_permissions.through.objects.filter(user_id__in=[user.id for user in users],
+                                                            permission_id__in=[self.workspace.read_perm_id,
+                                                                               self.workspace.write_perm_id]).count()
+
+    def test_re_granting_access_inserts_nothing(self):
+        # Act
+        nb_granted = workspace_api.add_users_access_to_workspace(self.workspace, [self.fixture.reader], True, False,
+                                                                 self.fixture.owner)
+        # Assert
+        self.assertEqual(nb_granted, 0)
+        self.assertEqual(self._count_rows([self.fixture.reader]), 1)
+
+    def test_partial_overlap_inserts_missing_rows_only(self):
+        # Context
+        newcomer = UserFixtures.create_user(username="newcomer")
+        # Act
+        nb_granted = workspace_api.add_users_access_to_workspace(self.workspace, [self.fixture.reader, newcomer],
+                                                                 True, True, self.fixture.owner)
+        # Assert
+        self.assertEqual(nb_granted, 2)
+        self.assertEqual(self._count_rows([self.fixture.reader]), 2)
+        self.assertEqual(self._count_rows([newcomer]), 2)
+
+    def test_granting_access_sends_one_reverse_signal_per_permission(self):
+        # Context
+        newcomer = UserFixtures.create_user(username="newcomer")
+        user_ids = {self.fixture.reader.id, newcomer.id}
+        # Act
+        workspace_api.add_users_access_to_workspace(self.workspace, [self.fixture.reader, newcomer], True, True,
+                                                    self.fixture.owner)
+        # Assert
+        self.assertEqual(self._get_signals('post_add'),
+                         sorted([('post_add', int(self.workspace.read_perm_id), True, User, user_ids),
+                                 ('post_add', int(self.workspace.write_perm_id), True, User, user_ids)],
+                                key=lambda signal: signal[1]))
+
+    def test_revoking_access_deletes_existing_rows_and_sends_one_signal_per_permission(self):
+        # Context
+        newcomer = UserFixtures.create_user(username="newcomer")
+        # Act
+        workspace_api.remove_users_access_to_workspace(self.workspace, [self.fixture.reader, newcomer], True, False,
+                                                       self.fixture.owner)
+        # Assert
+        self.assertEqual(self._count_rows([self.fixture.reader, newcomer]), 0)
+        self.assertEqual(self._get_signals('post_remove'),
+                         [('post_remove', int(self.workspace.read_perm_id), True, User,
+                           {self.fixture.reader.id, newcomer.id})])
+
+    def test_rolled_back_grant_sends_no_signal(self):
+        # Context
+        newcomer = UserFixtures.create_user(username="newcomer")
+        # Act
+        try:
+            with transaction.atomic():
+                workspace_api.add_users_access_to_workspace(self.workspace, [newcomer], True, True,
+                                                            self.fixture.owner)
+                raise ValueError()
+        except ValueError:
+            pass
+        # Assert
+        self.assertEqual(self._count_rows([newcomer]), 0)
+        self.assertEqual(self._get_signals('post_add'), [])
+
+
+class TestGroupsAccessToWorkspace(_BulkAccessTestCase):
+
+    def setUp(self):
+        super(TestGroupsAccessToWorkspace, self).setUp()
+        self.group = Group.objects.create(name="team")
+        self.other_group = Group.objects.create(name="other team")
+        workspace_api.add_groups_access_to_workspace(self.workspace, [self.group], True, False, self.fixture.owner)
+        self.signals = []
+
+    def _count_rows(self, groups):
+        return Group.permissions.through.objects.filter(group_id__in=[group.id for group in groups],
+                                                        permission_id__in=[self.workspace.read_perm_id,
+                                                                           self.workspace.write_perm_id]).count()
+
+    def test_re_granting_access_inserts_nothing(self):
+        # Act
+        nb_granted = workspace_api.add_groups_access_to_workspace(self.workspace, [self.group], True, False,
+                                                                  self.fixture.owner)
+        # Assert
+        self.assertEqual(nb_granted, 0)
+        self.assertEqual(self._count_rows([self.group]), 1)
+
+    def test_partial_overlap_inserts_missing_rows_only(self):
+        # Act
+        nb_granted = workspace_api.add_groups_access_to_workspace(self.workspace, [self.group, self.other_group],
+                                                                  True, False, self.fixture.owner)
+        # Assert
+        self.assertEqual(nb_granted, 1)
+        self.assertEqual(self._count_rows([self.group]), 1)
+        self.assertEqual(self._count_rows([self.other_group]), 1)
+
+    def test_granting_access_sends_one_reverse_signal_per_permission(self):
+        # Context
+        group_ids = {self.group.id, self.other_group.id}
+        # Act
+        workspace_api.add_groups_access_to_workspace(self.workspace, [self.group, self.other_group], True, True,
+                                                     self.fixture.owner)
+        # Assert
+        self.assertEqual(self._get_signals('post_add'),
+                         sorted([('post_add', int(self.workspace.read_perm_id), True, Group, group_ids),
+                                 ('post_add', int(self.workspace.write_perm_id), True, Group, group_ids)],
+                                key=lambda signal: signal[1]))
+
+    def test_revoking_access_deletes_existing_rows_and_sends_one_signal_per_permission(self):
+        # Act
+        workspace_api.remove_groups_access_to_workspace(self.workspace, [self.group, self.other_group], True, True,
+                                                        self.fixture.owner)
+        # Assert
+        self.assertEqual(self._count_rows([self.group, self.other_group]), 0)
+        self.assertEqual(self._get_signals('post_remove'),
+                         sorted([('post_remove', int(self.workspace.read_perm_id), True, Group,
+                                  {self.group.id, self.other_group.id}),
+                                 ('post_remove', int(self.workspace.write_perm_id), True, Group,
+                                  {self.group.id, self.other_group.id})],
+                                key=lambda signal: signal[1]))
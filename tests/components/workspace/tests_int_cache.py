@@ -0,0 +1,135 @@
+""" Integration Test for the invalidation of the shared cache of the workspace access
+"""
+from django.contrib.auth.models import Group, User
+from django.core.cache import caches
+from mock.mock import patch
+
+from core_workspace_app import settings
+from core_workspace_app.components.workspace import api as workspace_api
+from core_workspace_app.components.workspace import cache as workspace_cache
+from tests.components.user.fixtures.fixtures import UserFixtures
+from tests.components.workspace.fixtures.fixtures import WorkspaceAccessFixtures
+from tests.utils.integration_base_transaction_test_case import WorkspaceIntegrationTransactionTestCase
+
+
+class TestWorkspaceAccessCacheInvalidation(WorkspaceIntegrationTransactionTestCase):
+    """ Permission and membership changes make the next access computed again, for the right users only.
+    """
+
+    fixture = WorkspaceAccessFixtures()
+
+    def setUp(self):
+        patcher = patch.object(settings, 'WORKSPACE_ACCESS_CACHE', 'default')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = caches['default']
+        self.cache.clear()
+        super(TestWorkspaceAccessCacheInvalidation, self).setUp()
+
+        self.group = Group.objects.create(name="team")
+        self.member = UserFixtures.create_user(username="member")
+        self.member.groups.add(self.group)
+        workspace_api.add_groups_access_to_workspace(self.fixture.workspaces[0], [self.group], True, False,
+                                                     self.fixture.owner)
+
+    def _get_user_version(self, user):
+        return self.cache.get(workspace_cache.USER_VERSION_KEY.format(user.id))
+
+    def _get_global_version(self):
+        return self.cache.get(workspace_cache.GLOBAL_VERSION_KEY)
+
+    def _get_listing_ids(self, user):
+        return {str(workspace.id) for workspace in workspace_api.get_all_workspaces_with_read_access_by_user(user)}
+
+    def test_access_is_served_from_cache_until_invalidated(self):
+        # Context
+        workspace_id = str(self.fixture.workspaces[0].id)
+        self.assertIn(workspace_id, workspace_api.get_readable_workspace_ids_by_user(self.fixture.reader))
+        # delete without the signal: the cache is not invalidated
+        User.user_permissions.through.objects.filter(user_id=self.fixture.reader.id).delete()
+        # Act
+        workspace_ids = workspace_api.get_readable_workspace_ids_by_user(self.fixture.reader)
+        # Assert
+        self.assertIn(workspace_id, workspace_ids)
+
+    def test_revoking_user_permission_bumps_user_version_only(self):
+        # Context
+        workspace_id = str(self.fixture.workspaces[0].id)
+        self.assertIn(workspace_id, workspace_api.get_readable_workspace_ids_by_user(self.fixture.reader))
+        self.assertIn(workspace_id, self._get_listing_ids(self.fixture.reader))
+        user_version = self._get_user_version(self.fixture.reader)
+        member_version = self._get_user_version(self.member)
+        global_version = self._get_global_version()
+        # Act
+        workspace_api.remove_users_access_to_workspace(self.fixture.workspaces[0], [self.fixture.reader], True, False,
+                                                       self.fixture.owner)
+        # Assert
+        self.assertNotEqual(self._get_user_version(self.fixture.reader), user_version)
+        self.assertEqual(self._get_user_version(self.member), member_version)
+        self.assertEqual(self._get_global_version(), global_version)
+        self.assertNotIn(workspace_id, workspace_api.get_readable_workspace_ids_by_user(self.fixture.reader))
+        self.assertNotIn(workspace_id, self._get_listing_ids(self.fixture.reader))
+        self.assertEqual(len(workspace_api.get_readable_workspace_ids_by_user(self.fixture.reader)),
+                         self.fixture.nb_workspaces - 1)
+
+    def test_revoking_group_permission_bumps_global_version(self):
+        # Context
+        workspace_id = str(self.fixture.workspaces[0].id)
+        self.assertIn(workspace_id, workspace_api.get_readable_workspace_ids_by_user(self.member))
+        self.assertIn(workspace_id, self._get_listing_ids(self.member))
+        global_version = self._get_global_version()
+        # Act
+        workspace_api.remove_groups_access_to_workspace(self.fixture.workspaces[0], [self.group], True, False,
+                                                        self.fixture.owner)
+        # Assert
+        self.assertNotEqual(self._get_global_version(), global_version)
+        self.assertEqual(workspace_api.get_readable_workspace_ids_by_user(self.member), set())
+        self.assertEqual(self._get_listing_ids(self.member), set())
+
+    def test_leaving_group_bumps_user_version(self):
+        # Context
+        workspace_id = str(self.fixture.workspaces[0].id)
+        self.assertIn(workspace_id, workspace_api.get_readable_workspace_ids_by_user(self.member))
+        user_version = self._get_user_version(self.member)
+        # Act
+        self.member.groups.remove(self.group)
+        # Assert
+        self.assertNotEqual(self._get_user_version(self.member), user_version)
+        self.assertEqual(workspace_api.get_readable_workspace_ids_by_user(self.member), set())
+        self.assertEqual(self._get_listing_ids(self.member), set())
+
+    def test_joining_group_bumps_user_version(self):
+        # Context
+        workspace_id = str(self.fixture.workspaces[0].id)
+        newcomer = UserFixtures.create_user(username="newcomer")
+        self.assertEqual(workspace_api.get_readable_workspace_ids_by_user(newcomer), set())
+        user_version = self._get_user_version(newcomer)
+        # Act
+        newcomer.groups.add(self.group)
+        # Assert
+        self.assertNotEqual(self._get_user_version(newcomer), user_version)
+        self.assertEqual(workspace_api.get_readable_workspace_ids_by_user(newcomer), {workspace_id})
+        self.assertEqual(self._get_listing_ids(newcomer), {workspace_id})
+
+    def test_removing_group_bumps_user_version_of_members(self):
+        # Context
+        workspace_id = str(self.fixture.workspaces[0].id)
+        self.assertIn(workspace_id, workspace_api.get_readable_workspace_ids_by_user(self.member))
+        user_version = self._get_user_version(self.member)
+        # Act
+        self.group.user_set.remove(self.member)
+        # Assert
+        self.assertNotEqual(self._get_user_version(self.member), user_version)
+        self.assertEqual(workspace_api.get_readable_workspace_ids_by_user(self.member), set())
+
+    def test_setting_workspace_public_bumps_public_version(self):
+        # Context
+        stranger = UserFixtures.create_user(username="stranger")
+        self.assertEqual(workspace_api.get_readable_workspace_ids_by_user(stranger), set())
+        public_version = self.cache.get(workspace_cache.PUBLIC_VERSION_KEY)
+        # Act
+        workspace_api.set_workspace_public(self.fixture.workspaces[1])
+        # Assert
+        self.assertNotEqual(self.cache.get(workspace_cache.PUBLIC_VERSION_KEY), public_version)
+        self.assertEqual(workspace_api.get_readable_workspace_ids_by_user(stranger),
+                         {str(self.fixture.workspaces[1].id)})
@@ -0,0 +1,85 @@
+""" Integration Test for the visibility of public workspaces
+"""
+from mock.mock import patch
+
+from core_workspace_app import settings
+from core_workspace_app.components.workspace import api as workspace_api
+from core_workspace_app.components.workspace.models import Workspace
+from tests.components.user.fixtures.fixtures import UserFixtures
+from tests.components.workspace.fixtures.fixtures import WorkspaceAccessFixtures
+from tests.utils.integration_base_transaction_test_case import WorkspaceIntegrationTransactionTestCase
+
+
+class TestPublicWorkspaceVisibility(WorkspaceIntegrationTransactionTestCase):
+    """ Public workspaces can be read by users without any permission on them, private ones can not.
+    """
+
+    fixture = WorkspaceAccessFixtures()
+
+    def setUp(self):
+        super(TestPublicWorkspaceVisibility, self).setUp()
+        self.stranger = UserFixtures.create_user(username="stranger")
+        workspace_api.set_workspace_public(self.fixture.workspaces[0])
+        # reloaded: the denormalized flag is set in the database
+        self.public_workspace = Workspace.get_by_id(self.fixture.workspaces[0].id)
+        self.private_workspace = self.fixture.workspaces[1]
+
+    def test_public_workspace_is_in_read_listing_of_non_member(self):
+        # Act
+        workspace_ids = [str(workspace.id) for workspace in
+                         workspace_api.get_all_workspaces_with_read_access_by_user(self.stranger)]
+        # Assert
+        self.assertEqual(workspace_ids, [str(self.public_workspace.id)])
+
+    def test_public_workspace_is_in_other_public_workspaces_of_non_member(self):
+        # Act
+        workspace_ids = [str(workspace.id) for workspace in
+                         workspace_api.get_all_other_public_workspaces(self.stranger)]
+        # Assert
+        self.assertEqual(workspace_ids, [str(self.public_workspace.id)])
+
+    def test_public_workspace_is_not_in_write_listing_of_non_member(self):
+        # Act
+        workspaces = workspace_api.get_all_workspaces_with_write_access_by_user(self.stranger)
+        # Assert
+        self.assertEqual(len(workspaces), 0)
+
+    def test_public_workspace_is_in_readable_ids_of_non_member(self):
+        # Act
+        workspace_ids = workspace_api.get_readable_workspace_ids_by_user(self.stranger)
+        # Assert
+        self.assertEqual(workspace_ids, {str(self.public_workspace.id)})
+
+    def test_non_member_can_read_public_workspace(self):
+        # Act # Assert
+        self.assertTrue(workspace_api.is_workspace_public(self.public_workspace))
+        self.assertTrue(workspace_api.check_if_user_can_read_or_write_workspace(self.public_workspace,
+                                                                                self.stranger))
+
+    def test_non_member_can_not_write_public_workspace(self):
+        # Act # Assert
+        self.assertFalse(workspace_api.check_if_user_can_write_workspace(self.public_workspace, self.stranger))
+
+    def test_non_member_can_not_read_private_workspace(self):
+        # Act # Assert
+        self.assertFalse(workspace_api.is_workspace_public(self.private_workspace))
+        self.assertFalse(workspace_api.check_if_user_can_read_or_write_workspace(self.private_workspace,
+                                                                                 self.stranger))
+
+    def test_private_workspace_is_not_in_other_public_workspaces_of_member(self):
+        # Act
+        workspace_ids = [str(workspace.id) for workspace in
+                         workspace_api.get_all_other_public_workspaces(self.fixture.reader)]
+        # Assert
+        self.assertEqual(workspace_ids, [str(self.public_workspace.id)])
+
+
+class TestPublicWorkspaceVisibilityWithAcl(TestPublicWorkspaceVisibility):
+    """ Same rules, with the denormalized access control lists (enabled before the fixture is inserted).
+    """
+
+    def setUp(self):
+        patcher = patch.object(settings, 'WORKSPACE_DENORMALIZED_ACL', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super(TestPublicWorkspaceVisibilityWithAcl, self).setUp()
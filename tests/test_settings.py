@@ -0,0 +1,53 @@
+import os
+
+from mongoengine import connect
+
+from core_main_app.utils.databases.mongoengine_database import Database
+from core_workspace_app.utils.mongo_monitoring import MONGO_COMMAND_LISTENER
+
+SECRET_KEY = 'fake-key'
+
+INSTALLED_APPS = [
+    # Django apps
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sites',
+
+    # Extra apps
+    "password_policies",
+
+    # Local apps
+    "core_main_app",
+    "core_workspace_app",
+    "tests",
+]
+
+# IN-MEMORY TEST DATABASE
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+        "USER": "",
+        "PASSWORD": "",
+        "HOST": "",
+        "PORT": "",
+    },
+}
+
+
+PASSWORD_HASHERS = (
+    'django.contrib.auth.hashers.UnsaltedMD5PasswordHasher',
+)
+
+WORKSPACE_QUERY_COUNT = True
+
+MOCK_DATABASE_NAME = 'db_mock'
+# mongomock does not publish the Mongo commands: use a test mongod to check the Mongo budgets
+MOCK_DATABASE_HOST = os.environ.get('WORKSPACE_TEST_MONGO_HOST', 'mongomock://localhost')
+
+database = Database(MOCK_DATABASE_HOST, MOCK_DATABASE_NAME)
+if MOCK_DATABASE_HOST.startswith('mongomock://'):
+    database.connect()
+else:
+    database.database = connect(MOCK_DATABASE_NAME, host=MOCK_DATABASE_HOST, event_listeners=[MONGO_COMMAND_LISTENER])
@@ -0,0 +1,26 @@
+""" Integration Tests with transaction, for the workspace components
+"""
+from core_main_app.utils.integration_tests.integration_base_transaction_test_case import \
+    MongoIntegrationTransactionTestCase
+from core_workspace_app.permissions import api as permission_api
+from core_workspace_app.utils import group as group_utils
+from core_workspace_app.utils import request_cache
+
+
+class WorkspaceIntegrationTransactionTestCase(MongoIntegrationTransactionTestCase):
+    """ Reset the in-process caches of the app before inserting the fixture, without the request cache.
+    """
+
+    def setUp(self):
+        """ Insert needed data.
+
+        Returns:
+
+        """
+        # the special groups and the permissions are recreated with new ids by the flush
+        group_utils._special_groups.clear()
+        permission_api._permission_labels.clear()
+        request_cache.deactivate()
+        super(WorkspaceIntegrationTransactionTestCase, self).setUp()
+        group_utils.get_anonymous_group()
+        group_utils.get_default_group()
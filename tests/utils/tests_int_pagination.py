@@ -0,0 +1,87 @@
+""" Integration Test for the keyset pagination
+"""
+from core_main_app.commons import exceptions
+from core_workspace_app.components.workspace import api as workspace_api
+from core_workspace_app.components.workspace.models import Workspace
+from core_workspace_app.utils.pagination import get_keyset_page
+from tests.components.workspace.fixtures.fixtures import WorkspaceAccessFixtures
+from tests.utils.integration_base_transaction_test_case import WorkspaceIntegrationTransactionTestCase
+
+
+class TestGetKeysetPage(WorkspaceIntegrationTransactionTestCase):
+
+    fixture = WorkspaceAccessFixtures()
+
+    def test_first_page_returns_limit_items_and_cursor_of_last_item(self):
+        # Act
+        page = get_keyset_page(Workspace.get_all(), limit=2)
+        # Assert
+        self.assertEqual(len(page.items), 2)
+        self.assertEqual(page.next_cursor, str(page.items[-1].pk))
+        self.assertEqual(page.total_count, self.fixture.nb_workspaces)
+        self.assertTrue(page.total_count_is_exact)
+
+    def test_next_page_starts_after_cursor(self):
+        # Context
+        first_page = get_keyset_page(Workspace.get_all(), limit=2)
+        # Act
+        page = get_keyset_page(Workspace.get_all(), cursor=first_page.next_cursor, limit=2)
+        # Assert
+        self.assertEqual(len(page.items), 2)
+        self.assertTrue(all(item.pk > first_page.items[-1].pk for item in page.items))
+
+    def test_pages_list_every_workspace_once(self):
+        # Act
+        workspace_ids = []
+        cursor = None
+        while True:
+            page = get_keyset_page(Workspace.get_all(), cursor=cursor, limit=2)
+            workspace_ids.extend(str(item.pk) for item in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        # Assert
+        self.assertEqual(sorted(workspace_ids), sorted(str(workspace.pk) for workspace in self.fixture.workspaces))
+
+    def test_last_page_of_exactly_limit_items_has_no_cursor(self):
+        # Act
+        page = get_keyset_page(Workspace.get_all(), limit=self.fixture.nb_workspaces)
+        # Assert
+        self.assertEqual(len(page.items), self.fixture.nb_workspaces)
+        self.assertIsNone(page.next_cursor)
+
+    def test_last_page_with_fewer_items_than_limit_has_no_cursor(self):
+        # Context
+        first_page = get_keyset_page(Workspace.get_all(), limit=self.fixture.nb_workspaces - 1)
+        # Act
+        page = get_keyset_page(Workspace.get_all(), cursor=first_page.next_cursor, limit=self.fixture.nb_workspaces)
+        # Assert
+        self.assertEqual(len(page.items), 1)
+        self.assertIsNone(page.next_cursor)
+
+    def test_only_id_and_title_are_loaded(self):
+        # Act
+        page = workspace_api.get_all_paginated(limit=1, only_id_and_title=True)
+        # Assert
+        self.assertIsNotNone(page.items[0].title)
+        self.assertIsNone(page.items[0].owner)
+
+    def test_limit_0_raises_model_error(self):
+        # Act # Assert
+        with self.assertRaises(exceptions.ModelError):
+            get_keyset_page(Workspace.get_all(), limit=0)
+
+    def test_negative_limit_raises_model_error(self):
+        # Act # Assert
+        with self.assertRaises(exceptions.ModelError):
+            get_keyset_page(Workspace.get_all(), limit=-1)
+
+    def test_limit_not_a_number_raises_model_error(self):
+        # Act # Assert
+        with self.assertRaises(exceptions.ModelError):
+            get_keyset_page(Workspace.get_all(), limit='a')
+
+    def test_invalid_cursor_raises_model_error(self):
+        # Act # Assert
+        with self.assertRaises(exceptions.ModelError):
+            get_keyset_page(Workspace.get_all(), cursor='not an id')